@@ -1 +1,9 @@
-from . import agent
+import importlib
+
+
+def __getattr__(name):
+    # The agent module (ADK, every sub-agent) loads on first access, so scripts such as
+    # populate_firestore.py can import the finder's Firestore helpers without it
+    if name == 'agent':
+        return importlib.import_module('.agent', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,13 @@
 from google.adk.agents import Agent
-from .sub_agents.agent_finder.agent import agent_finder
+from .sub_agents.agent_finder.agent import agent_finder, set_health_prober
 from .sub_agents.communicator.agent import communicator_agent
+from .sub_agents.communicator.health import get_prober
 from google.adk.tools.agent_tool import AgentTool
 from .sub_agents.search_agent.agent import search_agent
 
+# agent_finder's health filter reads the liveness data of the communicator's prober
+set_health_prober(get_prober())
+
 root_agent = Agent(
     model='gemini-2.0-flash-001',
     name='root_agent',
@@ -48,6 +52,7 @@ root_agent = Agent(
         - **USER_TASK**: The specific task/message to send to the agent(s)
         - **COMMUNICATION_TYPE**: "single-agent" or "multi-agent" coordination
         - **TASK_CONTEXT**: Any additional context needed for the communication
+        - **TIME_BUDGET**: Seconds the user is willing to wait for the agents' answers, if they said so
 
         ## Complete Workflow:
         1. **Analyze complexity** - Single vs multi-agent assessment
@@ -1,5 +1,7 @@
+import asyncio
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 
 # Firebase Admin SDK for Firestore
 import firebase_admin
@@ -7,8 +9,77 @@ from firebase_admin import credentials, firestore
 
 from google.adk.agents import Agent
 
+from .catalog import AgentCatalog
+from .snapshot import CatalogSnapshot
+from .capability_index import lowered_capabilities, required_tokens, score_capabilities
+from .projection import card_field_paths, project_card, project_cards
+from .ranking import blended_score, select_top_k, telemetry_only_change
+from .leaderboards import LEADERBOARD_SIZE, LEADERBOARD_SORTS, get_leaderboard
+from .text_index import TextIndex
+from .pagination import AsyncAgentPager, decode_page_token, encode_page_token
+from .query_cache import QueryCache, cached_tool, normalize_capabilities, normalize_lower
+
 # --- Service Initialization ---
 db = None
+async_db = None
+catalog = None
+text_index = None
+
+# Set AGENT_FINDER_CATALOG_MIRROR=1 to serve searches from an in-memory catalog mirror
+CATALOG_MIRROR_ENABLED = os.getenv('AGENT_FINDER_CATALOG_MIRROR', '').lower() in ('1', 'true', 'yes')
+CATALOG_LOAD_TIMEOUT = float(os.getenv('AGENT_FINDER_CATALOG_LOAD_TIMEOUT', '30'))
+
+# Optional catalog snapshot file (see export_catalog_snapshot.py). The mirror starts from it and
+# only reads agents updated since the export; without Firestore credentials it serves the snapshot alone.
+SNAPSHOT_PATH = os.getenv('AGENT_FINDER_SNAPSHOT')
+_snapshot_only = False
+
+# Maximum agent documents read per search when filtering client-side (partial matching, name filter)
+READ_BUDGET = int(os.getenv('AGENT_FINDER_READ_BUDGET', '200'))
+
+# Set AGENT_FINDER_TOKEN_PREFILTER=1 to narrow partial-match Firestore queries server-side with
+# array_contains_any on the precomputed capability_tokens field. Only enable it once every agent
+# document carries the field (see populate_firestore.py); substring matches that share no whole
+# token with the query (e.g. "data" in "metadata") are then no longer found.
+TOKEN_PREFILTER_ENABLED = os.getenv('AGENT_FINDER_TOKEN_PREFILTER', '').lower() in ('1', 'true', 'yes')
+
+# Set AGENT_FINDER_LEADERBOARDS=1 to answer exact-match top agents and best value lookups from the
+# materialized leaderboards kept current by populate_firestore.py (one document read instead of a
+# query). Lookups fall back to querying when a board has not been built yet.
+LEADERBOARDS_ENABLED = os.getenv('AGENT_FINDER_LEADERBOARDS', '').lower() in ('1', 'true', 'yes')
+
+# Set AGENT_FINDER_HEALTH_FILTER=1 to probe every catalog agent in the background and leave agents that
+# fail their probes out of search results. Results then carry search_metadata.health with the agent's
+# liveness and round-trip time.
+HEALTH_FILTER_ENABLED = os.getenv('AGENT_FINDER_HEALTH_FILTER', '').lower() in ('1', 'true', 'yes')
+
+# Prober the health filter reads, set with set_health_prober() (the root agent passes the communicator's,
+# see communicator/health.py). It provides watch(urls), start(url_source), status(url), is_alive(url)
+# and dead_urls().
+health_prober = None
+
+# Finder tool result cache; set AGENT_FINDER_CACHE_SIZE=0 to disable
+query_cache = QueryCache(
+    max_entries=int(os.getenv('AGENT_FINDER_CACHE_SIZE', '256')),
+    ttl_seconds=float(os.getenv('AGENT_FINDER_CACHE_TTL', '60'))
+)
+# Set AGENT_FINDER_CACHE_WATCH=1 to drop cached results as soon as agents change when the catalog mirror
+# is disabled. The listener reads every agent document when it attaches (and keeps them in memory), so
+# by default cached results just expire after AGENT_FINDER_CACHE_TTL. With the mirror, changes always
+# invalidate. Telemetry flushes never do: cached latency and blended rankings lag by up to the TTL.
+CACHE_WATCH_ENABLED = os.getenv('AGENT_FINDER_CACHE_WATCH', '').lower() in ('1', 'true', 'yes')
+_cache_watch = None
+# Agent documents last seen by the cache watch, to tell telemetry flushes from listing changes
+_watched_agents = {}
+
+# Optional prebuilt BM25 index (see TextIndex.save) used when the catalog mirror is disabled
+TEXT_INDEX_PATH = os.getenv('AGENT_FINDER_TEXT_INDEX')
+
+# Maximum number of card references sent in a single batched Firestore read
+CARD_BATCH_SIZE = 100
+
+# Serializes first-use initialization, which the async tools run on worker threads
+_init_lock = threading.Lock()
 
 def _initialize_services():
     """Initializes Firebase if not already done."""
@@ -36,39 +107,680 @@ def _initialize_services():
                 "Firebase initialization failed. Ensure 'agent-marketplace-c93af-a8fcbc1beb09.json' is in the same directory as this script."
             )
 
+def _load_snapshot(catalog):
+    """Seeds the catalog from SNAPSHOT_PATH, returning the export time for delta queries."""
+    snapshot = CatalogSnapshot.open(SNAPSHOT_PATH)
+    try:
+        catalog.load_snapshot(snapshot)
+        print(f"Agent catalog snapshot {SNAPSHOT_PATH} loaded with {len(snapshot)} agents.")
+        return snapshot.created_at_datetime
+    finally:
+        snapshot.close()
+
+def _start_snapshot_catalog():
+    """Serves the catalog from SNAPSHOT_PATH alone when Firestore is unavailable."""
+    global catalog, _snapshot_only
+    try:
+        catalog = AgentCatalog(None)
+        _load_snapshot(catalog)
+        catalog.mark_ready()
+        _snapshot_only = True
+    except Exception as e:
+        print(f"Error loading agent catalog snapshot: {e}")
+        catalog = None
+
+def _start_catalog(db):
+    """Loads the in-memory catalog mirror and keeps it fresh via snapshot listeners."""
+    global catalog
+    try:
+        catalog = AgentCatalog(db)
+        since = None
+        if SNAPSHOT_PATH:
+            try:
+                since = _load_snapshot(catalog)
+            except Exception as e:
+                print(f"Error loading agent catalog snapshot; loading the full catalog from Firestore: {e}")
+                catalog = AgentCatalog(db)
+        if catalog.start(timeout=CATALOG_LOAD_TIMEOUT, since=since):
+            print(f"Agent catalog mirror loaded with {len(catalog)} agents.")
+        else:
+            print("Agent catalog mirror is still loading; falling back to Firestore queries until ready.")
+    except Exception as e:
+        print(f"Error starting agent catalog mirror: {e}")
+        catalog = None
+
+def _start_cache_invalidation(db):
+    """Drops cached finder results whenever agent listings change (see CACHE_WATCH_ENABLED)."""
+    global _cache_watch
+    if not query_cache.enabled:
+        return
+    try:
+        if catalog is not None:
+            # The mirror already listens to agents and cards
+            catalog.add_listener(query_cache.invalidate)
+        elif CACHE_WATCH_ENABLED:
+            _cache_watch = db.collection('agents').on_snapshot(_on_watched_agents)
+    except Exception as e:
+        print(f"Error starting finder cache invalidation; relying on TTL expiry: {e}")
+
+def _on_watched_agents(doc_snapshots, changes, read_time):
+    """Invalidates the query cache unless every change is a telemetry flush."""
+    listing_changed = not changes
+    for change in changes:
+        agent_id = change.document.id
+        if change.type.name == 'REMOVED':
+            _watched_agents.pop(agent_id, None)
+            listing_changed = True
+            continue
+        agent_data = change.document.to_dict()
+        if not telemetry_only_change(_watched_agents.get(agent_id), agent_data):
+            listing_changed = True
+        _watched_agents[agent_id] = agent_data
+    if listing_changed:
+        query_cache.invalidate()
+
+def _catalog_urls(db):
+    """URLs of every agent card, from the catalog mirror when it is enabled, else one projected read."""
+    if catalog is not None and catalog.wait_until_ready(CATALOG_LOAD_TIMEOUT):
+        return catalog.card_urls()
+    if db is None:
+        return []
+    return [(card_doc.to_dict() or {}).get('url') for card_doc in db.collection_group('agent_cards').select(['url']).stream()]
+
+def _start_health_prober(db):
+    """Starts probing the catalog's agents so dead ones can be filtered out of results."""
+    if health_prober is None:
+        return
+    try:
+        if health_prober.start(url_source=lambda: _catalog_urls(db)):
+            print("Agent health prober started.")
+    except Exception as e:
+        print(f"Error starting agent health prober; results are not filtered by health: {e}")
+
+def set_health_prober(prober):
+    """
+    Sets the prober whose liveness data filters search results when AGENT_FINDER_HEALTH_FILTER=1.
+    
+    Args:
+        prober: A HealthProber-like object (see health_prober)
+    """
+    global health_prober
+    health_prober = prober
+    if HEALTH_FILTER_ENABLED and db is not None:
+        _start_health_prober(db)
+
 def get_firestore_client():
-    """Get Firestore client, initializing if needed."""
+    """Get Firestore client, initializing if needed. Returns None when serving a snapshot without Firestore."""
     global db
-    if db is None:
-        _initialize_services()
+    if db is not None or _snapshot_only:
+        return db
+    with _init_lock:
+        if db is None and not _snapshot_only:
+            try:
+                _initialize_services()
+            except ConnectionError:
+                if not SNAPSHOT_PATH:
+                    raise
+                _start_snapshot_catalog()
+                if not _snapshot_only:
+                    raise
+                print(f"Firestore unavailable; serving agent searches from snapshot {SNAPSHOT_PATH}.")
+                return None
+            if db is not None:
+                if CATALOG_MIRROR_ENABLED or SNAPSHOT_PATH:
+                    _start_catalog(db)
+                _start_cache_invalidation(db)
+            if HEALTH_FILTER_ENABLED:
+                _start_health_prober(db)
     return db
 
-def get_agent_card(db, agent_id):
+def get_async_firestore_client():
+    """Get the Firestore AsyncClient used by the non-blocking finder tools, initializing if needed."""
+    global async_db
+    if async_db is None:
+        # Shares the Firebase app (and catalog mirror / cache invalidation) with the sync client used for listeners
+        get_firestore_client()
+        from firebase_admin import firestore_async
+        async_db = firestore_async.client()
+    return async_db
+
+def get_finder_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counters and size of the finder tool result cache."""
+    return query_cache.stats()
+
+def get_agent_catalog():
+    """Get the in-memory catalog mirror if it is enabled and loaded, otherwise None."""
+    get_firestore_client()
+    if catalog is not None and catalog.is_ready:
+        return catalog
+    return None
+
+async def get_agent_catalog_async():
     """
-    Retrieves the agent card for a given agent ID.
+    Non-blocking get_agent_catalog() for the finder tools.
     
-    Args:
-        db: Firestore client
-        agent_id: The agent ID to get the card for
+    The first call initializes Firebase and loads the catalog mirror (waiting up to
+    CATALOG_LOAD_TIMEOUT) on a worker thread instead of the event loop.
+    """
+    if db is None and not _snapshot_only:
+        await asyncio.to_thread(get_firestore_client)
+    return get_agent_catalog()
+
+def get_text_index():
+    """
+    Get the BM25 text index over agent names, descriptions and skills.
     
-    Returns:
-        Agent card dictionary or None if not found
+    Uses the catalog mirror's live index when available, otherwise a prebuilt
+    index file from AGENT_FINDER_TEXT_INDEX, otherwise an index built once from
+    a full read of the agents and their cards.
     """
-    try:
-        card_ref = db.collection('agents').document(agent_id).collection('agent_cards').document('card')
-        card_doc = card_ref.get()
-        
+    global text_index
+    catalog = get_agent_catalog()
+    if catalog is not None:
+        return catalog.text_index
+    
+    if text_index is None:
+        if TEXT_INDEX_PATH and os.path.exists(TEXT_INDEX_PATH):
+            text_index = TextIndex.load(TEXT_INDEX_PATH)
+        else:
+            db = get_firestore_client()
+            agents = {agent_data['agent_id']: agent_data for agent_data in _stream_agents(db.collection('agents'))}
+            cards = {}
+            for card_doc in db.collection_group('agent_cards').stream():
+                if card_doc.id == 'card':
+                    cards[card_doc.reference.parent.parent.id] = card_doc.to_dict()
+            text_index = TextIndex.from_catalog(agents, cards)
+    return text_index
+
+def _stream_agents(query):
+    """Streams a Firestore query on main agent documents as agent data dictionaries."""
+    for doc in query.stream():
+        agent_data = doc.to_dict()
+        agent_data['agent_id'] = doc.id
+        yield agent_data
+
+async def _get_card_chunk(async_db, agent_ids, field_paths=None):
+    """Fetches one chunk of agent cards with a single multi-document read."""
+    agents_ref = async_db.collection('agents')
+    card_refs = [
+        agents_ref.document(agent_id).collection('agent_cards').document('card')
+        for agent_id in agent_ids
+    ]
+    
+    cards = {}
+    async for card_doc in async_db.get_all(card_refs, field_paths=field_paths):
         if card_doc.exists:
+            # The card lives at agents/{agent_id}/agent_cards/card
+            agent_id = card_doc.reference.parent.parent.id
             agent_card = card_doc.to_dict()
             agent_card['agent_id'] = agent_id  # Add agent_id for reference
-            return agent_card
-        else:
-            return None
+            cards[agent_id] = agent_card
+    return cards
+
+async def get_agent_cards(async_db, agent_ids, field_paths=None):
+    """
+    Retrieves the agent cards for several agent IDs using batched reads.
+    
+    All card documents are pulled with one multi-get per chunk of
+    CARD_BATCH_SIZE references; multiple chunks are fetched concurrently.
+    
+    Args:
+        async_db: Firestore AsyncClient
+        agent_ids: The agent IDs to get cards for, in the desired result order
+        field_paths: Optional field mask limiting which card fields are downloaded
+    
+    Returns:
+        List of agent card dictionaries aligned with agent_ids (None where not found)
+    """
+    if not agent_ids:
+        return []
+    
+    unique_ids = list(dict.fromkeys(agent_ids))
+    chunks = [unique_ids[i:i + CARD_BATCH_SIZE] for i in range(0, len(unique_ids), CARD_BATCH_SIZE)]
+    
+    cards = {}
+    try:
+        for chunk_cards in await asyncio.gather(*(_get_card_chunk(async_db, chunk, field_paths) for chunk in chunks)):
+            cards.update(chunk_cards)
     except Exception as e:
-        print(f"Error retrieving agent card for {agent_id}: {e}")
+        print(f"Error retrieving agent cards for {len(unique_ids)} agents: {e}")
+    
+    # Each position gets its own card dict so callers can annotate results independently
+    return [dict(cards[agent_id]) if agent_id in cards else None for agent_id in agent_ids]
+
+def _catalog_matches(catalog, columns, rows, index_matches=None, single_capability=False):
+    """
+    Materializes ranked catalog rows as agent data dictionaries with their match info.
+    
+    Args:
+        catalog: The in-memory catalog mirror
+        columns: The ColumnarCatalog the rows were selected from
+        rows: Ranked row indices from ColumnarCatalog.top_k()
+        index_matches: Capability index matches used for scoring, if any
+        single_capability: Store the match as 'matched_capability' instead of 'matched_capabilities'
+    
+    Returns:
+        List of agent data dictionaries in ranked order
+    """
+    matches = []
+    for agent_id in columns.ids[rows]:
+        agent_data = catalog.get_agent(agent_id)
+        if agent_data is None:
+            # Removed by a snapshot update after the columns were built
+            continue
+        if index_matches is not None:
+            match_score, matched = index_matches[agent_id]
+            agent_data['capability_match_score'] = match_score
+            if single_capability:
+                agent_data['matched_capability'] = matched[0]
+            else:
+                agent_data['matched_capabilities'] = matched
+        matches.append(agent_data)
+    return matches
+
+async def _collect_matches(pager, accept, limit, scan=0):
+    """
+    Reads agents from an AsyncAgentPager until limit of them pass the accept() filter (and are not known to be dead).
+    
+    Matches ranked afterwards by match score must see at least the first scan agents
+    (the first page), so an exact match later in the page is not cut off by earlier
+    partial ones.
+    """
+    matches = []
+    read = 0
+    async for agent_data in pager:
+        read += 1
+        if accept(agent_data) and _agent_alive(agent_data):
+            matches.append(agent_data)
+        if len(matches) >= limit and read >= scan:
+            break
+    return matches
+
+def _accept_capability_match(agent_data, capability, partial_match):
+    """Applies single-capability partial matching to an agent, storing the match info on it."""
+    if not (capability and partial_match):
+        return True
+    
+    # Check for partial capability matches using main document capabilities
+    match_score, matched = score_capabilities(
+        [capability], agent_data.get('capabilities', []), lowered_capabilities(agent_data)
+    )
+    if match_score == 0:
+        return False
+    
+    # Store match info
+    agent_data['capability_match_score'] = match_score
+    agent_data['matched_capability'] = matched[0]
+    return True
+
+def _match_rank_key(sort_by):
+    """
+    Ranks matches by capability match score, then karma (desc), p95 latency (asc),
+    blended score (desc) or pricing (asc).
+    """
+    def rank_key(agent_data):
+        if sort_by == 'karma':
+            return (agent_data.get('capability_match_score', 0), agent_data.get('karma', 0))
+        if sort_by == 'latency':
+            latency = agent_data.get('latency_p95_ms')
+            return (agent_data.get('capability_match_score', 0), -(latency if latency is not None else float('inf')))
+        if sort_by == 'blended':
+            return (agent_data.get('capability_match_score', 0), blended_score(agent_data))
+        return (agent_data.get('capability_match_score', 0), -agent_data.get('agent_pricing', 0))
+    return rank_key
+
+def _client_ranked(sort_by, partial_match):
+    """Whether Firestore results must be ranked client-side (match scores, or the blended score no index holds)."""
+    return partial_match or sort_by == 'blended'
+
+def _catalog_sort_keys(columns, sort_by):
+    """The catalog mirror columns (and directions) matching _match_rank_key's ordering after the match score."""
+    if sort_by == 'karma':
+        return [(columns.karma, True)]
+    if sort_by == 'latency':
+        # Unmeasured agents (infinite latency) follow by karma, like _measured_first()
+        return [(columns.latency_order, False), (columns.karma, True)]
+    if sort_by == 'blended':
+        return [(columns.blended, True)]
+    return [(columns.pricing, False)]
+
+def _materialize_cards(winners, cards, describe):
+    """
+    Attaches search metadata to the agent cards of the ranked winners.
+    
+    Args:
+        winners: Winning agent data dictionaries from select_top_k(), best first
+        cards: Agent cards aligned with winners (None where not found)
+        describe: Function building the search metadata for an agent
+    
+    Returns:
+        List of agent cards in ranked order, skipping agents without a card (and, with
+        AGENT_FINDER_HEALTH_FILTER, agents whose health probes fail)
+    """
+    agent_cards = []
+    for agent_data, agent_card in zip(winners, cards):
+        if agent_card:
+            health = _agent_health(agent_card.get('url'))
+            if health is not None and not health['alive']:
+                continue
+            # Add search metadata to the agent card for reference
+            agent_card['search_metadata'] = describe(agent_data)
+            if health is not None:
+                agent_card['search_metadata']['health'] = health
+            agent_cards.append(agent_card)
+    return agent_cards
+
+def _agent_health(url):
+    """Latest probe result of an agent URL ({alive, rtt_ms, checked_at}), or None if unknown or disabled."""
+    if not _health_filtering() or not url:
+        return None
+    # Agents added after the prober started are probed from their first appearance on
+    health_prober.watch([url])
+    status = health_prober.status(url)
+    if status is None:
+        return None
+    return {key: status[key] for key in ('alive', 'rtt_ms', 'checked_at')}
+
+def _health_filtering():
+    return HEALTH_FILTER_ENABLED and health_prober is not None
+
+def _agent_alive(agent_data):
+    """False for agents whose health probes fail, which are left out before ranking (AGENT_FINDER_HEALTH_FILTER)."""
+    # Main agent documents carry agent_url, leaderboard entries the card's url
+    url = agent_data.get('agent_url') or agent_data.get('url')
+    return not (_health_filtering() and url) or health_prober.is_alive(url)
+
+def _health_slack():
+    """Extra catalog rows to rank so that dropping the dead agents among them still leaves limit results."""
+    return len(health_prober.dead_urls()) if _health_filtering() else 0
+
+def _live_rows(catalog, columns, rows):
+    """Drops ranked catalog rows of agents whose health probes fail."""
+    if not _health_filtering():
+        return rows
+    return rows[[_agent_alive(catalog.get_agent(agent_id) or {}) for agent_id in columns.ids[rows]]]
+
+def _live_leaderboard(entries, limit):
+    """
+    Drops dead agents from leaderboard entries read with _leaderboard_read_size().
+    
+    Returns:
+        The first limit live entries, or None when a full board has fewer (live agents beyond
+        the stored entries would be needed, so the caller queries instead)
+    """
+    if entries is None or not _health_filtering():
+        return entries
+    live = [entry for entry in entries if _agent_alive(entry)]
+    if len(live) < limit and len(entries) >= LEADERBOARD_SIZE:
+        return None
+    return live[:limit]
+
+def _leaderboard_read_size(limit):
+    # With the health filter the whole board is read, so dead agents can be replaced from it
+    return LEADERBOARD_SIZE if _health_filtering() else limit
+
+def _winner_ids(winners):
+    return [agent_data['agent_id'] for agent_data in winners]
+
+def _use_leaderboard(sort_by, limit, tool_sorts):
+    # tool_sorts: the sorts the calling tool ranks by itself; any other board would answer a different question
+    return (
+        LEADERBOARDS_ENABLED and sort_by in tool_sorts and sort_by in LEADERBOARD_SORTS
+        and 0 < limit <= LEADERBOARD_SIZE
+    )
+
+def _leaderboard_matches(entries):
+    """Marks leaderboard entries so their embedded card summaries can stand in for agent cards."""
+    if entries is None:
+        return None
+    for entry in entries:
+        entry['_from_leaderboard'] = True
+    return entries
+
+async def _leaderboard_entries(async_db, sort_by, capability, limit, tool_sorts):
+    """
+    Reads ranked winners from a materialized leaderboard (see leaderboards.py).
+    
+    Args:
+        tool_sorts: Sorts the calling tool supports; other sort_by values never read a board
+    
+    Returns:
+        Leaderboard entries usable as agent data, or None if leaderboards are disabled or the
+        board cannot answer (not built yet, or holding fewer agents than limit)
+    """
+    if not _use_leaderboard(sort_by, limit, tool_sorts):
         return None
+    try:
+        entries = await get_leaderboard(async_db, sort_by, capability or None, _leaderboard_read_size(limit))
+        return _leaderboard_matches(_live_leaderboard(entries, limit))
+    except Exception as e:
+        print(f"Error reading {sort_by} leaderboard for {capability}; querying instead: {e}")
+        return None
+
+def _leaderboard_cards(winners, field_paths):
+    """
+    Rebuilds agent cards from the card summaries embedded in leaderboard entries, which
+    is all the summary and connect projections use.
+    
+    Returns:
+        Agent cards aligned with winners, or None when full cards are requested or some
+        winner was not read from a leaderboard (the cards must then be read from Firestore)
+    """
+    if field_paths is None or not all(agent_data.get('_from_leaderboard') for agent_data in winners):
+        return None
+    return [
+        {
+            'agent_id': entry['agent_id'],
+            'name': entry.get('name'),
+            'url': entry.get('url'),
+            'skills': [{'name': skill} for skill in entry.get('skills') or []],
+        }
+        for entry in winners
+    ]
+
+def _token_prefilter(query, capabilities):
+    """Narrows a partial-match query to agents sharing a capability token, if the prefilter is enabled."""
+    tokens = required_tokens(capabilities)
+    if not (TOKEN_PREFILTER_ENABLED and tokens):
+        return query
+    return query.where('capability_tokens', 'array_contains_any', tokens)
+
+# --- comprehensive_agent_search ---
+
+def _search_catalog(catalog, capabilities, max_price, min_karma, sort_by, sort_order, limit,
+                    agent_name_contains, partial_match, position):
+    """Runs a comprehensive search against the catalog mirror. Returns (matches, next_page_token)."""
+    # Vectorized filtering and top-k ranking over the in-memory mirror. Partial
+    # capability matches come from the n-gram index over the whole catalog.
+    columns = catalog.columns()
+    index_matches = None
+    sort_keys = []
+    if capabilities and partial_match:
+        index_matches = catalog.match_capabilities(capabilities)
+        agent_ids = index_matches.keys()
+        sort_keys.append((columns.match_scores(index_matches), True))
+        sort_keys.append((columns.karma, True) if sort_by == 'karma' else (columns.pricing, False))
+    else:
+        agent_ids = catalog.agents_with_capabilities(capabilities) if capabilities else None
+    if sort_by in ['karma', 'agent_pricing', 'agent_name']:
+        sort_keys.append((columns.column(sort_by), sort_order == 'desc'))
+    
+    mask = columns.filter_mask(agent_ids=agent_ids, max_price=max_price, min_karma=min_karma)
+    
+    text_scores = None
+    if agent_name_contains:
+        # Free text keeps agents whose name/description contains it or that match it
+        # in the BM25 index, and text relevance ranks right after capability match
+        text_scores = columns.score_column(catalog.text_index.scores(agent_name_contains))
+        mask &= columns.contains_mask(agent_name_contains) | (text_scores > 0)
+        sort_keys.insert(1 if index_matches is not None else 0, (text_scores, True))
+    
+    # Mirror pages are offsets into the ranking; one extra row tells whether more remain
+    if 'after' in position:
+        raise ValueError("Page token was issued for a Firestore query; restart the search without it")
+    offset = int(position.get('offset', 0))
+    next_page_token = None
+    rows = _live_rows(catalog, columns, columns.top_k(mask, sort_keys, offset + limit + 1 + _health_slack()))
+    if len(rows) > offset + limit:
+        next_page_token = encode_page_token({'offset': offset + limit})
+    rows = rows[offset:offset + limit]
+    
+    matches = _catalog_matches(catalog, columns, rows, index_matches)
+    if text_scores is not None:
+        for agent_data, text_score in zip(matches, text_scores[rows]):
+            agent_data['text_score'] = round(float(text_score), 4)
+    return matches, next_page_token
+
+def _search_query(agents_ref, capabilities, max_price, min_karma, sort_by, sort_order, limit,
+                  agent_name_contains, partial_match):
+    """
+    Builds the Firestore query for a comprehensive search.
+    
+    Returns:
+        Tuple of (query, page_size, read_budget) for the pager
+    """
+    # Start building the query on main agent documents
+    query = agents_ref
+    
+    # First, try exact matches for capabilities if specified
+    if capabilities and not partial_match:
+        for capability in capabilities:
+            query = query.where('capabilities', 'array_contains', capability)
+    elif capabilities:
+        query = _token_prefilter(query, capabilities)
+    
+    # Apply price filter (uses single-field index)
+    if max_price is not None:
+        query = query.where('agent_pricing', '<=', max_price)
+    
+    # Apply karma filter (uses single-field index)
+    if min_karma is not None:
+        query = query.where('karma', '>=', min_karma)
+    
+    # Apply sorting (uses composite indices for multi-field queries)
+    if sort_by in ['karma', 'agent_pricing', 'agent_name']:
+        query = query.order_by(sort_by, direction=firestore.Query.DESCENDING if sort_order == 'desc' else firestore.Query.ASCENDING)
+    
+    # Page through the query with cursors. Client-side filters start with a limit*3 page
+    # and keep reading until limit matches are found or the read budget is spent; matches
+    # ranked by capability match score always see the whole first page.
+    client_side_filter = bool(capabilities and partial_match) or bool(agent_name_contains)
+    if client_side_filter:
+        return query, limit * 3, max(READ_BUDGET, limit)
+    # Room to skip the agents known to be dead and still return limit of them
+    page_size = limit + _health_slack()
+    return query, page_size, page_size
+
+def _accept_search_match(agent_data, capabilities, partial_match, agent_name_contains):
+    """Applies the client-side filters of a comprehensive search, storing match info on the agent."""
+    # Apply capability partial matching if enabled (using main document capabilities)
+    if capabilities and partial_match:
+        capability_matches, matched_capabilities = score_capabilities(
+            capabilities, agent_data.get('capabilities', []), lowered_capabilities(agent_data)
+        )
+        
+        # Only include agents with at least one capability match
+        if capability_matches == 0:
+            return False
+            
+        # Store match info for potential use
+        agent_data['capability_match_score'] = capability_matches
+        agent_data['matched_capabilities'] = matched_capabilities
+    
+    # Apply name filter with partial matching (using main document fields)
+    if agent_name_contains:
+        agent_name = agent_data.get('agent_name', '')
+        description = agent_data.get('description', '')
+        
+        # Check name and description for partial matches
+        if (agent_name_contains.lower() not in agent_name.lower() and 
+            agent_name_contains.lower() not in description.lower()):
+            return False
+    
+    return True
+
+def _search_metadata(agent_data):
+    """Search metadata attached to comprehensive search results for reference."""
+    return {
+        'capability_match_score': agent_data.get('capability_match_score'),
+        'matched_capabilities': agent_data.get('matched_capabilities'),
+        'searched_karma': agent_data.get('karma'),
+        'searched_pricing': agent_data.get('agent_pricing'),
+        'searched_name': agent_data.get('agent_name'),
+        'searched_capabilities': agent_data.get('capabilities'),
+        'text_score': agent_data.get('text_score'),
+        **_performance_metadata(agent_data)
+    }
+
+async def _search_agents(
+    capabilities: Optional[List[str]] = None,
+    max_price: Optional[float] = None,
+    min_karma: Optional[int] = None,
+    sort_by: str = "karma",
+    sort_order: str = "desc",
+    limit: int = 10,
+    agent_name_contains: Optional[str] = None,
+    partial_match: bool = True,
+    page_token: Optional[str] = None,
+    projection: str = "full",
+    paginated: bool = False
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Shared implementation of comprehensive_agent_search and search_agents_paginated.
+    
+    Partial-match results are ranked by match score over the whole first page of the
+    Firestore query. Paginated searches instead stop at limit matches so the next page
+    resumes right after them, and each page is ranked on its own.
+    
+    Returns:
+        Tuple of (agent cards in the requested projection, continuation token or None when
+        there are no more results)
+    
+    Raises:
+        ValueError: If page_token or projection is invalid for the current search backend
+    """
+    field_paths = card_field_paths(projection)
+    catalog = await get_agent_catalog_async()
+    position = decode_page_token(page_token)
+    
+    if catalog is not None:
+        # Catalog mirror searches are pure in-memory work and come back ranked
+        winners, next_page_token = _search_catalog(
+            catalog, capabilities, max_price, min_karma, sort_by, sort_order, limit,
+            agent_name_contains, partial_match, position
+        )
+        cards = catalog.get_cards(_winner_ids(winners))
+        return project_cards(_materialize_cards(winners, cards, _search_metadata), projection), next_page_token
+    
+    if 'offset' in position:
+        raise ValueError("Page token was issued for the catalog mirror; restart the search without it")
+    async_db = get_async_firestore_client()
+    query, page_size, read_budget = _search_query(
+        async_db.collection('agents'), capabilities, max_price, min_karma, sort_by, sort_order, limit,
+        agent_name_contains, partial_match
+    )
+    
+    # Execute query on main agent documents, collecting the matching agents before reading their cards
+    pager = AsyncAgentPager(async_db, query, page_size=page_size, read_budget=read_budget, page_token=page_token)
+    matches = await _collect_matches(
+        pager, lambda agent_data: _accept_search_match(agent_data, capabilities, partial_match, agent_name_contains), limit,
+        scan=page_size if capabilities and partial_match and not paginated else 0
+    )
+    
+    # Rank lightweight matches first, then read the agent cards for the winners only
+    # in one batched read (return format)
+    winners = select_top_k(matches, limit, _match_rank_key(sort_by) if capabilities and partial_match else None)
+    cards = await get_agent_cards(async_db, _winner_ids(winners), field_paths)
+    return project_cards(_materialize_cards(winners, cards, _search_metadata), projection), pager.next_page_token()
 
-def comprehensive_agent_search(
+@cached_tool(query_cache, {
+    'capabilities': normalize_capabilities,
+    'sort_by': normalize_lower,
+    'sort_order': normalize_lower,
+    'agent_name_contains': normalize_lower,
+    'projection': normalize_lower,
+})
+async def comprehensive_agent_search(
     capabilities: Optional[List[str]] = None,
     max_price: Optional[float] = None,
     min_karma: Optional[int] = None,
@@ -76,7 +788,8 @@ def comprehensive_agent_search(
     sort_order: str = "desc",
     limit: int = 10,
     agent_name_contains: Optional[str] = None,
-    partial_match: bool = True
+    partial_match: bool = True,
+    projection: str = "full"
 ) -> List[Dict[str, Any]]:
     """
     Search for agents based on capabilities, pricing, karma, and other criteria from main agent documents.
@@ -89,158 +802,324 @@ def comprehensive_agent_search(
         sort_by: Field to sort by ("karma", "agent_pricing", "agent_name")
         sort_order: Sort order ("asc" or "desc")
         limit: Maximum number of results to return
-        agent_name_contains: Filter agents whose name contains this string
+        agent_name_contains: Filter agents whose name or description contains this string; with the
+            catalog mirror, free-text matches are also ranked by BM25 relevance
         partial_match: If True, uses partial matching for capabilities
+        projection: Result shape: "full" agent cards, "summary" (name, URL, price, karma,
+            matched capabilities and skill names) or "connect" (ID and URL only)
     
     Returns:
         List of agent card dictionaries in agent2agent protocol format
     """
     try:
-        db = get_firestore_client()
-        agents_ref = db.collection('agents')
-        
-        # Start building the query on main agent documents
-        query = agents_ref
-        
-        # First, try exact matches for capabilities if specified
-        if capabilities and not partial_match:
-            for capability in capabilities:
-                query = query.where('capabilities', 'array_contains', capability)
-        
-        # Apply price filter (uses single-field index)
-        if max_price is not None:
-            query = query.where('agent_pricing', '<=', max_price)
-        
-        # Apply karma filter (uses single-field index)
-        if min_karma is not None:
-            query = query.where('karma', '>=', min_karma)
+        agent_cards, _ = await _search_agents(
+            capabilities=capabilities,
+            max_price=max_price,
+            min_karma=min_karma,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            agent_name_contains=agent_name_contains,
+            partial_match=partial_match,
+            projection=projection
+        )
+        return agent_cards
         
-        # Apply sorting (uses composite indices for multi-field queries)
-        if sort_by in ['karma', 'agent_pricing', 'agent_name']:
-            query = query.order_by(sort_by, direction=firestore.Query.DESCENDING if sort_order == 'desc' else firestore.Query.ASCENDING)
+    except Exception as e:
+        print(f"Error searching agents: {e}")
+        return []
+
+@cached_tool(query_cache, {
+    'capabilities': normalize_capabilities,
+    'sort_by': normalize_lower,
+    'sort_order': normalize_lower,
+    'agent_name_contains': normalize_lower,
+    'projection': normalize_lower,
+})
+async def search_agents_paginated(
+    capabilities: Optional[List[str]] = None,
+    max_price: Optional[float] = None,
+    min_karma: Optional[int] = None,
+    sort_by: str = "karma",
+    sort_order: str = "desc",
+    limit: int = 10,
+    agent_name_contains: Optional[str] = None,
+    partial_match: bool = True,
+    page_token: Optional[str] = None,
+    projection: str = "full"
+) -> Dict[str, Any]:
+    """
+    Same search as comprehensive_agent_search, returned one page at a time.
+    Pass the returned next_page_token back to fetch the following page. Without the
+    catalog mirror, partial matches are ranked by match score within each page.
+    
+    Args:
+        capabilities: List of required capabilities for exact or partial matching
+        max_price: Maximum acceptable price per request in tokens
+        min_karma: Minimum karma score required
+        sort_by: Field to sort by ("karma", "agent_pricing", "agent_name")
+        sort_order: Sort order ("asc" or "desc")
+        limit: Maximum number of results to return
+        agent_name_contains: Filter agents whose name or description contains this string; with the
+            catalog mirror, free-text matches are also ranked by BM25 relevance
+        partial_match: If True, uses partial matching for capabilities
+        page_token: Continuation token from a previous call with the same search arguments
+        projection: Result shape: "full" agent cards, "summary" (name, URL, price, karma,
+            matched capabilities and skill names) or "connect" (ID and URL only)
+    
+    Returns:
+        Dictionary with 'agents' (agent cards in agent2agent protocol format) and
+        'next_page_token' (None when there are no more results)
+    """
+    try:
+        agent_cards, next_page_token = await _search_agents(
+            capabilities=capabilities,
+            max_price=max_price,
+            min_karma=min_karma,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            agent_name_contains=agent_name_contains,
+            partial_match=partial_match,
+            page_token=page_token,
+            projection=projection,
+            paginated=True
+        )
+        return {'agents': agent_cards, 'next_page_token': next_page_token}
         
-        # For partial matching or when no capabilities specified, get more results to filter client-side
-        query_limit = limit * 3 if (capabilities and partial_match) else limit
-        query = query.limit(query_limit)
+    except Exception as e:
+        print(f"Error searching agents: {e}")
+        return {'agents': [], 'next_page_token': None, 'error': str(e)}
+
+@cached_tool(query_cache, {'query': normalize_lower, 'projection': normalize_lower})
+async def search_agents_by_text(query: str, limit: int = 10, projection: str = "full") -> List[Dict[str, Any]]:
+    """
+    Free-text relevance search over agent names, descriptions and skill descriptions, tags and examples.
+    Results are ranked with BM25 and returned as agent cards in Google's agent2agent protocol format.
+    
+    Args:
+        query: What the user is looking for, in their own words (e.g. "hotels for rainy weather in Paris")
+        limit: Maximum number of results to return
+        projection: Result shape: "full" agent cards, "summary" (name, URL, price, karma,
+            matched capabilities and skill names) or "connect" (ID and URL only)
+    
+    Returns:
+        List of agent card dictionaries in agent2agent protocol format, most relevant first
+    """
+    try:
+        field_paths = card_field_paths(projection)
+        catalog = await get_agent_catalog_async()
         
-        # Execute query on main agent documents
-        results = query.stream()
+        if catalog is not None:
+            hits = catalog.text_index.search(query, limit=limit)
+            cards = catalog.get_cards([agent_id for agent_id, _ in hits])
+        else:
+            # The index is in memory once built; the first call may build it from Firestore,
+            # so run it off the event loop
+            hits = (await asyncio.to_thread(get_text_index)).search(query, limit=limit)
+            cards = await get_agent_cards(get_async_firestore_client(), [agent_id for agent_id, _ in hits], field_paths)
         
-        # Process results and get agent cards
         agent_cards = []
-        for doc in results:
-            agent_data = doc.to_dict()
-            agent_data['agent_id'] = doc.id
-            
-            # Apply capability partial matching if enabled (using main document capabilities)
-            if capabilities and partial_match:
-                agent_capabilities = agent_data.get('capabilities', [])
-                capability_matches = 0
-                matched_capabilities = []
-                
-                for required_cap in capabilities:
-                    # Check for exact matches first
-                    if required_cap in agent_capabilities:
-                        capability_matches += 2  # Higher weight for exact matches
-                        matched_capabilities.append(f"{required_cap} (exact)")
-                    else:
-                        # Check for partial matches
-                        for agent_cap in agent_capabilities:
-                            if (required_cap.lower() in agent_cap.lower() or 
-                                agent_cap.lower() in required_cap.lower()):
-                                capability_matches += 1  # Lower weight for partial matches
-                                matched_capabilities.append(f"{required_cap} → {agent_cap} (partial)")
-                                break
-                
-                # Only include agents with at least one capability match
-                if capability_matches == 0:
-                    continue
-                    
-                # Store match info for potential use
-                agent_data['capability_match_score'] = capability_matches
-                agent_data['matched_capabilities'] = matched_capabilities
-            
-            # Apply name filter with partial matching (using main document fields)
-            if agent_name_contains:
-                agent_name = agent_data.get('agent_name', '')
-                description = agent_data.get('description', '')
-                
-                # Check name and description for partial matches
-                if (agent_name_contains.lower() not in agent_name.lower() and 
-                    agent_name_contains.lower() not in description.lower()):
-                    continue
-            
-            # Get the agent card for this agent (return format)
-            agent_card = get_agent_card(db, doc.id)
+        for (agent_id, text_score), agent_card in zip(hits, cards):
             if agent_card:
                 # Add search metadata to the agent card for reference
                 agent_card['search_metadata'] = {
-                    'capability_match_score': agent_data.get('capability_match_score'),
-                    'matched_capabilities': agent_data.get('matched_capabilities'),
-                    'searched_karma': agent_data.get('karma'),
-                    'searched_pricing': agent_data.get('agent_pricing'),
-                    'searched_name': agent_data.get('agent_name'),
-                    'searched_capabilities': agent_data.get('capabilities')
+                    'text_score': round(text_score, 4),
+                    'search_query': query
                 }
                 agent_cards.append(agent_card)
         
-        # Sort by capability match score if partial matching was used (using search metadata)
-        if capabilities and partial_match:
-            agent_cards.sort(key=lambda x: (
-                x.get('search_metadata', {}).get('capability_match_score', 0),
-                x.get('search_metadata', {}).get('searched_karma', 0) if sort_by == 'karma' else -x.get('search_metadata', {}).get('searched_pricing', 0)
-            ), reverse=True)
-        
-        # Limit final results
-        agent_cards = agent_cards[:limit]
-        
-        return agent_cards
+        return project_cards(agent_cards, projection)
         
     except Exception as e:
-        print(f"Error searching agents: {e}")
+        print(f"Error searching agents by text '{query}': {e}")
         return []
 
-def get_agent_by_id(agent_id: str) -> Optional[Dict[str, Any]]:
+# --- get_agent_by_id ---
+
+@cached_tool(query_cache, {'projection': normalize_lower})
+async def get_agent_by_id(agent_id: str, projection: str = "full") -> Optional[Dict[str, Any]]:
     """
     Retrieve a specific agent card by its ID.
     Returns the full agent card in Google's agent2agent protocol format.
     
     Args:
         agent_id: The unique identifier of the agent
+        projection: Result shape: "full" agent cards, "summary" (name, URL, price, karma,
+            matched capabilities and skill names) or "connect" (ID and URL only)
     
     Returns:
         Agent card dictionary in agent2agent protocol format or None if not found
     """
     try:
-        db = get_firestore_client()
+        field_paths = card_field_paths(projection)
+        catalog = await get_agent_catalog_async()
+        async_db = None if catalog is not None else get_async_firestore_client()
         
         # Get the agent card directly
-        agent_card = get_agent_card(db, agent_id)
+        if catalog is not None:
+            agent_card = catalog.get_card(agent_id)
+        else:
+            agent_card = (await get_agent_cards(async_db, [agent_id], field_paths))[0]
         if agent_card:
-            return agent_card
+            return project_card(agent_card, projection)
         
         # Fallback: if no agent card exists, try to get basic agent data
-        doc_ref = db.collection('agents').document(agent_id)
-        doc = doc_ref.get()
-        
-        if doc.exists:
-            agent_data = doc.to_dict()
-            agent_data['agent_id'] = doc.id
-            # Return basic data with a note that it's not in agent card format
-            agent_data['_note'] = "Agent card not available, returning basic agent data"
-            return agent_data
+        if catalog is not None:
+            agent_data = catalog.get_agent(agent_id)
         else:
-            return None
+            doc = await async_db.collection('agents').document(agent_id).get()
+            agent_data = doc.to_dict() if doc.exists else None
+        
+        return _basic_agent_data(agent_id, agent_data, projection)
             
     except Exception as e:
         print(f"Error retrieving agent {agent_id}: {e}")
         return None
 
-def get_top_agents_by_capability(
+def _basic_agent_data(agent_id, agent_data, projection="full"):
+    """Returns main agent document data flagged as not being in agent card format, or None."""
+    if agent_data is None:
+        return None
+    agent_data['agent_id'] = agent_id
+    if projection != 'full':
+        return project_card(agent_data, projection)
+    # Return basic data with a note that it's not in agent card format
+    agent_data['_note'] = "Agent card not available, returning basic agent data"
+    return agent_data
+
+# --- get_top_agents_by_capability ---
+
+def _top_agents_catalog(catalog, capability, limit, sort_by, partial_match):
+    """Ranks the top agents for a capability against the catalog mirror."""
+    # Vectorized top-k ranking over the in-memory mirror. Partial matches come
+    # from the n-gram index over the whole catalog.
+    columns = catalog.columns()
+    index_matches = None
+    sort_keys = []
+    if partial_match:
+        index_matches = catalog.match_capabilities([capability])
+        agent_ids = index_matches.keys()
+        sort_keys.append((columns.match_scores(index_matches), True))
+    else:
+        agent_ids = catalog.agents_with_capabilities([capability])
+    if partial_match or sort_by in TOP_AGENT_SORTS:
+        sort_keys.extend(_catalog_sort_keys(columns, sort_by))
+    
+    rows = columns.top_k(columns.filter_mask(agent_ids=agent_ids), sort_keys, limit + _health_slack())
+    rows = _live_rows(catalog, columns, rows)[:limit]
+    return _catalog_matches(catalog, columns, rows, index_matches, single_capability=True)
+
+# Firestore ordering of each top agents sort. Latency orders by the p95 the communicator measured
+# (see communicator/telemetry.py); order_by leaves agents never measured out, so they are read by
+# a second, karma-ordered query (_latency_fill_query). The blended score is computed client-side
+# from a karma-ordered read.
+TOP_AGENT_SORTS = {
+    'karma': ('karma', firestore.Query.DESCENDING),
+    'agent_pricing': ('agent_pricing', firestore.Query.ASCENDING),
+    'latency': ('latency_p95_ms', firestore.Query.ASCENDING),
+    'blended': ('karma', firestore.Query.DESCENDING),
+}
+
+def _top_agents_query(agents_ref, capability, limit, sort_by, partial_match):
+    """
+    Builds the Firestore query for the top agents with a capability.
+    
+    Returns:
+        Tuple of (query, page_size, read_budget) for the pager
+    """
+    if not partial_match:
+        # Use exact matching with composite indices on main agent documents
+        query = agents_ref.where('capabilities', 'array_contains', capability)
+        if sort_by in TOP_AGENT_SORTS:
+            field, direction = TOP_AGENT_SORTS[sort_by]
+            query = query.order_by(field, direction=direction)
+        if sort_by == 'blended':
+            # No index holds the blended score: rank a karma-ordered window of the catalog client-side
+            return query, limit * 5, max(READ_BUDGET, limit)
+        # Room to skip the agents known to be dead and still return limit of them
+        page_size = limit + _health_slack()
+        return query, page_size, page_size
+    
+    # For partial matching, filter client-side
+    query = _token_prefilter(agents_ref, [capability])
+    if sort_by in TOP_AGENT_SORTS:
+        field, direction = TOP_AGENT_SORTS[sort_by]
+        query = query.order_by(field, direction=direction)
+    
+    # Partial matching reads at least the first limit*5 page, then pages on until limit
+    # matches are found or the read budget is spent
+    return query, limit * 5, max(READ_BUDGET, limit)
+
+def _latency_fill_query(agents_ref, capability, limit, partial_match):
+    """
+    Builds the karma-ordered query for the agents a latency-ordered query leaves out (never measured).
+    
+    Returns:
+        Tuple of (query, page_size, read_budget) for the pager; measured agents it returns are skipped
+    """
+    if partial_match:
+        query, page_size = _token_prefilter(agents_ref, [capability]), limit * 5
+    else:
+        query, page_size = agents_ref.where('capabilities', 'array_contains', capability), limit
+    return query.order_by('karma', direction=firestore.Query.DESCENDING), page_size, max(READ_BUDGET, limit)
+
+async def _measured_first(measured, fill):
+    """Chains the agents of a latency-ordered pager with the unmeasured agents of a fill pager, read only when needed."""
+    async for agent_data in measured:
+        yield agent_data
+    async for agent_data in fill:
+        if agent_data.get('latency_p95_ms') is None:
+            yield agent_data
+
+def _top_agents_metadata(agent_data, capability):
+    """Search metadata attached to top agents results for reference."""
+    return {
+        'capability_match_score': agent_data.get('capability_match_score'),
+        'matched_capability': agent_data.get('matched_capability'),
+        'search_capability': capability,
+        'searched_karma': agent_data.get('karma'),
+        'searched_pricing': agent_data.get('agent_pricing'),
+        'searched_capabilities': agent_data.get('capabilities'),
+        **_performance_metadata(agent_data)
+    }
+
+def _performance_metadata(agent_data):
+    """Measured latency and reliability of an agent, when the communicator has reported any."""
+    if agent_data.get('telemetry_calls') is None:
+        return {}
+    return {
+        'latency_p50_ms': agent_data.get('latency_p50_ms'),
+        'latency_p95_ms': agent_data.get('latency_p95_ms'),
+        'success_rate': agent_data.get('success_rate'),
+        'blended_score': round(blended_score(agent_data), 2),
+    }
+
+async def _top_agents_matches(async_db, capability, limit, sort_by, partial_match):
+    """Runs one capability's top agents query against Firestore, without reading cards."""
+    if not partial_match:
+        entries = await _leaderboard_entries(async_db, sort_by, capability, limit, TOP_AGENT_SORTS)
+        if entries is not None:
+            return entries
+    query, page_size, read_budget = _top_agents_query(async_db.collection('agents'), capability, limit, sort_by, partial_match)
+    pager = AsyncAgentPager(async_db, query, page_size=page_size, read_budget=read_budget)
+    if sort_by == 'latency':
+        fill_query, fill_page_size, fill_budget = _latency_fill_query(async_db.collection('agents'), capability, limit, partial_match)
+        pager = _measured_first(
+            pager, AsyncAgentPager(async_db, fill_query, page_size=fill_page_size, read_budget=fill_budget)
+        )
+    return await _collect_matches(
+        pager, lambda agent_data: _accept_capability_match(agent_data, capability, partial_match),
+        read_budget if sort_by == 'blended' else limit, scan=page_size if partial_match else 0
+    )
+
+@cached_tool(query_cache, {'sort_by': normalize_lower, 'projection': normalize_lower})
+async def get_top_agents_by_capability(
     capability: str,
     limit: int = 5,
     sort_by: str = "karma",
-    partial_match: bool = True
+    partial_match: bool = True,
+    projection: str = "full"
 ) -> List[Dict[str, Any]]:
     """
     Get the top agent cards with a specific capability by searching main agent documents.
@@ -249,105 +1128,242 @@ def get_top_agents_by_capability(
     Args:
         capability: The specific capability to search for
         limit: Number of top agents to return
-        sort_by: Sort criteria ("karma" or "agent_pricing")
+        sort_by: Sort criteria ("karma", "agent_pricing", "latency" for the fastest measured agents
+            (p95 response time; agents not measured yet follow by karma) or "blended" for karma
+            discounted by measured latency and success rate)
         partial_match: If True, includes partial matches for capabilities
+        projection: Result shape: "full" agent cards, "summary" (name, URL, price, karma,
+            matched capabilities and skill names) or "connect" (ID and URL only)
     
     Returns:
         List of top agent cards with the specified capability in agent2agent protocol format
     """
     try:
-        db = get_firestore_client()
-        agents_ref = db.collection('agents')
+        field_paths = card_field_paths(projection)
+        catalog = await get_agent_catalog_async()
         
-        if not partial_match:
-            # Use exact matching with composite indices on main agent documents
-            if sort_by == "karma":
-                query = agents_ref.where('capabilities', 'array_contains', capability).order_by('karma', direction=firestore.Query.DESCENDING).limit(limit)
-            elif sort_by == "agent_pricing":
-                query = agents_ref.where('capabilities', 'array_contains', capability).order_by('agent_pricing', direction=firestore.Query.ASCENDING).limit(limit)
-            else:
-                query = agents_ref.where('capabilities', 'array_contains', capability).limit(limit)
+        if catalog is not None:
+            # Catalog mirror searches are pure in-memory work and come back ranked
+            winners = _top_agents_catalog(catalog, capability, limit, sort_by, partial_match)
+            cards = catalog.get_cards(_winner_ids(winners))
         else:
-            # For partial matching, get more results and filter client-side
-            query_limit = limit * 5  # Get more results for better partial matching
-            if sort_by == "karma":
-                query = agents_ref.order_by('karma', direction=firestore.Query.DESCENDING).limit(query_limit)
-            elif sort_by == "agent_pricing":
-                query = agents_ref.order_by('agent_pricing', direction=firestore.Query.ASCENDING).limit(query_limit)
-            else:
-                query = agents_ref.limit(query_limit)
+            # Execute query on main agent documents, then rank the lightweight matches and
+            # read the agent cards for the winners only in one batched read (return format)
+            async_db = get_async_firestore_client()
+            matches = await _top_agents_matches(async_db, capability, limit, sort_by, partial_match)
+            winners = select_top_k(matches, limit, _match_rank_key(sort_by) if _client_ranked(sort_by, partial_match) else None)
+            cards = _leaderboard_cards(winners, field_paths)
+            if cards is None:
+                cards = await get_agent_cards(async_db, _winner_ids(winners), field_paths)
+        agent_cards = _materialize_cards(winners, cards, lambda agent_data: _top_agents_metadata(agent_data, capability))
+        return project_cards(agent_cards, projection)
         
-        # Execute query on main agent documents
-        results = query.stream()
-        
-        agent_cards = []
-        for doc in results:
-            agent_data = doc.to_dict()
-            agent_data['agent_id'] = doc.id
-            
-            if partial_match:
-                # Check for partial capability matches using main document capabilities
-                agent_capabilities = agent_data.get('capabilities', [])
-                match_found = False
-                match_score = 0
-                matched_capability = None
-                
-                # Check for exact match first
-                if capability in agent_capabilities:
-                    match_found = True
-                    match_score = 2
-                    matched_capability = f"{capability} (exact)"
-                else:
-                    # Check for partial matches
-                    for agent_cap in agent_capabilities:
-                        if (capability.lower() in agent_cap.lower() or 
-                            agent_cap.lower() in capability.lower()):
-                            match_found = True
-                            match_score = 1
-                            matched_capability = f"{capability} → {agent_cap} (partial)"
-                            break
-                
-                if not match_found:
-                    continue
-                    
-                # Store match info
-                agent_data['capability_match_score'] = match_score
-                agent_data['matched_capability'] = matched_capability
-            
-            # Get the agent card for this agent (return format)
-            agent_card = get_agent_card(db, doc.id)
-            if agent_card:
-                # Add search metadata to the agent card for reference
-                agent_card['search_metadata'] = {
-                    'capability_match_score': agent_data.get('capability_match_score'),
-                    'matched_capability': agent_data.get('matched_capability'),
-                    'search_capability': capability,
-                    'searched_karma': agent_data.get('karma'),
-                    'searched_pricing': agent_data.get('agent_pricing'),
-                    'searched_capabilities': agent_data.get('capabilities')
-                }
-                agent_cards.append(agent_card)
+    except Exception as e:
+        print(f"Error getting top agents for capability {capability}: {e}")
+        return []
+
+# --- get_top_agents_by_capabilities ---
+
+def _multi_capability_winners(matches_by_capability, limit, sort_by, partial_match):
+    """Ranks each capability's matches, returning the winners per capability."""
+    rank_key = _match_rank_key(sort_by) if _client_ranked(sort_by, partial_match) else None
+    return {
+        capability: select_top_k(matches, limit, rank_key)
+        for capability, matches in matches_by_capability.items()
+    }
+
+def _multi_capability_winner_list(winners_by_capability):
+    """Flattens per-capability winners in the order _multi_capability_results() expects cards."""
+    return [agent_data for winners in winners_by_capability.values() for agent_data in winners]
+
+def _multi_capability_ids(winners_by_capability):
+    """Flattens per-capability winners into one agent ID list for a single batched card read."""
+    return _winner_ids(_multi_capability_winner_list(winners_by_capability))
+
+def _multi_capability_results(winners_by_capability, cards, projection):
+    """
+    Splits one batched card read back into per-capability top agent lists.
+    
+    Agents that rank for several capabilities are flagged in their search metadata
+    with the other capabilities they also cover.
+    """
+    results = {}
+    position = 0
+    for capability, winners in winners_by_capability.items():
+        capability_cards = cards[position:position + len(winners)]
+        position += len(winners)
+        results[capability] = _materialize_cards(
+            winners, capability_cards, lambda agent_data: _top_agents_metadata(agent_data, capability)
+        )
+    
+    capabilities_by_agent = {}
+    for capability, agent_cards in results.items():
+        for agent_card in agent_cards:
+            capabilities_by_agent.setdefault(agent_card['agent_id'], []).append(capability)
+    for capability, agent_cards in results.items():
+        for agent_card in agent_cards:
+            also_matches = [other for other in capabilities_by_agent[agent_card['agent_id']] if other != capability]
+            if also_matches:
+                agent_card['search_metadata']['also_matches'] = also_matches
+    return {capability: project_cards(agent_cards, projection) for capability, agent_cards in results.items()}
+
+@cached_tool(query_cache, {'capabilities': normalize_capabilities, 'sort_by': normalize_lower, 'projection': normalize_lower})
+async def get_top_agents_by_capabilities(
+    capabilities: List[str],
+    limit: int = 5,
+    sort_by: str = "karma",
+    partial_match: bool = True,
+    projection: str = "full"
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the top agent cards for several capabilities at once, e.g. every role of a multi-agent task.
+    The per-capability searches run concurrently and all agent cards are read in one batch.
+    Returns agent cards in Google's agent2agent protocol format.
+    
+    Args:
+        capabilities: The capabilities to search for
+        limit: Number of top agents to return per capability
+        sort_by: Sort criteria ("karma", "agent_pricing", "latency" for the fastest measured agents
+            (p95 response time; agents not measured yet follow by karma) or "blended" for karma
+            discounted by measured latency and success rate)
+        partial_match: If True, includes partial matches for capabilities
+        projection: Result shape: "full" agent cards, "summary" (name, URL, price, karma,
+            matched capabilities and skill names) or "connect" (ID and URL only)
+    
+    Returns:
+        Dictionary mapping each capability to its top agent cards in agent2agent protocol format.
+        Agents ranked for more than one capability list the others in search_metadata.also_matches.
+    """
+    try:
+        field_paths = card_field_paths(projection)
+        catalog = await get_agent_catalog_async()
+        if not capabilities:
+            return {}
         
-        # Sort by match score if partial matching was used (using search metadata)
-        if partial_match:
-            agent_cards.sort(key=lambda x: (
-                x.get('search_metadata', {}).get('capability_match_score', 0),
-                x.get('search_metadata', {}).get('searched_karma', 0) if sort_by == 'karma' else -x.get('search_metadata', {}).get('searched_pricing', 0)
-            ), reverse=True)
+        if catalog is not None:
+            winners_by_capability = {
+                capability: _top_agents_catalog(catalog, capability, limit, sort_by, partial_match)
+                for capability in capabilities
+            }
+            return _multi_capability_results(
+                winners_by_capability, catalog.get_cards(_multi_capability_ids(winners_by_capability)), projection
+            )
         
-        # Limit final results
-        agent_cards = agent_cards[:limit]
+        async_db = get_async_firestore_client()
+        matches_by_capability = dict(zip(capabilities, await asyncio.gather(*(
+            _top_agents_matches(async_db, capability, limit, sort_by, partial_match)
+            for capability in capabilities
+        ))))
         
-        return agent_cards
+        # One batched read covers the winners of every capability; get_all() dedupes agents shared between lists
+        winners_by_capability = _multi_capability_winners(matches_by_capability, limit, sort_by, partial_match)
+        cards = _leaderboard_cards(_multi_capability_winner_list(winners_by_capability), field_paths)
+        if cards is None:
+            cards = await get_agent_cards(async_db, _multi_capability_ids(winners_by_capability), field_paths)
+        return _multi_capability_results(winners_by_capability, cards, projection)
         
     except Exception as e:
-        print(f"Error getting top agents for capability {capability}: {e}")
-        return []
+        print(f"Error getting top agents for capabilities {capabilities}: {e}")
+        return {}
+
+# --- get_best_value_agents ---
+
+def _best_value_catalog(catalog, capability, limit, partial_match):
+    """Ranks the best value agents against the catalog mirror."""
+    # Vectorized value scoring and top-k ranking over the in-memory mirror. Partial
+    # matches come from the n-gram index over the whole catalog.
+    columns = catalog.columns()
+    index_matches = None
+    sort_keys = []
+    if capability and partial_match:
+        index_matches = catalog.match_capabilities([capability])
+        agent_ids = index_matches.keys()
+        sort_keys.append((columns.match_scores(index_matches), True))
+        sort_keys.append((columns.value_score, True))
+    else:
+        agent_ids = catalog.agents_with_capabilities([capability]) if capability else None
+    sort_keys.extend([(columns.karma, True), (columns.pricing, False)])
+    
+    rows = columns.top_k(columns.filter_mask(agent_ids=agent_ids), sort_keys, limit + _health_slack())
+    rows = _live_rows(catalog, columns, rows)[:limit]
+    matches = _catalog_matches(catalog, columns, rows, index_matches, single_capability=True)
+    for agent_data, value_score in zip(matches, columns.value_score[rows]):
+        agent_data['value_score'] = float(value_score)
+    return matches
+
+def _best_value_query(agents_ref, capability, limit, partial_match):
+    """
+    Builds the Firestore query for the best value agents.
+    
+    Returns:
+        Tuple of (query, page_size, read_budget) for the pager
+    """
+    if capability and not partial_match:
+        # Use exact matching with composite index on main agent documents
+        query = agents_ref.where('capabilities', 'array_contains', capability)
+    elif capability:
+        # For partial matching, get more results
+        query = _token_prefilter(agents_ref, [capability])
+    else:
+        query = agents_ref
+    
+    # Sort by karma (desc) then by pricing (asc) for best value using main document fields
+    query = query.order_by('karma', direction=firestore.Query.DESCENDING).order_by('agent_pricing', direction=firestore.Query.ASCENDING)
+    
+    # Partial matching reads at least the first limit*3 page, then pages on until limit
+    # matches are found or the read budget is spent
+    if capability and partial_match:
+        return query, limit * 3, max(READ_BUDGET, limit)
+    # Room to skip the agents known to be dead and still return limit of them
+    page_size = limit + _health_slack()
+    return query, page_size, page_size
+
+def _accept_best_value(agent_data, capability, partial_match):
+    """Applies capability filtering and computes the value score for a best value candidate."""
+    # Apply capability filtering with partial matching if enabled (using main document capabilities)
+    if not _accept_capability_match(agent_data, capability, partial_match):
+        return False
+    
+    # Calculate value score (karma per token) using main document fields
+    agent_data['value_score'] = agent_data.get('karma', 0) / max(agent_data.get('agent_pricing', 0.01), 0.01)
+    return True
 
-def get_best_value_agents(
+async def _best_value_matches(async_db, capability, limit, partial_match):
+    """Runs the best value query against Firestore, without reading cards."""
+    if not (capability and partial_match):
+        entries = await _leaderboard_entries(async_db, 'best_value', capability, limit, ('best_value',))
+        if entries is not None:
+            return entries
+    query, page_size, read_budget = _best_value_query(async_db.collection('agents'), capability, limit, partial_match)
+    pager = AsyncAgentPager(async_db, query, page_size=page_size, read_budget=read_budget)
+    return await _collect_matches(
+        pager, lambda agent_data: _accept_best_value(agent_data, capability, partial_match), limit,
+        scan=page_size if capability and partial_match else 0
+    )
+
+def _value_rank_key(agent_data):
+    """Ranks partial matches by capability match score, then value score."""
+    return (agent_data.get('capability_match_score', 0), agent_data.get('value_score', 0))
+
+def _best_value_metadata(agent_data, capability):
+    """Search metadata attached to best value results for reference."""
+    return {
+        'capability_match_score': agent_data.get('capability_match_score'),
+        'matched_capability': agent_data.get('matched_capability'),
+        'value_score': agent_data['value_score'],
+        'search_capability': capability,
+        'searched_karma': agent_data.get('karma'),
+        'searched_pricing': agent_data.get('agent_pricing'),
+        'searched_capabilities': agent_data.get('capabilities'),
+        **_performance_metadata(agent_data)
+    }
+
+@cached_tool(query_cache, {'projection': normalize_lower})
+async def get_best_value_agents(
     capability: Optional[str] = None,
     limit: int = 10,
-    partial_match: bool = True
+    partial_match: bool = True,
+    projection: str = "full"
 ) -> List[Dict[str, Any]]:
     """
     Get agent cards with the best value (high karma, low price) by searching main agent documents.
@@ -357,91 +1373,31 @@ def get_best_value_agents(
         capability: Optional capability filter
         limit: Number of agents to return
         partial_match: If True, includes partial matches for capabilities
+        projection: Result shape: "full" agent cards, "summary" (name, URL, price, karma,
+            matched capabilities and skill names) or "connect" (ID and URL only)
     
     Returns:
         List of best value agent cards in agent2agent protocol format
     """
     try:
-        db = get_firestore_client()
-        agents_ref = db.collection('agents')
+        field_paths = card_field_paths(projection)
+        catalog = await get_agent_catalog_async()
         
-        if capability and not partial_match:
-            # Use exact matching with composite index on main agent documents
-            query = agents_ref.where('capabilities', 'array_contains', capability)
+        if catalog is not None:
+            # Catalog mirror searches are pure in-memory work and come back ranked
+            winners = _best_value_catalog(catalog, capability, limit, partial_match)
+            cards = catalog.get_cards(_winner_ids(winners))
         else:
-            # For partial matching or no capability filter, get more results
-            query = agents_ref
-        
-        # Sort by karma (desc) then by pricing (asc) for best value using main document fields
-        query_limit = limit * 3 if (capability and partial_match) else limit
-        query = query.order_by('karma', direction=firestore.Query.DESCENDING).order_by('agent_pricing', direction=firestore.Query.ASCENDING).limit(query_limit)
-        
-        # Execute query on main agent documents
-        results = query.stream()
-        
-        agent_cards = []
-        for doc in results:
-            agent_data = doc.to_dict()
-            agent_data['agent_id'] = doc.id
-            
-            # Apply capability filtering with partial matching if enabled (using main document capabilities)
-            if capability and partial_match:
-                agent_capabilities = agent_data.get('capabilities', [])
-                match_found = False
-                match_score = 0
-                matched_capability = None
-                
-                # Check for exact match first
-                if capability in agent_capabilities:
-                    match_found = True
-                    match_score = 2
-                    matched_capability = f"{capability} (exact)"
-                else:
-                    # Check for partial matches
-                    for agent_cap in agent_capabilities:
-                        if (capability.lower() in agent_cap.lower() or 
-                            agent_cap.lower() in capability.lower()):
-                            match_found = True
-                            match_score = 1
-                            matched_capability = f"{capability} → {agent_cap} (partial)"
-                            break
-                
-                if not match_found:
-                    continue
-                    
-                # Store match info
-                agent_data['capability_match_score'] = match_score
-                agent_data['matched_capability'] = matched_capability
-            
-            # Calculate value score (karma per token) using main document fields
-            value_score = agent_data.get('karma', 0) / max(agent_data.get('agent_pricing', 0.01), 0.01)
-            
-            # Get the agent card for this agent (return format)
-            agent_card = get_agent_card(db, doc.id)
-            if agent_card:
-                # Add search metadata to the agent card for reference
-                agent_card['search_metadata'] = {
-                    'capability_match_score': agent_data.get('capability_match_score'),
-                    'matched_capability': agent_data.get('matched_capability'),
-                    'value_score': value_score,
-                    'search_capability': capability,
-                    'searched_karma': agent_data.get('karma'),
-                    'searched_pricing': agent_data.get('agent_pricing'),
-                    'searched_capabilities': agent_data.get('capabilities')
-                }
-                agent_cards.append(agent_card)
-        
-        # Sort by capability match score and value if partial matching was used (using search metadata)
-        if capability and partial_match:
-            agent_cards.sort(key=lambda x: (
-                x.get('search_metadata', {}).get('capability_match_score', 0),
-                x.get('search_metadata', {}).get('value_score', 0)
-            ), reverse=True)
-        
-        # Limit final results
-        agent_cards = agent_cards[:limit]
-        
-        return agent_cards
+            # Execute query on main agent documents, then rank the lightweight matches and
+            # read the agent cards for the winners only in one batched read (return format)
+            async_db = get_async_firestore_client()
+            matches = await _best_value_matches(async_db, capability, limit, partial_match)
+            winners = select_top_k(matches, limit, _value_rank_key if capability and partial_match else None)
+            cards = _leaderboard_cards(winners, field_paths)
+            if cards is None:
+                cards = await get_agent_cards(async_db, _winner_ids(winners), field_paths)
+        agent_cards = _materialize_cards(winners, cards, lambda agent_data: _best_value_metadata(agent_data, capability))
+        return project_cards(agent_cards, projection)
         
     except Exception as e:
         print(f"Error getting best value agents: {e}")
@@ -455,9 +1411,20 @@ agent_finder = Agent(
 
                     ## Available Tools:
                     - comprehensive_agent_search: Main search with filters for capabilities, pricing, karma, and sorting. Supports partial matching for capabilities and descriptions.
+                    - search_agents_paginated: Same as comprehensive_agent_search, one page at a time. Pass next_page_token back to get more results.
+                    - search_agents_by_text: Relevance-ranked free-text search over agent names, descriptions and skills. Use it with the user's own wording.
                     - get_agent_by_id: Get specific agent details by ID
                     - get_top_agents_by_capability: Top-rated agents for specific skills. Supports partial capability matching.
+                    - get_top_agents_by_capabilities: Top-rated agents for several capabilities in one call, grouped by capability. Use it for multi-agent tasks instead of one call per capability.
                     - get_best_value_agents: Best karma-to-price ratio agents. Supports partial capability matching.
+                    The top agents tools also take sort_by="latency" (fastest measured agents first, then the ones
+                    not measured yet by karma) or sort_by="blended"
+                    (karma discounted by measured response time and success rate). Prefer "blended" when the user
+                    cares about speed or reliability, and "latency" for time-critical tasks.
+                    Every tool accepts projection="full" (complete agent cards, the default), "summary" (name, URL,
+                    price, karma, matched capabilities and skill names) or "connect" (ID and URL only). Use "summary"
+                    while comparing candidates and "connect" when only the base URL is needed for a handoff;
+                    fetch the full card with get_agent_by_id only for the agents you present in detail.
 
                     ## Search Protocol:
                     1. **Analyze task complexity** - Determine if single or multi-agent approach needed
@@ -481,6 +1448,7 @@ agent_finder = Agent(
                     ## Multi-Agent Tasks:
                     For complex tasks requiring multiple specialized agents:
                     - Break down into clear subtasks with specific capability needs
+                    - Look up all subtask capabilities together with get_top_agents_by_capabilities
                     - Use partial matching to find agents with related skills that can adapt
                     - Check if single versatile agent can handle multiple subtasks (prefer when possible)
                     - Organize results by role/subtask with integration considerations
@@ -500,7 +1468,10 @@ agent_finder = Agent(
                     - **Base URL**: The A2A server endpoint for communication (e.g., 'http://localhost:9999')
                     - **Agent Capabilities**: Detailed list of what the agent can do
                     - **Pricing Information**: Cost per request or usage model
-                    - **Performance Metrics**: Karma score, response time, reliability
+                    - **Performance Metrics**: Karma score, response time, reliability (search_metadata carries the
+                      measured latency_p50_ms / latency_p95_ms and success_rate of agents used before, and health gives
+                      the agent's round trip time when health probing is enabled; agents that fail their probes are
+                      already left out)
                     - **Communication Protocol**: A2A connection details and supported message formats
 
                     ## Handoff to Communication:
@@ -529,8 +1500,11 @@ agent_finder = Agent(
             """,
     tools=[
         comprehensive_agent_search,
-        get_agent_by_id,  
+        search_agents_paginated,
+        search_agents_by_text,
+        get_agent_by_id,
         get_top_agents_by_capability,
+        get_top_agents_by_capabilities,
         get_best_value_agents
     ],
 )
@@ -0,0 +1,256 @@
+import re
+import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Set, Tuple, Iterable
+
+# Character n-gram size used for substring lookups
+NGRAM_SIZE = 3
+
+# Match weights shared by the index and the client-side scan
+EXACT_MATCH_SCORE = 2
+PARTIAL_MATCH_SCORE = 1
+
+# Firestore allows at most 30 values in an array_contains_any filter
+MAX_TOKEN_FILTER_VALUES = 30
+
+_TOKEN_SEPARATOR = re.compile(r"[^a-z0-9]+")
+
+
+def capability_tokens(capability: str) -> List[str]:
+    """Splits a capability into lowercase word tokens (e.g. weather_information -> weather, information)."""
+    return [token for token in _TOKEN_SEPARATOR.split(capability.lower()) if token]
+
+
+def capability_fields(capabilities: List[str]) -> Dict[str, Any]:
+    """
+    Computes the normalized capability fields stored alongside `capabilities` on agent documents.
+    Every writer of agent documents (e.g. populate_firestore.py) should store them so
+    agent_finder can match with plain lookups.
+
+    Returns:
+        Dictionary with 'capabilities_lower' (lowercase forms aligned with capabilities)
+        and 'capability_tokens' (the sorted set of word tokens across all capabilities)
+    """
+    capabilities = [cap for cap in capabilities or [] if isinstance(cap, str)]
+    return {
+        'capabilities_lower': [cap.lower() for cap in capabilities],
+        'capability_tokens': sorted({token for cap in capabilities for token in capability_tokens(cap)}),
+    }
+
+
+def lowered_capabilities(agent_data: Dict[str, Any]) -> List[str]:
+    """
+    Returns the lowercase capabilities of an agent document.
+
+    Uses the precomputed 'capabilities_lower' field when it is present and aligned
+    with 'capabilities'; documents written before it existed are lowercased here.
+    """
+    capabilities = agent_data.get('capabilities', [])
+    capabilities_lower = agent_data.get('capabilities_lower')
+    if isinstance(capabilities_lower, list) and len(capabilities_lower) == len(capabilities):
+        return capabilities_lower
+    return [cap.lower() for cap in capabilities]
+
+
+def required_tokens(required_capabilities: List[str]) -> List[str]:
+    """Tokens of the required capabilities for an array_contains_any filter on 'capability_tokens'."""
+    tokens = sorted({token for cap in required_capabilities for token in capability_tokens(cap)})
+    return tokens[:MAX_TOKEN_FILTER_VALUES]
+
+
+def score_capabilities(
+    required_capabilities: List[str],
+    agent_capabilities: List[str],
+    agent_capabilities_lower: Optional[List[str]] = None
+) -> Tuple[int, List[str]]:
+    """
+    Scores one agent's capabilities against the required capabilities.
+
+    An exact match is worth EXACT_MATCH_SCORE; otherwise the first agent
+    capability that contains, or is contained in, the required capability
+    (case-insensitive) is worth PARTIAL_MATCH_SCORE.
+
+    Args:
+        required_capabilities: Capabilities requested by the search
+        agent_capabilities: Capabilities listed on the agent document
+        agent_capabilities_lower: Precomputed lowercase forms aligned with agent_capabilities
+            (see lowered_capabilities); computed here when omitted
+
+    Returns:
+        Tuple of (match score, list of human-readable match descriptions)
+    """
+    capability_matches = 0
+    matched_capabilities = []
+    if agent_capabilities_lower is None:
+        agent_capabilities_lower = [agent_cap.lower() for agent_cap in agent_capabilities]
+    exact_capabilities = set(agent_capabilities)
+
+    for required_cap in required_capabilities:
+        # Check for exact matches first
+        if required_cap in exact_capabilities:
+            capability_matches += EXACT_MATCH_SCORE
+            matched_capabilities.append(f"{required_cap} (exact)")
+        else:
+            # Check for partial matches
+            required_lower = required_cap.lower()
+            for agent_cap, agent_lower in zip(agent_capabilities, agent_capabilities_lower):
+                if required_lower in agent_lower or agent_lower in required_lower:
+                    capability_matches += PARTIAL_MATCH_SCORE
+                    matched_capabilities.append(f"{required_cap} → {agent_cap} (partial)")
+                    break
+
+    return capability_matches, matched_capabilities
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class CapabilityIndex:
+    """
+    Inverted index from normalized capabilities and their character n-grams to agent IDs.
+
+    Partial matching is a substring test in either direction. Capabilities that
+    contain the query are found by intersecting the postings of the query's
+    n-grams; capabilities contained in the query are those whose n-grams are all
+    present in the query. Both lookups work on the distinct capability
+    vocabulary, so a search never scans the agents themselves. Results are
+    identical to running score_capabilities() over every agent.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._agent_caps: Dict[str, List[str]] = {}
+        self._agent_caps_lower: Dict[str, List[str]] = {}
+        self._agents_by_cap: Dict[str, Set[str]] = defaultdict(set)
+        self._caps_by_gram: Dict[str, Set[str]] = defaultdict(set)
+        self._gram_counts: Dict[str, int] = {}
+        self._short_caps: Set[str] = set()
+
+    def __len__(self):
+        return len(self._agent_caps)
+
+    def add(self, agent_id: str, capabilities: Iterable[str], capabilities_lower: Optional[List[str]] = None):
+        """
+        Indexes (or re-indexes) an agent's capabilities.
+
+        Args:
+            agent_id: The agent ID
+            capabilities: Capabilities listed on the agent document
+            capabilities_lower: Precomputed lowercase forms aligned with capabilities, if stored
+        """
+        with self._lock:
+            self._remove(agent_id)
+            capabilities = list(capabilities or [])
+            if capabilities_lower is None or len(capabilities_lower) != len(capabilities):
+                capabilities_lower = [cap.lower() if isinstance(cap, str) else None for cap in capabilities]
+            pairs = [(cap, lower) for cap, lower in zip(capabilities, capabilities_lower) if isinstance(cap, str)]
+            self._agent_caps[agent_id] = [cap for cap, _ in pairs]
+            self._agent_caps_lower[agent_id] = [lower for _, lower in pairs]
+            for normalized in set(self._agent_caps_lower[agent_id]):
+                if normalized not in self._agents_by_cap:
+                    self._add_vocabulary(normalized)
+                self._agents_by_cap[normalized].add(agent_id)
+
+    def remove(self, agent_id: str):
+        """Removes an agent from the index."""
+        with self._lock:
+            self._remove(agent_id)
+
+    def _remove(self, agent_id: str):
+        self._agent_caps.pop(agent_id, None)
+        for normalized in set(self._agent_caps_lower.pop(agent_id, [])):
+            agent_ids = self._agents_by_cap.get(normalized)
+            if agent_ids is None:
+                continue
+            agent_ids.discard(agent_id)
+            if not agent_ids:
+                del self._agents_by_cap[normalized]
+                self._remove_vocabulary(normalized)
+
+    def _add_vocabulary(self, normalized: str):
+        grams = _ngrams(normalized)
+        if not grams:
+            self._short_caps.add(normalized)
+        for gram in grams:
+            self._caps_by_gram[gram].add(normalized)
+        self._gram_counts[normalized] = len(grams)
+
+    def _remove_vocabulary(self, normalized: str):
+        self._short_caps.discard(normalized)
+        self._gram_counts.pop(normalized, None)
+        for gram in _ngrams(normalized):
+            caps = self._caps_by_gram.get(gram)
+            if caps is not None:
+                caps.discard(normalized)
+                if not caps:
+                    del self._caps_by_gram[gram]
+
+    def _related_capabilities(self, required_lower: str) -> Set[str]:
+        """Returns normalized capabilities that contain or are contained in the query."""
+        query_grams = _ngrams(required_lower)
+        related = set()
+
+        # Capabilities containing the query: every query n-gram must be in the capability
+        if query_grams:
+            postings = sorted((self._caps_by_gram.get(gram, set()) for gram in query_grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            related.update(cap for cap in candidates if required_lower in cap)
+        else:
+            # Queries shorter than one n-gram fall back to the vocabulary
+            related.update(cap for cap in self._agents_by_cap if required_lower in cap)
+
+        # Capabilities contained in the query: all of their n-grams occur in the query
+        gram_hits: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for cap in self._caps_by_gram.get(gram, ()):
+                gram_hits[cap] += 1
+        related.update(
+            cap for cap, hits in gram_hits.items()
+            if hits == self._gram_counts[cap] and cap in required_lower
+        )
+        related.update(cap for cap in self._short_caps if cap in required_lower)
+        return related
+
+    def agents_with(self, capability: str) -> Set[str]:
+        """Returns the IDs of agents listing this exact capability (case-sensitive)."""
+        with self._lock:
+            candidates = self._agents_by_cap.get(capability.lower(), ())
+            return {agent_id for agent_id in candidates if capability in self._agent_caps[agent_id]}
+
+    def match(self, required_capabilities: List[str]) -> Dict[str, Tuple[int, List[str]]]:
+        """
+        Finds every agent matching at least one required capability.
+
+        Args:
+            required_capabilities: Capabilities requested by the search
+
+        Returns:
+            Dictionary mapping agent ID to (match score, match descriptions), with the
+            same scores and descriptions score_capabilities() would produce
+        """
+        results: Dict[str, Tuple[int, List[str]]] = {}
+        with self._lock:
+            for required_cap in required_capabilities:
+                required_lower = required_cap.lower()
+                related = self._related_capabilities(required_lower)
+                agent_ids = set()
+                for cap in related:
+                    agent_ids.update(self._agents_by_cap[cap])
+
+                for agent_id in agent_ids:
+                    agent_capabilities = self._agent_caps[agent_id]
+                    agent_capabilities_lower = self._agent_caps_lower[agent_id]
+                    score, matched = results.get(agent_id, (0, []))
+                    if required_cap in agent_capabilities:
+                        score += EXACT_MATCH_SCORE
+                        matched = matched + [f"{required_cap} (exact)"]
+                    else:
+                        # Report the first matching capability in the agent's own order
+                        agent_cap = next(
+                            cap for cap, lower in zip(agent_capabilities, agent_capabilities_lower) if lower in related
+                        )
+                        score += PARTIAL_MATCH_SCORE
+                        matched = matched + [f"{required_cap} → {agent_cap} (partial)"]
+                    results[agent_id] = (score, matched)
+        return results
@@ -0,0 +1,244 @@
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Set, Callable
+
+from .capability_index import CapabilityIndex
+from .ranking import ColumnarCatalog, telemetry_only_change
+from .text_index import TextIndex, agent_document_text
+
+
+class AgentCatalog:
+    """
+    In-process mirror of the `agents` collection and its agent cards.
+
+    The mirror is filled by the initial Firestore snapshot and then kept current
+    through on_snapshot listeners that apply incremental adds, modifies and
+    deletes, so searches can run without any network reads. It can also be seeded
+    from a catalog snapshot file (load_snapshot), in which case only agents updated
+    since the export are read from Firestore.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._lock = threading.RLock()
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._cards: Dict[str, Dict[str, Any]] = {}
+        self._agents_loaded = threading.Event()
+        self._cards_loaded = threading.Event()
+        self._watches = []
+        self._listeners = []
+        self._version = 0
+        self._columns: Optional[ColumnarCatalog] = None
+        self._columns_version = -1
+        # Bumped by changes to measured latency and success rates only, which just refresh those columns
+        self._telemetry_version = 0
+        self._columns_telemetry_version = 0
+        self._since = None
+        self.capability_index = CapabilityIndex()
+        self.text_index = TextIndex()
+
+    def start(self, timeout: Optional[float] = 30.0, since=None) -> bool:
+        """
+        Attaches the snapshot listeners and waits for the initial load.
+
+        Args:
+            timeout: Seconds to wait for the first snapshot of agents and cards
+            since: Only listen for agents whose updated_at is later than this datetime
+                (set after load_snapshot); their cards are re-read when they change
+
+        Returns:
+            True if the catalog finished its initial load within the timeout
+        """
+        self._since = since
+        if since is None:
+            self._watches.append(self._db.collection('agents').on_snapshot(self._on_agents_snapshot))
+            self._watches.append(self._db.collection_group('agent_cards').on_snapshot(self._on_cards_snapshot))
+        else:
+            # Writers bump the agent's updated_at whenever its card changes, so one listener
+            # covers both. Agents deleted after the export are not visible to this filter.
+            self._cards_loaded.set()
+            agents_query = self._db.collection('agents').where('updated_at', '>', since)
+            self._watches.append(agents_query.on_snapshot(self._on_agents_snapshot))
+        return self.wait_until_ready(timeout)
+
+    def load_snapshot(self, snapshot):
+        """
+        Seeds the mirror from a CatalogSnapshot before (or instead of) listening to Firestore.
+
+        Args:
+            snapshot: An opened CatalogSnapshot
+        """
+        with self._lock:
+            for agent_id, agent_data, agent_card in snapshot.items():
+                if agent_data is not None:
+                    self._agents[agent_id] = agent_data
+                    self.capability_index.add(
+                        agent_id, agent_data.get('capabilities', []), agent_data.get('capabilities_lower')
+                    )
+                if agent_card is not None:
+                    self._cards[agent_id] = agent_card
+                self._reindex_text(agent_id)
+            self._version += 1
+        self._notify_listeners()
+
+    def mark_ready(self):
+        """Marks the catalog as loaded when it is served from a snapshot without Firestore."""
+        self._agents_loaded.set()
+        self._cards_loaded.set()
+
+    def stop(self):
+        """Detaches the snapshot listeners. The mirrored data is kept as-is."""
+        for watch in self._watches:
+            watch.unsubscribe()
+        self._watches = []
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until both the agents and the cards have been loaded once."""
+        return self._agents_loaded.wait(timeout) and self._cards_loaded.wait(timeout)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._agents_loaded.is_set() and self._cards_loaded.is_set()
+
+    def _on_agents_snapshot(self, doc_snapshots, changes, read_time):
+        with self._lock:
+            listing_changes = []
+            for change in changes:
+                doc = change.document
+                if change.type.name == 'REMOVED':
+                    self._agents.pop(doc.id, None)
+                    self.capability_index.remove(doc.id)
+                else:
+                    agent_data = doc.to_dict()
+                    agent_data['agent_id'] = doc.id
+                    previous = self._agents.get(doc.id)
+                    self._agents[doc.id] = agent_data
+                    if telemetry_only_change(previous, agent_data):
+                        # Capabilities, text and card are as they were
+                        continue
+                    self.capability_index.add(
+                        doc.id, agent_data.get('capabilities', []), agent_data.get('capabilities_lower')
+                    )
+                self._reindex_text(doc.id)
+                listing_changes.append(change)
+            if not listing_changes:
+                # Telemetry flushes only: the columns pick the new stats up, listeners are not
+                # notified (cached latency and blended rankings expire with their TTL)
+                self._telemetry_version += 1
+            else:
+                if self._since is not None:
+                    self._refresh_cards([
+                        change.document.id for change in listing_changes if change.type.name != 'REMOVED'
+                    ])
+                self._version += 1
+        self._agents_loaded.set()
+        if listing_changes or not changes:
+            self._notify_listeners()
+
+    def _refresh_cards(self, agent_ids: List[str]):
+        """Re-reads the cards of changed agents when there is no card listener (snapshot deltas)."""
+        if not agent_ids:
+            return
+        agents_ref = self._db.collection('agents')
+        card_refs = [agents_ref.document(agent_id).collection('agent_cards').document('card') for agent_id in agent_ids]
+        for card_doc in self._db.get_all(card_refs):
+            agent_id = card_doc.reference.parent.parent.id
+            if card_doc.exists:
+                agent_card = card_doc.to_dict()
+                agent_card['agent_id'] = agent_id  # Add agent_id for reference
+                self._cards[agent_id] = agent_card
+            else:
+                self._cards.pop(agent_id, None)
+            self._reindex_text(agent_id)
+
+    def _on_cards_snapshot(self, doc_snapshots, changes, read_time):
+        with self._lock:
+            for change in changes:
+                doc = change.document
+                # Cards live at agents/{agent_id}/agent_cards/card
+                if doc.id != 'card':
+                    continue
+                agent_id = doc.reference.parent.parent.id
+                if change.type.name == 'REMOVED':
+                    self._cards.pop(agent_id, None)
+                else:
+                    agent_card = doc.to_dict()
+                    agent_card['agent_id'] = agent_id  # Add agent_id for reference
+                    self._cards[agent_id] = agent_card
+                self._reindex_text(agent_id)
+            self._version += 1
+        self._cards_loaded.set()
+        self._notify_listeners()
+
+    def add_listener(self, callback: Callable[[], None]):
+        """
+        Registers a callback invoked after every applied batch of snapshot changes,
+        except batches that only carry telemetry flushes.
+        """
+        self._listeners.append(callback)
+
+    def _notify_listeners(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in catalog change listener: {e}")
+
+    def _reindex_text(self, agent_id: str):
+        agent_data = self._agents.get(agent_id)
+        agent_card = self._cards.get(agent_id)
+        if agent_data is None and agent_card is None:
+            self.text_index.remove(agent_id)
+        else:
+            self.text_index.add(agent_id, agent_document_text(agent_data, agent_card))
+
+    def __len__(self):
+        return len(self._agents)
+
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a copy of the main agent document, or None if unknown."""
+        with self._lock:
+            agent_data = self._agents.get(agent_id)
+            return dict(agent_data) if agent_data is not None else None
+
+    def get_card(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a copy of the agent card, or None if the agent has no card."""
+        with self._lock:
+            agent_card = self._cards.get(agent_id)
+            return dict(agent_card) if agent_card is not None else None
+
+    def get_cards(self, agent_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Returns copies of the agent cards aligned with agent_ids (None where not found)."""
+        with self._lock:
+            return [
+                dict(self._cards[agent_id]) if agent_id in self._cards else None
+                for agent_id in agent_ids
+            ]
+
+    def card_urls(self) -> List[str]:
+        """Returns the URLs listed in the agent cards."""
+        with self._lock:
+            return [agent_card['url'] for agent_card in self._cards.values() if agent_card.get('url')]
+
+    def match_capabilities(self, required_capabilities: List[str]) -> Dict[str, Tuple[int, List[str]]]:
+        """Scores every mirrored agent against the required capabilities using the n-gram index."""
+        return self.capability_index.match(required_capabilities)
+
+    def agents_with_capabilities(self, capabilities: List[str]) -> Set[str]:
+        """Returns the IDs of agents listing every given capability exactly (like array_contains)."""
+        agent_ids = None
+        for capability in capabilities:
+            matching = self.capability_index.agents_with(capability)
+            agent_ids = matching if agent_ids is None else agent_ids & matching
+        return agent_ids if agent_ids is not None else set()
+
+    def columns(self) -> ColumnarCatalog:
+        """Returns the columnar view of the catalog, rebuilding it after any change."""
+        with self._lock:
+            if self._columns is None or self._columns_version != self._version:
+                self._columns = ColumnarCatalog(self._agents.values(), self._cards.keys())
+                self._columns_version = self._version
+                self._columns_telemetry_version = self._telemetry_version
+            elif self._columns_telemetry_version != self._telemetry_version:
+                self._columns = self._columns.with_telemetry(self._agents)
+                self._columns_telemetry_version = self._telemetry_version
+            return self._columns
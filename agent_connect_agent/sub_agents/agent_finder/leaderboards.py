@@ -0,0 +1,225 @@
+from typing import List, Dict, Any, Optional, Iterable
+from urllib.parse import quote
+
+from firebase_admin import firestore
+
+from .ranking import MIN_VALUE_PRICE
+
+# Precomputed top-K documents, one per capability and ranking:
+#   capability_leaderboards/{sort_by}            every agent
+#   capability_leaderboards/{sort_by}:{capability} agents listing the capability exactly
+LEADERBOARD_COLLECTION = 'capability_leaderboards'
+LEADERBOARD_SIZE = 25
+
+# Rankings kept per capability, matching the orderings the finder tools ask Firestore for
+LEADERBOARD_SORTS = {
+    'karma': [('karma', 'desc')],
+    'agent_pricing': [('agent_pricing', 'asc')],
+    'best_value': [('karma', 'desc'), ('agent_pricing', 'asc')],
+}
+
+
+def leaderboard_id(sort_by: str, capability: Optional[str] = None) -> str:
+    """Document ID of a leaderboard (capability None is the board over every agent)."""
+    if capability is None:
+        return sort_by
+    # Capabilities may contain characters that are not allowed in document IDs
+    return f"{sort_by}:{quote(capability, safe='')}"
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _qualifies(entry: Dict[str, Any], sort_by: str) -> bool:
+    # Like Firestore order_by, agents missing a ranked field are left out
+    return all(_is_number(entry.get(field)) for field, _ in LEADERBOARD_SORTS[sort_by])
+
+
+def _sort_key(sort_by: str):
+    def key(entry):
+        values = []
+        for field, direction in LEADERBOARD_SORTS[sort_by]:
+            values.append(-entry[field] if direction == 'desc' else entry[field])
+        # Ties are broken by agent ID, the same order the catalog mirror uses
+        values.append(entry['agent_id'])
+        return tuple(values)
+    return key
+
+
+def leaderboard_entry(agent_data: Dict[str, Any], agent_card: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the leaderboard entry for an agent: its ranking fields plus a card summary.
+
+    Args:
+        agent_data: Main agent document (with 'agent_id')
+        agent_card: The agent's card
+
+    Returns:
+        Entry dictionary stored in the leaderboard documents
+    """
+    karma = agent_data.get('karma')
+    pricing = agent_data.get('agent_pricing')
+    return {
+        'agent_id': agent_data['agent_id'],
+        'karma': karma,
+        'agent_pricing': pricing,
+        'value_score': (karma if _is_number(karma) else 0) / max(pricing if _is_number(pricing) else MIN_VALUE_PRICE, MIN_VALUE_PRICE),
+        'capabilities': agent_data.get('capabilities', []),
+        'name': agent_card.get('name'),
+        'url': agent_card.get('url'),
+        'skills': [skill.get('name') for skill in agent_card.get('skills') or [] if isinstance(skill, dict)],
+    }
+
+
+def _board_keys(capabilities: Iterable[str]):
+    for sort_by in LEADERBOARD_SORTS:
+        yield sort_by, None
+        for capability in capabilities:
+            yield sort_by, capability
+
+
+def _apply_entry(board: Dict[str, Any], agent_id: str, entry: Optional[Dict[str, Any]], sort_by: str):
+    """
+    Places (or removes) one agent on a board.
+
+    Returns:
+        Tuple of (new entries, truncated flag, whether the board must be rebuilt from
+        Firestore because an agent beyond the stored entries may now belong on it)
+    """
+    entries = board.get('entries', [])
+    truncated = board.get('truncated', False)
+    was_listed = any(existing['agent_id'] == agent_id for existing in entries)
+    entries = [existing for existing in entries if existing['agent_id'] != agent_id]
+    listed = entry is not None and _qualifies(entry, sort_by)
+    if listed:
+        entries.append(entry)
+        entries.sort(key=_sort_key(sort_by))
+    # Unlisted agents rank below the previous last entry, so the board only becomes
+    # unreliable when a listed agent dropped off or fell to the last place
+    fell_back = not listed or entries[-1]['agent_id'] == agent_id
+    needs_rebuild = truncated and was_listed and fell_back
+    if len(entries) > LEADERBOARD_SIZE:
+        entries = entries[:LEADERBOARD_SIZE]
+        truncated = True
+    return entries, truncated, needs_rebuild
+
+
+@firestore.transactional
+def _update_board(transaction, board_ref, sort_by, capability, agent_id, entry):
+    snapshot = board_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        # Agents written before the board existed are only found by a full rebuild
+        return True
+    entries, truncated, needs_rebuild = _apply_entry(snapshot.to_dict(), agent_id, entry, sort_by)
+    transaction.set(board_ref, {
+        'sort_by': sort_by,
+        'capability': capability,
+        'entries': entries,
+        'truncated': truncated,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    })
+    return needs_rebuild
+
+
+def update_agent_leaderboards(
+    db,
+    agent_data: Dict[str, Any],
+    agent_card: Optional[Dict[str, Any]],
+    previous_capabilities: Optional[List[str]] = None
+):
+    """
+    Keeps the leaderboards current after an agent (or its card) is written.
+
+    Call it from every writer of agent documents, after the write. Each board is updated
+    in its own transaction; boards that do not exist yet, or that lose an agent they
+    cannot replace from their stored entries, are rebuilt with one query.
+    A deleted agent is written as no capabilities, no card and its last capabilities
+    as previous_capabilities, which takes it off every board it was listed on.
+
+    Args:
+        db: Firestore client
+        agent_data: The agent document as written (with 'agent_id')
+        agent_card: The agent's card, or None if it has none (agents without a card are never listed)
+        previous_capabilities: Capabilities before the write, so boards the agent left are updated
+    """
+    agent_id = agent_data['agent_id']
+    capabilities = [cap for cap in agent_data.get('capabilities', []) if isinstance(cap, str)]
+    entry = leaderboard_entry(agent_data, agent_card) if agent_card is not None else None
+
+    board_keys = list(_board_keys(capabilities))
+    removed = [cap for cap in previous_capabilities or [] if cap not in capabilities]
+    board_keys.extend((sort_by, cap) for sort_by in LEADERBOARD_SORTS for cap in removed)
+
+    for sort_by, capability in board_keys:
+        board_ref = db.collection(LEADERBOARD_COLLECTION).document(leaderboard_id(sort_by, capability))
+        board_entry = entry if capability is None or capability in capabilities else None
+        if _update_board(db.transaction(), board_ref, sort_by, capability, agent_id, board_entry):
+            rebuild_leaderboard(db, sort_by, capability)
+
+
+def rebuild_leaderboard(db, sort_by: str, capability: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Recomputes one board from the agents collection (composite-indexed query plus one card batch).
+
+    Returns:
+        The new board entries
+    """
+    query = db.collection('agents')
+    if capability is not None:
+        query = query.where('capabilities', 'array_contains', capability)
+    for field, direction in LEADERBOARD_SORTS[sort_by]:
+        query = query.order_by(field, direction=firestore.Query.DESCENDING if direction == 'desc' else firestore.Query.ASCENDING)
+
+    agents = []
+    for doc in query.limit(LEADERBOARD_SIZE + 1).stream():
+        agent_data = doc.to_dict()
+        agent_data['agent_id'] = doc.id
+        agents.append(agent_data)
+
+    agents_ref = db.collection('agents')
+    card_refs = [
+        agents_ref.document(agent_data['agent_id']).collection('agent_cards').document('card')
+        for agent_data in agents[:LEADERBOARD_SIZE]
+    ]
+    cards = {}
+    for card_doc in db.get_all(card_refs):
+        if card_doc.exists:
+            cards[card_doc.reference.parent.parent.id] = card_doc.to_dict()
+
+    entries = [
+        leaderboard_entry(agent_data, cards[agent_data['agent_id']])
+        for agent_data in agents if agent_data['agent_id'] in cards
+    ]
+    entries = sorted((entry for entry in entries if _qualifies(entry, sort_by)), key=_sort_key(sort_by))
+    db.collection(LEADERBOARD_COLLECTION).document(leaderboard_id(sort_by, capability)).set({
+        'sort_by': sort_by,
+        'capability': capability,
+        'entries': entries[:LEADERBOARD_SIZE],
+        # One extra agent was read to tell whether the board lists every qualifying agent
+        'truncated': len(agents) > LEADERBOARD_SIZE,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    })
+    return entries[:LEADERBOARD_SIZE]
+
+
+def _board_entries(snapshot, limit: int) -> Optional[List[Dict[str, Any]]]:
+    if not snapshot.exists:
+        return None
+    board = snapshot.to_dict()
+    entries = board.get('entries', [])
+    if limit > len(entries) and board.get('truncated', False):
+        return None
+    return entries[:limit]
+
+
+async def get_leaderboard(async_db, sort_by: str, capability: Optional[str] = None, limit: int = LEADERBOARD_SIZE) -> Optional[List[Dict[str, Any]]]:
+    """
+    Reads the top entries of a leaderboard with a single document fetch (Firestore AsyncClient).
+
+    Returns:
+        The ranked entries (at most limit), or None if the board has not been built or
+        cannot answer for this many agents
+    """
+    snapshot = await async_db.collection(LEADERBOARD_COLLECTION).document(leaderboard_id(sort_by, capability)).get()
+    return _board_entries(snapshot, limit)
@@ -0,0 +1,89 @@
+import base64
+import json
+from typing import Dict, Any, Optional
+
+
+def encode_page_token(position: Dict[str, Any]) -> str:
+    """Encodes a result position (e.g. {'after': agent_id}) as an opaque continuation token."""
+    return base64.urlsafe_b64encode(json.dumps(position, sort_keys=True).encode('utf-8')).decode('ascii')
+
+
+def decode_page_token(page_token: Optional[str]) -> Dict[str, Any]:
+    """
+    Decodes a continuation token produced by encode_page_token().
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    if not page_token:
+        return {}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(page_token.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError(f"Invalid page token: {page_token}")
+    if not isinstance(position, dict):
+        raise ValueError(f"Invalid page token: {page_token}")
+    return position
+
+
+class AsyncAgentPager:
+    """
+    Async generator over a Firestore AsyncClient query on main agent documents, fetched page by
+    page with start_after cursors and consumed with ``async for``.
+
+    Iteration yields agent data dictionaries and stops when the collection is
+    exhausted or read_budget documents have been read. Restoring the cursor of a
+    page token is counted in cursor_reads, not against the budget, so every page
+    can read as many documents as the first. Consumers may stop early
+    (e.g. once they have collected enough matches); next_page_token() then
+    resumes right after the last document they consumed.
+    """
+
+    def __init__(self, db, query, page_size: int, read_budget: int, page_token: Optional[str] = None):
+        self._db = db
+        self._query = query
+        self.page_size = max(page_size, 1)
+        self.read_budget = max(read_budget, 1)
+        self.reads = 0
+        self.cursor_reads = 0
+        self.exhausted = False
+        self._last_doc = None
+        # Validate the token eagerly but fetch the cursor document on the first iteration,
+        # as it has to be awaited
+        self._after_id = decode_page_token(page_token).get('after')
+
+    async def _restore_cursor(self):
+        after_id, self._after_id = self._after_id, None
+        cursor_doc = await self._db.collection('agents').document(after_id).get()
+        self.cursor_reads += 1
+        if not cursor_doc.exists:
+            raise ValueError(f"Page token refers to agent {after_id}, which no longer exists")
+        self._last_doc = cursor_doc
+
+    async def __aiter__(self):
+        if self._after_id is not None:
+            await self._restore_cursor()
+
+        while self.reads < self.read_budget:
+            page_limit = min(self.page_size, self.read_budget - self.reads)
+            page_query = self._query
+            if self._last_doc is not None:
+                page_query = page_query.start_after(self._last_doc)
+
+            docs = [doc async for doc in page_query.limit(page_limit).stream()]
+            self.reads += len(docs)
+            for doc in docs:
+                self._last_doc = doc
+                agent_data = doc.to_dict()
+                agent_data['agent_id'] = doc.id
+                yield agent_data
+
+            if len(docs) < page_limit:
+                self.exhausted = True
+                return
+
+    def next_page_token(self) -> Optional[str]:
+        """Token for the results after the last consumed document, or None if the query is exhausted."""
+        if self.exhausted or self._last_doc is None:
+            return None
+        return encode_page_token({'after': self._last_doc.id})
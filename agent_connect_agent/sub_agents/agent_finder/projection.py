@@ -0,0 +1,77 @@
+from typing import List, Dict, Any, Optional
+
+# Card fields downloaded for each projection (None reads the whole card). Firestore
+# field masks cannot reach into array elements, so summaries still read whole skills.
+CARD_FIELD_PATHS = {
+    'summary': ['name', 'url', 'skills', 'pricing.cost_per_request', 'metadata.karma'],
+    'connect': ['url'],
+    'full': None,
+}
+
+DEFAULT_PROJECTION = 'full'
+
+
+def validate_projection(projection: Optional[str]) -> str:
+    """
+    Normalizes a projection name.
+
+    Raises:
+        ValueError: If the projection is not one of summary, connect or full
+    """
+    projection = (projection or DEFAULT_PROJECTION).strip().lower()
+    if projection not in CARD_FIELD_PATHS:
+        raise ValueError(f"Unknown projection '{projection}'; use one of {', '.join(CARD_FIELD_PATHS)}")
+    return projection
+
+
+def card_field_paths(projection: str) -> Optional[List[str]]:
+    """Returns the Firestore field mask for reading agent cards under a projection."""
+    return CARD_FIELD_PATHS[validate_projection(projection)]
+
+
+def project_card(agent_card: Dict[str, Any], projection: str) -> Dict[str, Any]:
+    """
+    Shrinks an agent card (with optional search_metadata) to the fields of a projection.
+
+    Args:
+        agent_card: Agent card, or basic agent data when the agent has no card
+        projection: "summary" (name, URL, price, karma, matched capabilities and skill names),
+            "connect" (ID and URL only) or "full" (unchanged)
+
+    Returns:
+        The projected agent dictionary
+    """
+    projection = validate_projection(projection)
+    if projection == 'full':
+        return agent_card
+
+    url = agent_card.get('url', agent_card.get('agent_url'))
+    if projection == 'connect':
+        return {'agent_id': agent_card.get('agent_id'), 'url': url}
+
+    metadata = agent_card.get('search_metadata') or {}
+    matched = metadata.get('matched_capabilities')
+    if matched is None and metadata.get('matched_capability') is not None:
+        matched = [metadata['matched_capability']]
+    summary = {
+        'agent_id': agent_card.get('agent_id'),
+        'name': agent_card.get('name', agent_card.get('agent_name')),
+        'url': url,
+        'pricing': metadata.get('searched_pricing', (agent_card.get('pricing') or {}).get('cost_per_request', agent_card.get('agent_pricing'))),
+        'karma': metadata.get('searched_karma', (agent_card.get('metadata') or {}).get('karma', agent_card.get('karma'))),
+        'matched_capabilities': matched,
+        'skills': [skill.get('name') for skill in agent_card.get('skills') or [] if isinstance(skill, dict)],
+    }
+    if metadata.get('also_matches'):
+        summary['also_matches'] = metadata['also_matches']
+    if metadata.get('latency_p95_ms') is not None or metadata.get('success_rate') is not None:
+        summary['latency_p95_ms'] = metadata.get('latency_p95_ms')
+        summary['success_rate'] = metadata.get('success_rate')
+    if metadata.get('health'):
+        summary['health'] = metadata['health']
+    return summary
+
+
+def project_cards(agent_cards: List[Dict[str, Any]], projection: str) -> List[Dict[str, Any]]:
+    """Applies project_card() to a list of agent cards."""
+    return [project_card(agent_card, projection) for agent_card in agent_cards]
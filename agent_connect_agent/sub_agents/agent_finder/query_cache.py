@@ -0,0 +1,159 @@
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of finder tool results with a per-entry TTL.
+
+    Keys are canonicalized tool arguments (see cached_tool). Everything is
+    dropped by invalidate() when the underlying agent documents change.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    @property
+    def generation(self) -> int:
+        """Incremented on every invalidation; results computed under an older generation are not stored."""
+        return self._generation
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Returns (True, value) for a live entry, otherwise (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Any, generation: Optional[int] = None):
+        """Stores a value, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # The catalog changed while this result was being computed
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drops every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def normalize_capabilities(capabilities):
+    """Capability lists are order-insensitive and duplicate-insensitive."""
+    if not capabilities or not isinstance(capabilities, (list, tuple)):
+        return capabilities
+    # Model-generated arguments may carry numbers or nulls, which name no capability
+    return sorted({capability.strip() for capability in capabilities if isinstance(capability, str)})
+
+
+def normalize_lower(value):
+    """Case-insensitive string arguments such as sort orders and free-text filters."""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def _is_cacheable(result) -> bool:
+    # Empty results and error payloads may come from a transient failure, so they are never cached
+    if not result:
+        return False
+    return not (isinstance(result, dict) and 'error' in result)
+
+
+def cached_tool(
+    cache: QueryCache,
+    normalizers: Optional[Dict[str, Callable[[Any], Any]]] = None
+):
+    """
+    Decorator that serves a coroutine finder tool from the cache.
+
+    Arguments are bound to the tool signature, defaults applied and each
+    normalizer run, so equivalent calls share one entry. The tool itself is
+    always called with the normalized arguments, keeping cached and fresh
+    results identical. Results are deep-copied in and out of the cache because callers
+    may annotate the returned agent cards.
+
+    Args:
+        cache: The QueryCache to use
+        normalizers: Per-argument functions that canonicalize values
+    """
+    normalizers = normalizers or {}
+
+    def decorator(func):
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError(f"cached_tool expects a coroutine function, got {func.__name__}")
+        signature = inspect.signature(func)
+        name = func.__name__
+
+        def prepare(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {
+                arg_name: normalizers[arg_name](value) if arg_name in normalizers else value
+                for arg_name, value in bound.arguments.items()
+            }
+            return arguments, json.dumps([name, arguments], sort_keys=True, default=str)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            arguments, key = prepare(args, kwargs)
+            if not cache.enabled:
+                return await func(**arguments)
+
+            hit, value = cache.get(key)
+            if hit:
+                return copy.deepcopy(value)
+
+            generation = cache.generation
+            result = await func(**arguments)
+            if _is_cacheable(result):
+                cache.put(key, copy.deepcopy(result), generation=generation)
+            return result
+
+        return wrapper
+
+    return decorator
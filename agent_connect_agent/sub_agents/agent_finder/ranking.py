@@ -0,0 +1,262 @@
+import copy
+import heapq
+import itertools
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Callable
+
+import numpy as np
+
+# Price floor used when computing karma-per-token value scores
+MIN_VALUE_PRICE = 0.01
+
+# Blended score: p95 latency (ms) at which an agent's karma counts half. Agents without
+# measured latency (see communicator/telemetry.py) are assumed to be this fast
+BLENDED_LATENCY_SCALE_MS = 1000.0
+# Success rate assumed for agents without measured calls
+DEFAULT_SUCCESS_RATE = 0.95
+
+# Fields a telemetry flush of the communicator writes (see communicator/telemetry.py)
+TELEMETRY_FIELDS = frozenset({
+    'latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms', 'success_rate',
+    'telemetry_calls', 'telemetry_updated_at', 'updated_at',
+})
+
+
+def telemetry_only_change(previous: Optional[Dict[str, Any]], agent_data: Dict[str, Any]) -> bool:
+    """
+    Whether an agent document changed by a telemetry flush alone.
+
+    A flush stamps a new telemetry_updated_at; other writers (e.g. populate_firestore.py)
+    replace the whole document and drop it, so their writes never count as telemetry-only
+    even when only updated_at differs.
+    """
+    if previous is None:
+        return False
+    stamp = agent_data.get('telemetry_updated_at')
+    if stamp is None or stamp == previous.get('telemetry_updated_at'):
+        return False
+    fields = (previous.keys() | agent_data.keys()) - TELEMETRY_FIELDS
+    return all(previous.get(field) == agent_data.get(field) for field in fields)
+
+
+def blended_score(agent_data: Dict[str, Any]) -> float:
+    """
+    Karma discounted by measured reliability and tail latency:
+    karma * success_rate / (1 + latency_p95_ms / BLENDED_LATENCY_SCALE_MS).
+    """
+    karma = _number(agent_data.get('karma'))
+    success_rate = _number(agent_data.get('success_rate'))
+    latency = _number(agent_data.get('latency_p95_ms'))
+    return _blend(
+        0.0 if np.isnan(karma) else karma,
+        DEFAULT_SUCCESS_RATE if np.isnan(success_rate) else success_rate,
+        BLENDED_LATENCY_SCALE_MS if np.isnan(latency) else latency
+    )
+
+
+def _blend(karma, success_rate, latency_p95_ms):
+    # Works on floats and numpy columns alike
+    return karma * success_rate / (1.0 + latency_p95_ms / BLENDED_LATENCY_SCALE_MS)
+
+
+class ColumnarCatalog:
+    """
+    Column-oriented view of the agent catalog used for vectorized ranking.
+
+    Rows are ordered by agent_id, so a row index doubles as the final
+    tiebreak. Numeric columns hold NaN where the agent document is missing
+    the field, which mirrors Firestore excluding such documents from range
+    filters and order_by.
+    """
+
+    def __init__(self, agents: Iterable[Dict[str, Any]], card_ids: Iterable[str] = ()):
+        agents = sorted(agents, key=lambda agent_data: agent_data['agent_id'])
+        card_ids = set(card_ids)
+
+        self.ids = np.array([agent_data['agent_id'] for agent_data in agents], dtype=object)
+        self.row_of = {agent_id: row for row, agent_id in enumerate(self.ids)}
+        self.karma = np.array([_number(agent_data.get('karma')) for agent_data in agents], dtype=np.float64)
+        self.pricing = np.array([_number(agent_data.get('agent_pricing')) for agent_data in agents], dtype=np.float64)
+        self.value_score = np.nan_to_num(self.karma, nan=0.0) / np.maximum(
+            np.nan_to_num(self.pricing, nan=MIN_VALUE_PRICE), MIN_VALUE_PRICE
+        )
+        self.has_card = np.array([agent_id in card_ids for agent_id in self.ids], dtype=bool)
+        self._set_telemetry(agents)
+
+        # Names are ranked once so they can be sorted like any other numeric column
+        names = [agent_data.get('agent_name') for agent_data in agents]
+        sorted_names = sorted({name for name in names if isinstance(name, str)})
+        name_rank = {name: rank for rank, name in enumerate(sorted_names)}
+        self.name_rank = np.array([name_rank.get(name, np.nan) for name in names], dtype=np.float64)
+
+        self.names_lower = np.array([(name if isinstance(name, str) else '').lower() for name in names], dtype=str)
+        self.descriptions_lower = np.array(
+            [str(agent_data.get('description') or '').lower() for agent_data in agents], dtype=str
+        )
+
+    def _set_telemetry(self, agents: List[Dict[str, Any]]):
+        # Production telemetry; NaN until the communicator has measured the agent
+        self.latency_p95 = np.array([_number(agent_data.get('latency_p95_ms')) for agent_data in agents], dtype=np.float64)
+        self.success_rate = np.array([_number(agent_data.get('success_rate')) for agent_data in agents], dtype=np.float64)
+        # Latency sort order: agents not measured yet rank after every measured one instead of dropping out
+        self.latency_order = np.nan_to_num(self.latency_p95, nan=np.inf)
+        self.blended = _blend(
+            np.nan_to_num(self.karma, nan=0.0),
+            np.nan_to_num(self.success_rate, nan=DEFAULT_SUCCESS_RATE),
+            np.nan_to_num(self.latency_p95, nan=BLENDED_LATENCY_SCALE_MS)
+        )
+
+    def with_telemetry(self, agents: Dict[str, Dict[str, Any]]) -> 'ColumnarCatalog':
+        """
+        Returns a copy with the telemetry columns re-read from the agents (by ID).
+
+        For changes that only touched telemetry: the other columns are shared with
+        this view, which stays unchanged for readers still holding it.
+        """
+        columns = copy.copy(self)
+        columns._set_telemetry([agents.get(agent_id) or {} for agent_id in self.ids])
+        return columns
+
+    def __len__(self):
+        return len(self.ids)
+
+    def column(self, field: str) -> np.ndarray:
+        """Returns the sortable column for a main agent document field."""
+        return {
+            'karma': self.karma,
+            'agent_pricing': self.pricing,
+            'agent_name': self.name_rank,
+            'latency_p95_ms': self.latency_p95,
+            'blended_score': self.blended,
+        }[field]
+
+    def score_column(self, scores: Dict[str, float]) -> np.ndarray:
+        """Spreads per-agent scores into a column (0 for agents without a score)."""
+        column = np.zeros(len(self.ids), dtype=np.float64)
+        for agent_id, score in scores.items():
+            row = self.row_of.get(agent_id)
+            if row is not None:
+                column[row] = score
+        return column
+
+    def match_scores(self, index_matches: Dict[str, Tuple[int, List[str]]]) -> np.ndarray:
+        """Spreads capability match scores into a column (0 for unmatched agents)."""
+        return self.score_column({agent_id: score for agent_id, (score, _) in index_matches.items()})
+
+    def contains_mask(self, text: str) -> np.ndarray:
+        """Rows whose agent name or description contains the text (case-insensitive)."""
+        needle = text.lower()
+        return (np.char.find(self.names_lower, needle) >= 0) | (np.char.find(self.descriptions_lower, needle) >= 0)
+
+    def filter_mask(
+        self,
+        agent_ids: Optional[Iterable[str]] = None,
+        max_price: Optional[float] = None,
+        min_karma: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Builds the boolean row mask for a search. Agents without a card are always excluded.
+
+        Args:
+            agent_ids: Restricts the mask to these agent IDs
+            max_price: Maximum agent_pricing (inclusive)
+            min_karma: Minimum karma (inclusive)
+
+        Returns:
+            Boolean array with one entry per catalog row
+        """
+        mask = self.has_card.copy()
+        if agent_ids is not None:
+            allowed = np.zeros(len(self.ids), dtype=bool)
+            rows = [self.row_of[agent_id] for agent_id in agent_ids if agent_id in self.row_of]
+            allowed[rows] = True
+            mask &= allowed
+        # NaN comparisons are False, so missing fields never pass a range filter
+        if max_price is not None:
+            mask &= self.pricing <= max_price
+        if min_karma is not None:
+            mask &= self.karma >= min_karma
+        return mask
+
+    def top_k(self, mask: np.ndarray, sort_keys: List[Tuple[np.ndarray, bool]], limit: Optional[int]) -> np.ndarray:
+        """
+        Selects the best rows under a multi-key ordering.
+
+        The primary key is narrowed with argpartition-style selection before the
+        (much smaller) candidate set is fully ordered with lexsort.
+
+        Args:
+            mask: Boolean row mask from filter_mask()
+            sort_keys: List of (column, descending) pairs, primary key first
+            limit: Number of rows to return, or None for all matching rows
+
+        Returns:
+            Array of row indices in ranked order
+        """
+        keys = []
+        for values, descending in sort_keys:
+            # Like Firestore order_by, rows missing a sort field are excluded
+            mask = mask & ~np.isnan(values)
+            keys.append(-values if descending else values)
+
+        rows = np.flatnonzero(mask)
+        if not keys:
+            return rows[:limit] if limit is not None else rows
+
+        if limit is not None and 0 < limit < rows.size:
+            primary = keys[0][rows]
+            kth = np.partition(primary, limit - 1)[limit - 1]
+            # Keep every row tied with the k-th primary value; lexsort settles the ties
+            rows = rows[primary <= kth]
+
+        # lexsort treats the last key as primary; the row index (agent_id order) breaks ties
+        order = np.lexsort([rows] + [key[rows] for key in reversed(keys)])
+        rows = rows[order]
+        return rows[:limit] if limit is not None else rows
+
+
+def select_top_k(
+    candidates: Iterable[Dict[str, Any]],
+    limit: int,
+    score_key: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Selects the best candidates in a single pass with a bounded heap.
+
+    The heap holds at most limit lightweight (score, tiebreak, agent_id) tuples,
+    so nothing beyond the winners is kept, sorted or turned into agent cards.
+    Ties keep candidate order, like a stable descending sort.
+
+    Args:
+        candidates: Agent data dictionaries with an 'agent_id'
+        limit: Number of candidates to keep
+        score_key: Function returning a comparable score (higher is better), or None
+            when the candidates are already in ranked order
+
+    Returns:
+        The winning agent data dictionaries, best first
+    """
+    if limit <= 0:
+        return []
+    if score_key is None:
+        return list(itertools.islice(candidates, limit))
+
+    heap: List[Tuple[Any, int, str]] = []
+    winners: Dict[int, Dict[str, Any]] = {}
+    for position, agent_data in enumerate(candidates):
+        entry = (score_key(agent_data), -position, agent_data['agent_id'])
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            _, evicted, _ = heapq.heapreplace(heap, entry)
+            del winners[-evicted]
+        else:
+            continue
+        winners[position] = agent_data
+    return [winners[-tiebreak] for _, tiebreak, _ in sorted(heap, reverse=True)]
+
+
+def _number(value) -> float:
+    """Converts a numeric field to float, using NaN for missing or non-numeric values."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
@@ -0,0 +1,245 @@
+import datetime
+import json
+import mmap
+import os
+import struct
+import time
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+import numpy as np
+
+# File layout (little-endian):
+#   header   magic, format version, agent count, string count, created_at (epoch seconds)
+#   sections (offset, length) pairs for each entry of SECTIONS, then the section bytes,
+#            each section aligned to 8 bytes so it can be viewed in place with numpy
+# Strings (IDs, names, URLs, capabilities and the JSON-encoded documents) are stored
+# once in a string table and referenced by index from the per-agent columns.
+SNAPSHOT_MAGIC = b'AGTSNAP1'
+SNAPSHOT_VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+_HEADER = struct.Struct('<8sIIId')
+_SECTION = struct.Struct('<QQ')
+
+SECTIONS = [
+    ('string_offsets', np.uint64),
+    ('string_blob', np.uint8),
+    ('agent_id', np.uint32),
+    ('agent_name', np.uint32),
+    ('agent_url', np.uint32),
+    ('karma', np.float64),
+    ('agent_pricing', np.float64),
+    ('capability_offsets', np.uint32),
+    ('capability_refs', np.uint32),
+    ('agent_doc', np.uint32),
+    ('card_doc', np.uint32),
+]
+
+
+def _json_default(value):
+    # Firestore timestamps (e.g. updated_at) are stored as ISO 8601 strings
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _number(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+class _StringTable:
+    def __init__(self):
+        self._refs: Dict[str, int] = {}
+        self._encoded: List[bytes] = []
+
+    def ref(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        ref = self._refs.get(value)
+        if ref is None:
+            ref = self._refs[value] = len(self._encoded)
+            self._encoded.append(value.encode('utf-8'))
+        return ref
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(self._encoded) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(encoded) for encoded in self._encoded], dtype=np.uint64)
+        return offsets, np.frombuffer(b''.join(self._encoded), dtype=np.uint8)
+
+
+def write_snapshot(
+    path: str,
+    agents: Dict[str, Dict[str, Any]],
+    cards: Dict[str, Dict[str, Any]],
+    created_at: Optional[float] = None
+):
+    """
+    Writes a catalog snapshot file.
+
+    Args:
+        path: Destination file; written to a temporary file and renamed into place
+        agents: Main agent documents keyed by agent ID
+        cards: Agent cards keyed by agent ID
+        created_at: Epoch seconds the catalog was read at; Firestore changes after
+            this time are applied on top of the snapshot as deltas
+    """
+    strings = _StringTable()
+    agent_ids = sorted(set(agents) | set(cards))
+    columns = {name: [] for name, _ in SECTIONS[2:] if name not in ('capability_offsets', 'capability_refs')}
+    capability_offsets = [0]
+    capability_refs = []
+
+    for agent_id in agent_ids:
+        agent_data = agents.get(agent_id)
+        agent_card = cards.get(agent_id)
+        source = agent_data or {}
+        columns['agent_id'].append(strings.ref(agent_id))
+        columns['agent_name'].append(strings.ref(source.get('agent_name') if isinstance(source.get('agent_name'), str) else None))
+        columns['agent_url'].append(strings.ref(source.get('agent_url') if isinstance(source.get('agent_url'), str) else None))
+        columns['karma'].append(_number(source.get('karma')))
+        columns['agent_pricing'].append(_number(source.get('agent_pricing')))
+        capability_refs.extend(strings.ref(cap) for cap in source.get('capabilities') or [] if isinstance(cap, str))
+        capability_offsets.append(len(capability_refs))
+        columns['agent_doc'].append(
+            strings.ref(json.dumps(agent_data, default=_json_default)) if agent_data is not None else NO_STRING
+        )
+        columns['card_doc'].append(
+            strings.ref(json.dumps(agent_card, default=_json_default)) if agent_card is not None else NO_STRING
+        )
+
+    string_offsets, string_blob = strings.arrays()
+    arrays = {
+        'string_offsets': string_offsets,
+        'string_blob': string_blob,
+        'capability_offsets': np.array(capability_offsets, dtype=np.uint32),
+        'capability_refs': np.array(capability_refs, dtype=np.uint32),
+    }
+    for name, dtype in SECTIONS:
+        if name not in arrays:
+            arrays[name] = np.array(columns[name], dtype=dtype)
+
+    created_at = time.time() if created_at is None else created_at
+    offset = _HEADER.size + _SECTION.size * len(SECTIONS)
+    layout = []
+    for name, _ in SECTIONS:
+        offset += -offset % 8
+        layout.append((offset, arrays[name].nbytes))
+        offset += arrays[name].nbytes
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(agent_ids), len(string_offsets) - 1, created_at))
+        for section_offset, length in layout:
+            f.write(_SECTION.pack(section_offset, length))
+        for (name, _), (section_offset, _) in zip(SECTIONS, layout):
+            f.write(b'\0' * (section_offset - f.tell()))
+            f.write(arrays[name].tobytes())
+    os.replace(temp_path, path)
+
+
+def export_snapshot(db, path: str) -> int:
+    """
+    Exports the `agents` collection and its agent cards from Firestore to a snapshot file.
+
+    Args:
+        db: Firestore client
+        path: Destination file
+
+    Returns:
+        Number of agents written
+    """
+    # Taken before reading so writes racing with the export are picked up as deltas
+    created_at = time.time()
+    agents = {}
+    for doc in db.collection('agents').stream():
+        agent_data = doc.to_dict()
+        agent_data['agent_id'] = doc.id
+        agents[doc.id] = agent_data
+    cards = {}
+    for card_doc in db.collection_group('agent_cards').stream():
+        # Cards live at agents/{agent_id}/agent_cards/card
+        if card_doc.id == 'card':
+            agent_card = card_doc.to_dict()
+            agent_card['agent_id'] = card_doc.reference.parent.parent.id
+            cards[agent_card['agent_id']] = agent_card
+    write_snapshot(path, agents, cards, created_at=created_at)
+    return len(set(agents) | set(cards))
+
+
+class CatalogSnapshot:
+    """
+    Read-only view of a snapshot file written by write_snapshot().
+
+    The file is memory-mapped and its columns are numpy views over the mapping,
+    so opening costs no parsing; strings and documents are decoded on access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, agent_count, _, created_at = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} agent catalog snapshot")
+        self.created_at = created_at
+        self._agent_count = agent_count
+
+        self._columns: Dict[str, np.ndarray] = {}
+        for index, (name, dtype) in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(self._mmap, _HEADER.size + index * _SECTION.size)
+            self._columns[name] = np.frombuffer(self._mmap, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+    @classmethod
+    def open(cls, path: str) -> 'CatalogSnapshot':
+        """Opens a snapshot file."""
+        return cls(path)
+
+    def close(self):
+        self._columns = {}
+        self._mmap.close()
+
+    def __len__(self):
+        return self._agent_count
+
+    @property
+    def created_at_datetime(self) -> datetime.datetime:
+        """The export time as a timezone-aware datetime, for updated_at delta queries."""
+        return datetime.datetime.fromtimestamp(self.created_at, tz=datetime.timezone.utc)
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a numeric column ('karma' or 'agent_pricing'), NaN where missing."""
+        return self._columns[name]
+
+    def string(self, ref: int) -> Optional[str]:
+        """Decodes an entry of the string table."""
+        if ref == NO_STRING:
+            return None
+        offsets = self._columns['string_offsets']
+        start, end = int(offsets[ref]), int(offsets[ref + 1])
+        return bytes(self._columns['string_blob'][start:end]).decode('utf-8')
+
+    def agent_id(self, row: int) -> str:
+        return self.string(int(self._columns['agent_id'][row]))
+
+    def capabilities(self, row: int) -> List[str]:
+        offsets = self._columns['capability_offsets']
+        refs = self._columns['capability_refs'][int(offsets[row]):int(offsets[row + 1])]
+        return [self.string(int(ref)) for ref in refs]
+
+    def agent(self, row: int) -> Optional[Dict[str, Any]]:
+        """Decodes the main agent document stored for a row."""
+        document = self.string(int(self._columns['agent_doc'][row]))
+        return json.loads(document) if document is not None else None
+
+    def card(self, row: int) -> Optional[Dict[str, Any]]:
+        """Decodes the agent card stored for a row."""
+        document = self.string(int(self._columns['card_doc'][row]))
+        return json.loads(document) if document is not None else None
+
+    def items(self) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Yields (agent_id, agent data, agent card) for every agent, ordered by agent ID."""
+        for row in range(self._agent_count):
+            yield self.agent_id(row), self.agent(row), self.card(row)
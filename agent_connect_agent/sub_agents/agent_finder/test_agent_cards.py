@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+from agent_connect_agent.sub_agents.agent_finder import agent as finder
+
+
+class FakeCardDoc:
+    def __init__(self, agent_id, data):
+        self.exists = data is not None
+        self._data = data
+        # Cards live at agents/{agent_id}/agent_cards/card
+        self.reference = SimpleNamespace(parent=SimpleNamespace(parent=SimpleNamespace(id=agent_id)))
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeAsyncDb:
+    """Async client holding agent cards by agent ID; records every multi-document read."""
+
+    def __init__(self, cards, error=None):
+        self.cards = cards
+        self.error = error
+        self.reads = []
+
+    def collection(self, name):
+        assert name == 'agents'
+        return SimpleNamespace(document=lambda agent_id: SimpleNamespace(
+            collection=lambda name: SimpleNamespace(document=lambda doc_id: agent_id)
+        ))
+
+    async def get_all(self, card_refs, field_paths=None):
+        self.reads.append((list(card_refs), field_paths))
+        if self.error is not None:
+            raise self.error
+        for agent_id in card_refs:
+            yield FakeCardDoc(agent_id, self.cards.get(agent_id))
+
+
+def test_cards_are_read_in_one_batch_aligned_with_the_ids():
+    db = FakeAsyncDb({'a': {'url': 'http://a'}, 'b': {'url': 'http://b'}})
+    cards = asyncio.run(finder.get_agent_cards(db, ['b', 'missing', 'a', 'b'], field_paths=['url']))
+    assert cards == [
+        {'url': 'http://b', 'agent_id': 'b'}, None, {'url': 'http://a', 'agent_id': 'a'}, {'url': 'http://b', 'agent_id': 'b'}
+    ]
+    # Duplicates are read once, and every position gets its own dict to annotate
+    assert db.reads == [(['b', 'missing', 'a'], ['url'])]
+    assert cards[0] is not cards[3]
+
+
+def test_many_cards_are_read_in_chunks():
+    agent_ids = [f"agent-{i}" for i in range(finder.CARD_BATCH_SIZE * 2 + 1)]
+    db = FakeAsyncDb({agent_id: {} for agent_id in agent_ids})
+    cards = asyncio.run(finder.get_agent_cards(db, agent_ids))
+    assert [len(refs) for refs, _ in db.reads] == [finder.CARD_BATCH_SIZE, finder.CARD_BATCH_SIZE, 1]
+    assert [card['agent_id'] for card in cards] == agent_ids
+
+
+def test_failed_read_leaves_the_cards_out():
+    db = FakeAsyncDb({}, error=ConnectionError('unavailable'))
+    assert asyncio.run(finder.get_agent_cards(db, ['a'])) == [None]
+    assert asyncio.run(finder.get_agent_cards(db, [])) == []
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder import agent as finder
+
+AGENTS = {
+    'ranker': {'karma': 40, 'agent_pricing': 0.2, 'capabilities': ['seo'], 'latency_p95_ms': 900.0},
+    'writer': {'karma': 30, 'agent_pricing': 0.1, 'capabilities': ['seo', 'translation'], 'latency_p95_ms': 100.0},
+    'newcomer': {'karma': 50, 'agent_pricing': 0.1, 'capabilities': ['seo']},
+    'polyglot': {'karma': 20, 'agent_pricing': 0.3, 'capabilities': ['translation']},
+}
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+        self.reference = SimpleNamespace(parent=SimpleNamespace(parent=SimpleNamespace(id=doc_id)))
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeAsyncQuery:
+    """Async query over AGENTS with Firestore's array_contains, order_by, start_after and limit semantics."""
+
+    def __init__(self, db, docs):
+        self._db = db
+        self._docs = docs
+
+    def where(self, field, op, value):
+        assert (field, op) == ('capabilities', 'array_contains')
+        return FakeAsyncQuery(self._db, [doc for doc in self._docs if value in doc.to_dict().get(field, [])])
+
+    def order_by(self, field, direction):
+        # Documents without the field drop out of an ordered query
+        docs = [doc for doc in self._docs if doc.to_dict().get(field) is not None]
+        docs.sort(key=lambda doc: doc.to_dict()[field], reverse=direction == 'DESCENDING')
+        return FakeAsyncQuery(self._db, docs)
+
+    def start_after(self, cursor_doc):
+        ids = [doc.id for doc in self._docs]
+        return FakeAsyncQuery(self._db, self._docs[ids.index(cursor_doc.id) + 1:])
+
+    def limit(self, count):
+        return FakeAsyncQuery(self._db, self._docs[:count])
+
+    async def stream(self):
+        self._db.reads += len(self._docs)
+        for doc in self._docs:
+            yield doc
+
+    def document(self, agent_id):
+        # agents/{agent_id}/agent_cards/card
+        return SimpleNamespace(collection=lambda name: SimpleNamespace(document=lambda doc_id: agent_id))
+
+
+class FakeAsyncDb:
+    def __init__(self):
+        self.reads = 0
+
+    def collection(self, name):
+        assert name == 'agents'
+        return FakeAsyncQuery(self, [FakeDoc(agent_id, data) for agent_id, data in AGENTS.items()])
+
+    async def get_all(self, card_refs, field_paths=None):
+        for agent_id in card_refs:
+            yield FakeDoc(agent_id, {'name': agent_id.title(), 'url': f"http://{agent_id}"})
+
+
+@pytest.fixture
+def firestore_path(monkeypatch):
+    async def no_catalog():
+        return None
+
+    db = FakeAsyncDb()
+    monkeypatch.setattr(finder, 'get_agent_catalog_async', no_catalog)
+    monkeypatch.setattr(finder, 'get_async_firestore_client', lambda: db)
+    monkeypatch.setattr(finder, 'LEADERBOARDS_ENABLED', False)
+    monkeypatch.setattr(finder, 'HEALTH_FILTER_ENABLED', False)
+    finder.query_cache.invalidate()
+    yield db
+    finder.query_cache.invalidate()
+
+
+def top_ids(*args, **kwargs):
+    return [card['agent_id'] for card in asyncio.run(finder.get_top_agents_by_capability(*args, **kwargs))]
+
+
+def test_exact_match_reads_only_the_ranked_page(firestore_path):
+    assert top_ids('seo', limit=2, sort_by='karma', partial_match=False) == ['newcomer', 'ranker']
+    assert firestore_path.reads == 2
+
+
+def test_latency_ranks_measured_agents_first_then_the_rest_by_karma(firestore_path):
+    assert top_ids('seo', limit=3, sort_by='latency', partial_match=False) == ['writer', 'ranker', 'newcomer']
+
+
+def test_partial_match_is_ranked_client_side(firestore_path):
+    cards = asyncio.run(finder.get_top_agents_by_capability('transl', limit=5, sort_by='agent_pricing'))
+    assert [card['agent_id'] for card in cards] == ['writer', 'polyglot']
+    assert cards[0]['search_metadata']['matched_capability'] == 'transl → translation (partial)'
+
+
+def test_collect_matches_reads_the_whole_first_page_before_stopping():
+    async def pager():
+        for rank in range(10):
+            yield {'agent_id': str(rank), 'match': rank % 2 == 0}
+
+    async def collect(scan):
+        return await finder._collect_matches(pager(), lambda agent_data: agent_data['match'], 2, scan=scan)
+
+    assert [agent_data['agent_id'] for agent_data in asyncio.run(collect(0))] == ['0', '2']
+    assert [agent_data['agent_id'] for agent_data in asyncio.run(collect(6))] == ['0', '2', '4']
+
+
+def test_first_use_initializes_once_off_the_event_loop(monkeypatch):
+    initialized = []
+    loop_threads = set()
+
+    def slow_initialize():
+        initialized.append(threading.current_thread())
+        time.sleep(0.1)
+        finder.db = object()
+
+    monkeypatch.setattr(finder, 'db', None)
+    monkeypatch.setattr(finder, 'catalog', None)
+    monkeypatch.setattr(finder, '_initialize_services', slow_initialize)
+    monkeypatch.setattr(finder, '_start_cache_invalidation', lambda db: None)
+    monkeypatch.setattr(finder, 'CATALOG_MIRROR_ENABLED', False)
+    monkeypatch.setattr(finder, 'SNAPSHOT_PATH', None)
+    monkeypatch.setattr(finder, 'HEALTH_FILTER_ENABLED', False)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            loop_threads.add(threading.current_thread())
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        catalogs = await asyncio.gather(*(finder.get_agent_catalog_async() for _ in range(4)))
+        ticking.cancel()
+        return ticks, catalogs
+
+    ticks, catalogs = asyncio.run(run())
+    # The loop kept running while Firebase initialized
+    assert ticks >= 3
+    assert len(initialized) == 1
+    assert initialized[0] not in loop_threads
+    assert catalogs == [None] * 4
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder import agent as finder
+
+# capability -> agents with it, best first
+AGENTS_BY_CAPABILITY = {
+    'seo': ['ranker', 'writer'],
+    'translation': ['writer', 'polyglot'],
+    'weather': [],
+}
+
+
+@pytest.fixture
+def firestore_path(monkeypatch):
+    """Runs the finder against fake per-capability queries, recording their concurrency and card reads."""
+    recorded = {'in_flight': 0, 'most_in_flight': 0, 'card_reads': []}
+
+    async def no_catalog():
+        return None
+
+    async def top_agents_matches(async_db, capability, limit, sort_by, partial_match):
+        recorded['in_flight'] += 1
+        recorded['most_in_flight'] = max(recorded['most_in_flight'], recorded['in_flight'])
+        await asyncio.sleep(0.01)
+        recorded['in_flight'] -= 1
+        return [
+            {'agent_id': agent_id, 'karma': 10 - rank, 'capabilities': [capability]}
+            for rank, agent_id in enumerate(AGENTS_BY_CAPABILITY[capability])
+        ]
+
+    async def get_agent_cards(async_db, agent_ids, field_paths=None):
+        recorded['card_reads'].append(list(agent_ids))
+        return [{'agent_id': agent_id, 'name': agent_id.title(), 'url': f"http://{agent_id}"} for agent_id in agent_ids]
+
+    monkeypatch.setattr(finder, 'get_agent_catalog_async', no_catalog)
+    monkeypatch.setattr(finder, 'get_async_firestore_client', lambda: object())
+    monkeypatch.setattr(finder, '_top_agents_matches', top_agents_matches)
+    monkeypatch.setattr(finder, 'get_agent_cards', get_agent_cards)
+    monkeypatch.setattr(finder, 'LEADERBOARDS_ENABLED', False)
+    finder.query_cache.invalidate()
+    yield recorded
+    finder.query_cache.invalidate()
+
+
+def test_capabilities_are_searched_concurrently_with_one_card_read(firestore_path):
+    results = asyncio.run(finder.get_top_agents_by_capabilities(['seo', 'translation', 'weather'], limit=2, partial_match=False))
+    assert firestore_path['most_in_flight'] == 3
+    assert firestore_path['card_reads'] == [['ranker', 'writer', 'writer', 'polyglot']]
+    assert {capability: [card['agent_id'] for card in cards] for capability, cards in results.items()} == {
+        'seo': ['ranker', 'writer'], 'translation': ['writer', 'polyglot'], 'weather': []
+    }
+
+
+def test_agents_ranked_for_several_capabilities_are_flagged(firestore_path):
+    results = asyncio.run(finder.get_top_agents_by_capabilities(['seo', 'translation'], limit=2, partial_match=False))
+    writer_for_seo = results['seo'][1]['search_metadata']
+    assert writer_for_seo['search_capability'] == 'seo'
+    assert writer_for_seo['also_matches'] == ['translation']
+    assert 'also_matches' not in results['seo'][0]['search_metadata']
+
+
+def test_limit_and_projection_apply_per_capability(firestore_path):
+    results = asyncio.run(finder.get_top_agents_by_capabilities(
+        ['seo', 'translation'], limit=1, partial_match=False, projection='connect'
+    ))
+    assert results == {
+        'seo': [{'agent_id': 'ranker', 'url': 'http://ranker'}],
+        'translation': [{'agent_id': 'writer', 'url': 'http://writer'}],
+    }
+
+
+def test_no_capabilities(firestore_path):
+    assert asyncio.run(finder.get_top_agents_by_capabilities([])) == {}
@@ -0,0 +1,135 @@
+import random
+
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder.capability_index import (
+    MAX_TOKEN_FILTER_VALUES, CapabilityIndex, capability_fields, lowered_capabilities, required_tokens,
+    score_capabilities
+)
+
+VOCABULARY = [
+    'weather_information', 'Weather_Forecasting', 'location_services', 'api_integration',
+    'hotel_recommendations', 'booking_assistance', 'data', 'metadata', 'data_analysis',
+    'seo', 'translation', 'ai', 'Itinerary_Planning', 'web', 'web_search',
+]
+
+QUERIES = [
+    ['weather'], ['weather_information'], ['WEATHER_FORECASTING'], ['data'], ['metadata_extraction'],
+    ['a'], ['ai'], ['seo', 'translation'], ['web_search_engine'], ['hotel', 'booking_assistance'],
+    ['planning'], ['nothing_like_it'], ['location_services', 'weather', 'api'],
+]
+
+
+def scan(agents, required_capabilities):
+    """What the index must reproduce: score_capabilities() over every agent."""
+    results = {}
+    for agent_id, capabilities in agents.items():
+        score, matched = score_capabilities(required_capabilities, capabilities)
+        if score:
+            results[agent_id] = (score, matched)
+    return results
+
+
+def random_agents(count, seed=7):
+    rng = random.Random(seed)
+    return {f"agent-{i}": rng.sample(VOCABULARY, rng.randint(0, 5)) for i in range(count)}
+
+
+@pytest.mark.parametrize('required_capabilities', QUERIES)
+def test_match_equals_scan(required_capabilities):
+    agents = random_agents(200)
+    index = CapabilityIndex()
+    for agent_id, capabilities in agents.items():
+        index.add(agent_id, capabilities)
+    assert index.match(required_capabilities) == scan(agents, required_capabilities)
+
+
+def test_match_with_precomputed_lowercase_fields():
+    agents = random_agents(50, seed=11)
+    index = CapabilityIndex()
+    for agent_id, capabilities in agents.items():
+        index.add(agent_id, capabilities, capability_fields(capabilities)['capabilities_lower'])
+    for required_capabilities in QUERIES:
+        assert index.match(required_capabilities) == scan(agents, required_capabilities)
+
+
+def test_reindex_and_remove_keep_equivalence():
+    agents = random_agents(100, seed=3)
+    index = CapabilityIndex()
+    for agent_id, capabilities in agents.items():
+        index.add(agent_id, capabilities)
+
+    rng = random.Random(5)
+    for agent_id in rng.sample(sorted(agents), 30):
+        agents[agent_id] = rng.sample(VOCABULARY, rng.randint(1, 4))
+        index.add(agent_id, agents[agent_id])
+    for agent_id in rng.sample(sorted(agents), 30):
+        del agents[agent_id]
+        index.remove(agent_id)
+
+    assert len(index) == len(agents)
+    for required_capabilities in QUERIES:
+        assert index.match(required_capabilities) == scan(agents, required_capabilities)
+
+
+def test_agents_with_is_case_sensitive():
+    index = CapabilityIndex()
+    index.add('a', ['Weather_Forecasting'])
+    index.add('b', ['weather_forecasting'])
+    assert index.agents_with('weather_forecasting') == {'b'}
+    assert index.agents_with('Weather_Forecasting') == {'a'}
+    assert index.agents_with('forecasting') == set()
+
+
+def test_non_string_capabilities_are_ignored():
+    index = CapabilityIndex()
+    index.add('a', ['seo', None, 42])
+    assert index.match(['seo']) == {'a': (2, ['seo (exact)'])}
+
+
+def test_capability_fields():
+    fields = capability_fields(['Weather_Information', 'web-search', None])
+    assert fields == {
+        'capabilities_lower': ['weather_information', 'web-search'],
+        'capability_tokens': ['information', 'search', 'weather', 'web'],
+    }
+
+
+def test_lowered_capabilities_ignores_misaligned_field():
+    assert lowered_capabilities({'capabilities': ['A', 'B'], 'capabilities_lower': ['a', 'b']}) == ['a', 'b']
+    assert lowered_capabilities({'capabilities': ['A', 'B'], 'capabilities_lower': ['a']}) == ['a', 'b']
+
+
+@pytest.mark.parametrize('required_capabilities', [['weather'], ['DATA', 'web'], ['booking_assistance']])
+def test_stored_fields_match_like_lowercasing_on_read(required_capabilities):
+    agent_capabilities = ['Weather_Forecasting', 'metadata', 'web_search', 'booking_assistance']
+    stored = {'capabilities': agent_capabilities, **capability_fields(agent_capabilities)}
+    assert score_capabilities(required_capabilities, agent_capabilities, lowered_capabilities(stored)) == \
+        score_capabilities(required_capabilities, agent_capabilities)
+
+
+def test_required_tokens_fit_one_array_contains_any_filter():
+    assert required_tokens(['Weather_Information', 'weather']) == ['information', 'weather']
+    many = [f"capability_{i}" for i in range(MAX_TOKEN_FILTER_VALUES * 2)]
+    assert len(required_tokens(many)) == MAX_TOKEN_FILTER_VALUES
+
+
+def test_token_prefilter_is_opt_in(monkeypatch):
+    from agent_connect_agent.sub_agents.agent_finder import agent as finder
+
+    class Query:
+        def __init__(self, filters=()):
+            self.filters = list(filters)
+
+        def where(self, *condition):
+            return Query(self.filters + [condition])
+
+    query = Query()
+    monkeypatch.setattr(finder, 'TOKEN_PREFILTER_ENABLED', False)
+    assert finder._token_prefilter(query, ['web_search']) is query
+    monkeypatch.setattr(finder, 'TOKEN_PREFILTER_ENABLED', True)
+    assert finder._token_prefilter(query, ['web_search']).filters == [
+        ('capability_tokens', 'array_contains_any', ['search', 'web'])
+    ]
+    # Capabilities without a single token leave the query as it is
+    assert finder._token_prefilter(query, ['--']) is query
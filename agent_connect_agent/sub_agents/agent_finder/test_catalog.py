@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+from agent_connect_agent.sub_agents.agent_finder.catalog import AgentCatalog
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data=None, agent_id=None):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+        # Cards live at agents/{agent_id}/agent_cards/card
+        self.reference = SimpleNamespace(parent=SimpleNamespace(parent=SimpleNamespace(id=agent_id)))
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+def change(kind, doc):
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=doc)
+
+
+class FakeWatch:
+    def __init__(self):
+        self.unsubscribed = False
+
+    def unsubscribe(self):
+        self.unsubscribed = True
+
+
+class FakeQuery:
+    def __init__(self, db, name):
+        self._db = db
+        self._name = name
+
+    def where(self, field, op, value):
+        return FakeQuery(self._db, f"{self._name} where {field} {op} {value}")
+
+    def on_snapshot(self, callback):
+        self._db.callbacks[self._name] = callback
+        watch = FakeWatch()
+        self._db.watches.append(watch)
+        return watch
+
+    def document(self, agent_id):
+        # agents/{agent_id}/agent_cards/card, as read by get_all
+        card_ref = SimpleNamespace(agent_id=agent_id)
+        return SimpleNamespace(collection=lambda name: SimpleNamespace(document=lambda doc_id: card_ref))
+
+
+class FakeDb:
+    """Records snapshot listeners so tests can feed them changes."""
+
+    def __init__(self, cards=None):
+        self.callbacks = {}
+        self.watches = []
+        self.cards = cards or {}
+        self.card_reads = []
+
+    def collection(self, name):
+        assert name == 'agents'
+        return FakeQuery(self, name)
+
+    def collection_group(self, name):
+        return FakeQuery(self, f"group {name}")
+
+    def get_all(self, refs):
+        for ref in refs:
+            self.card_reads.append(ref.agent_id)
+            yield FakeDoc('card', self.cards.get(ref.agent_id), agent_id=ref.agent_id)
+
+
+def agent_doc(agent_id, karma=10, capabilities=('seo',), **extra):
+    return FakeDoc(agent_id, {'agent_name': agent_id.title(), 'karma': karma, 'capabilities': list(capabilities), **extra})
+
+
+def card_doc(agent_id, description):
+    return FakeDoc('card', {'url': f"http://{agent_id}", 'skills': [{'description': description}]}, agent_id=agent_id)
+
+
+def loaded_catalog():
+    db = FakeDb()
+    catalog = AgentCatalog(db)
+    assert not catalog.start(timeout=0)
+    db.callbacks['agents']([], [change('ADDED', agent_doc('a')), change('ADDED', agent_doc('b', capabilities=['translation']))], None)
+    db.callbacks['group agent_cards']([], [change('ADDED', card_doc('a', 'keyword research'))], None)
+    return db, catalog
+
+
+def test_initial_snapshots_fill_the_mirror():
+    _, catalog = loaded_catalog()
+    assert catalog.is_ready
+    assert len(catalog) == 2
+    assert catalog.get_agent('a')['agent_id'] == 'a'
+    assert catalog.get_cards(['a', 'b']) == [{'url': 'http://a', 'skills': [{'description': 'keyword research'}], 'agent_id': 'a'}, None]
+    assert catalog.card_urls() == ['http://a']
+    assert catalog.agents_with_capabilities(['seo']) == {'a'}
+    assert [agent_id for agent_id, _ in catalog.text_index.search('keyword')] == ['a']
+
+
+def test_changes_are_applied_incrementally_and_notify_listeners():
+    db, catalog = loaded_catalog()
+    notified = []
+    catalog.add_listener(lambda: notified.append(True))
+    columns = catalog.columns()
+    db.callbacks['agents']([], [
+        change('MODIFIED', agent_doc('b', capabilities=['seo'])),
+        change('REMOVED', FakeDoc('a')),
+    ], None)
+    assert catalog.get_agent('a') is None
+    assert catalog.agents_with_capabilities(['seo']) == {'b'}
+    assert catalog.columns() is not columns
+    assert list(catalog.columns().ids) == ['b']
+    db.callbacks['group agent_cards']([], [change('REMOVED', card_doc('a', '')), change('ADDED', FakeDoc('draft', {}, 'b'))], None)
+    assert catalog.get_card('a') is None
+    # Only the 'card' document of an agent is its card
+    assert catalog.get_card('b') is None
+    assert len(notified) == 2
+
+
+def test_telemetry_flushes_refresh_columns_without_notifying():
+    db, catalog = loaded_catalog()
+    notified = []
+    catalog.add_listener(lambda: notified.append(True))
+    catalog.columns()
+    flushed = agent_doc('a', latency_p95_ms=120.0, success_rate=0.9, telemetry_updated_at=1)
+    db.callbacks['agents']([], [change('MODIFIED', flushed)], None)
+    assert notified == []
+    columns = catalog.columns()
+    assert columns.latency_p95[columns.row_of['a']] == 120.0
+
+
+def test_failing_listener_does_not_stop_the_others():
+    db, catalog = loaded_catalog()
+    notified = []
+    catalog.add_listener(lambda: 1 / 0)
+    catalog.add_listener(lambda: notified.append(True))
+    db.callbacks['agents']([], [change('MODIFIED', agent_doc('a', karma=11))], None)
+    assert notified == [True]
+
+
+def test_deltas_after_a_snapshot_reread_changed_cards():
+    db = FakeDb(cards={'a': {'url': 'http://a-v2'}})
+    catalog = AgentCatalog(db)
+    assert catalog.start(timeout=0, since='2024-01-01') is False
+    [(listener_name, callback)] = db.callbacks.items()
+    assert listener_name == 'agents where updated_at > 2024-01-01'
+    callback([], [change('MODIFIED', agent_doc('a'))], None)
+    assert catalog.is_ready
+    assert db.card_reads == ['a']
+    assert catalog.get_card('a') == {'url': 'http://a-v2', 'agent_id': 'a'}
+    catalog.stop()
+    assert all(watch.unsubscribed for watch in db.watches)
+
@@ -0,0 +1,128 @@
+import asyncio
+
+from agent_connect_agent.sub_agents.agent_finder.leaderboards import (
+    LEADERBOARD_COLLECTION, LEADERBOARD_SIZE, _apply_entry, get_leaderboard, leaderboard_entry, leaderboard_id
+)
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeAsyncDb:
+    """Async client holding leaderboard documents by ID; counts document reads."""
+
+    def __init__(self, boards):
+        self.boards = boards
+        self.reads = []
+
+    def collection(self, name):
+        assert name == LEADERBOARD_COLLECTION
+        return self
+
+    def document(self, doc_id):
+        return self._Ref(self, doc_id)
+
+    class _Ref:
+        def __init__(self, db, doc_id):
+            self._db = db
+            self._doc_id = doc_id
+
+        async def get(self):
+            self._db.reads.append(self._doc_id)
+            return FakeSnapshot(self._db.boards.get(self._doc_id))
+
+
+def entry(agent_id, karma, pricing=0.1):
+    return leaderboard_entry(
+        {'agent_id': agent_id, 'karma': karma, 'agent_pricing': pricing, 'capabilities': ['seo']},
+        {'name': agent_id.title(), 'url': f"http://{agent_id}", 'skills': [{'name': 'rank'}, 'not a skill']}
+    )
+
+
+def test_leaderboard_id_quotes_capabilities():
+    assert leaderboard_id('karma') == 'karma'
+    assert leaderboard_id('best_value', 'web/search engine') == 'best_value:web%2Fsearch%20engine'
+
+
+def test_leaderboard_entry_summarizes_the_card():
+    built = entry('a', 50, pricing=0.0)
+    assert built['skills'] == ['rank']
+    # Free agents are valued at the price floor instead of dividing by zero
+    assert built['value_score'] == 5000.0
+    assert leaderboard_entry({'agent_id': 'b'}, {})['value_score'] == 0.0
+
+
+def test_get_leaderboard_reads_one_document():
+    boards = {'karma:seo': {'entries': [entry('a', 9), entry('b', 5), entry('c', 1)], 'truncated': True}}
+    db = FakeAsyncDb(boards)
+    entries = asyncio.run(get_leaderboard(db, 'karma', 'seo', limit=2))
+    assert [board_entry['agent_id'] for board_entry in entries] == ['a', 'b']
+    assert db.reads == ['karma:seo']
+
+
+def test_missing_board_returns_none():
+    assert asyncio.run(get_leaderboard(FakeAsyncDb({}), 'karma', 'seo')) is None
+
+
+def test_truncated_board_cannot_answer_beyond_its_entries():
+    boards = {'karma': {'entries': [entry('a', 9)], 'truncated': True}}
+    assert asyncio.run(get_leaderboard(FakeAsyncDb(boards), 'karma', limit=2)) is None
+    # A complete board lists every qualifying agent, however few
+    boards['karma']['truncated'] = False
+    assert len(asyncio.run(get_leaderboard(FakeAsyncDb(boards), 'karma', limit=2))) == 1
+
+
+def test_apply_entry_ranks_and_caps_the_board():
+    board = {'entries': [entry(f"agent-{i:02d}", 100 - i) for i in range(LEADERBOARD_SIZE)], 'truncated': False}
+    entries, truncated, needs_rebuild = _apply_entry(board, 'new', entry('new', 1000), 'karma')
+    assert entries[0]['agent_id'] == 'new'
+    assert len(entries) == LEADERBOARD_SIZE
+    assert truncated
+    assert not needs_rebuild
+
+
+def test_apply_entry_leaves_out_agents_missing_ranked_fields():
+    entries, _, _ = _apply_entry({'entries': []}, 'a', entry('a', None), 'karma')
+    assert entries == []
+
+
+def test_apply_entry_rebuilds_truncated_board_losing_an_agent():
+    board = {'entries': [entry('a', 9), entry('b', 5)], 'truncated': True}
+    entries, _, needs_rebuild = _apply_entry(board, 'a', None, 'karma')
+    assert [board_entry['agent_id'] for board_entry in entries] == ['b']
+    # An agent beyond the stored entries may now belong on the board
+    assert needs_rebuild
+    _, _, needs_rebuild = _apply_entry(dict(board, truncated=False), 'a', None, 'karma')
+    assert not needs_rebuild
+
+
+def test_apply_entry_best_value_breaks_karma_ties_by_price():
+    board = {'entries': [entry('a', 10, pricing=0.3)]}
+    entries, _, _ = _apply_entry(board, 'b', entry('b', 10, pricing=0.1), 'best_value')
+    assert [board_entry['agent_id'] for board_entry in entries] == ['b', 'a']
+
+
+def test_tools_only_read_boards_for_their_own_sorts(monkeypatch):
+    from agent_connect_agent.sub_agents.agent_finder import agent as finder
+
+    monkeypatch.setattr(finder, 'LEADERBOARDS_ENABLED', True)
+    boards = {
+        'best_value:seo': {'entries': [entry('a', 9)], 'truncated': False},
+        'karma:seo': {'entries': [entry('b', 5)], 'truncated': False},
+    }
+    db = FakeAsyncDb(boards)
+
+    async def read(sort_by, tool_sorts):
+        return await finder._leaderboard_entries(db, sort_by, 'seo', 1, tool_sorts)
+
+    # get_top_agents_by_capability does not rank by best value, so that board is never read
+    assert asyncio.run(read('best_value', finder.TOP_AGENT_SORTS)) is None
+    assert db.reads == []
+    assert [board_entry['agent_id'] for board_entry in asyncio.run(read('karma', finder.TOP_AGENT_SORTS))] == ['b']
+    assert [board_entry['agent_id'] for board_entry in asyncio.run(read('best_value', ('best_value',)))] == ['a']
@@ -0,0 +1,161 @@
+import asyncio
+import base64
+
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder.pagination import (
+    AsyncAgentPager, decode_page_token, encode_page_token
+)
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data=None):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """Async query over documents ordered by ID, supporting start_after, limit and stream."""
+
+    def __init__(self, docs, after=None, limit=None):
+        self._docs = docs
+        self._after = after
+        self._limit = limit
+
+    def start_after(self, doc):
+        return FakeQuery(self._docs, doc.id, self._limit)
+
+    def limit(self, count):
+        return FakeQuery(self._docs, self._after, count)
+
+    async def stream(self):
+        docs = [doc for doc in self._docs if self._after is None or doc.id > self._after]
+        for doc in docs[:self._limit] if self._limit is not None else docs:
+            yield doc
+
+
+class FakeDocumentRef:
+    def __init__(self, db, doc_id):
+        self._db = db
+        self._doc_id = doc_id
+
+    async def get(self):
+        return FakeDoc(self._doc_id, self._db.data.get(self._doc_id))
+
+
+class FakeDb:
+    def __init__(self, data):
+        self.data = data
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return FakeDocumentRef(self, doc_id)
+
+
+def make_agents(count):
+    data = {f"agent-{i:02d}": {'karma': i} for i in range(count)}
+    docs = [FakeDoc(doc_id, agent_data) for doc_id, agent_data in sorted(data.items())]
+    return data, docs
+
+
+def test_page_token_round_trip():
+    token = encode_page_token({'after': 'agent-07'})
+    assert decode_page_token(token) == {'after': 'agent-07'}
+    assert decode_page_token(None) == {}
+    assert decode_page_token('') == {}
+
+
+@pytest.mark.parametrize('token', ['not base64!', encode_page_token({'after': 'x'})[:-4] + '@@@@'])
+def test_malformed_page_token_raises(token):
+    with pytest.raises(ValueError):
+        decode_page_token(token)
+
+
+def test_non_dict_page_token_raises():
+    token = base64.urlsafe_b64encode(b'[1, 2]').decode('ascii')
+    with pytest.raises(ValueError):
+        decode_page_token(token)
+
+
+def collect(pager, stop_after=None):
+    async def run():
+        agent_ids = []
+        async for agent_data in pager:
+            agent_ids.append(agent_data['agent_id'])
+            if len(agent_ids) == stop_after:
+                break
+        return agent_ids
+    return asyncio.run(run())
+
+
+def test_pager_stops_at_read_budget_and_resumes():
+    data, docs = make_agents(25)
+    db = FakeDb(data)
+
+    pager = AsyncAgentPager(db, FakeQuery(docs), page_size=4, read_budget=10)
+    assert collect(pager) == [f"agent-{i:02d}" for i in range(10)]
+    assert pager.reads == 10
+    assert not pager.exhausted
+
+    resumed = AsyncAgentPager(db, FakeQuery(docs), page_size=4, read_budget=10, page_token=pager.next_page_token())
+    assert collect(resumed) == [f"agent-{i:02d}" for i in range(10, 20)]
+    # Restoring the cursor does not count against the budget
+    assert resumed.reads == 10
+    assert resumed.cursor_reads == 1
+
+
+def test_pager_exhausted_has_no_token():
+    data, docs = make_agents(7)
+    pager = AsyncAgentPager(FakeDb(data), FakeQuery(docs), page_size=3, read_budget=100)
+    assert len(collect(pager)) == 7
+    assert pager.exhausted
+    assert pager.next_page_token() is None
+
+
+def test_pager_exhausted_on_an_exact_page_boundary():
+    data, docs = make_agents(6)
+    pager = AsyncAgentPager(FakeDb(data), FakeQuery(docs), page_size=3, read_budget=100)
+    assert len(collect(pager)) == 6
+    # The empty third page is what tells the pager it is done
+    assert pager.reads == 6
+    assert pager.next_page_token() is None
+
+
+def test_pager_without_consumed_documents_has_no_token():
+    data, docs = make_agents(5)
+    pager = AsyncAgentPager(FakeDb(data), FakeQuery(docs), page_size=3, read_budget=10)
+    assert pager.next_page_token() is None
+
+
+def test_pager_token_resumes_after_last_consumed_document():
+    data, docs = make_agents(10)
+    pager = AsyncAgentPager(FakeDb(data), FakeQuery(docs), page_size=5, read_budget=10)
+    assert collect(pager, stop_after=3) == ['agent-00', 'agent-01', 'agent-02']
+    assert decode_page_token(pager.next_page_token()) == {'after': 'agent-02'}
+
+
+def test_malformed_token_is_rejected_before_any_read():
+    data, docs = make_agents(3)
+    with pytest.raises(ValueError):
+        AsyncAgentPager(FakeDb(data), FakeQuery(docs), page_size=2, read_budget=5, page_token='not base64!')
+
+
+def test_pager_token_for_deleted_agent_raises():
+    data, docs = make_agents(3)
+    token = encode_page_token({'after': 'agent-99'})
+    pager = AsyncAgentPager(FakeDb(data), FakeQuery(docs), page_size=2, read_budget=5, page_token=token)
+    with pytest.raises(ValueError, match='no longer exists'):
+        collect(pager)
+
+
+def test_pager_clamps_page_size_and_budget():
+    data, docs = make_agents(5)
+    pager = AsyncAgentPager(FakeDb(data), FakeQuery(docs), page_size=0, read_budget=0)
+    assert collect(pager) == ['agent-00']
+    assert (pager.page_size, pager.read_budget) == (1, 1)
@@ -0,0 +1,58 @@
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder.projection import (
+    card_field_paths, project_card, project_cards, validate_projection
+)
+
+CARD = {
+    'agent_id': 'seo-1',
+    'name': 'Ranker',
+    'url': 'http://ranker',
+    'description': 'A long description the model does not need',
+    'pricing': {'cost_per_request': 0.2},
+    'metadata': {'karma': 40},
+    'skills': [{'name': 'audit', 'description': 'Audits pages'}, 'not a skill'],
+    'search_metadata': {'matched_capability': 'seo', 'searched_karma': 42},
+}
+
+
+def test_validate_projection():
+    assert validate_projection(None) == 'full'
+    assert validate_projection(' Summary ') == 'summary'
+    with pytest.raises(ValueError, match='Unknown projection'):
+        validate_projection('tiny')
+
+
+def test_field_masks():
+    assert card_field_paths('connect') == ['url']
+    assert card_field_paths('full') is None
+
+
+def test_summary_keeps_only_what_is_needed_to_choose():
+    assert project_card(CARD, 'summary') == {
+        'agent_id': 'seo-1',
+        'name': 'Ranker',
+        'url': 'http://ranker',
+        'pricing': 0.2,
+        # Values the search ranked by win over the card's copies
+        'karma': 42,
+        'matched_capabilities': ['seo'],
+        'skills': ['audit'],
+    }
+
+
+def test_summary_of_an_agent_without_a_card_and_with_telemetry():
+    basic = {
+        'agent_id': 'b', 'agent_name': 'Basic', 'agent_url': 'http://basic', 'agent_pricing': 0.1, 'karma': 5,
+        'search_metadata': {'matched_capabilities': ['seo'], 'latency_p95_ms': 120.0, 'health': 'alive'},
+    }
+    summary = project_card(basic, 'summary')
+    assert (summary['name'], summary['url'], summary['pricing'], summary['karma']) == ('Basic', 'http://basic', 0.1, 5)
+    assert summary['latency_p95_ms'] == 120.0
+    assert summary['success_rate'] is None
+    assert summary['health'] == 'alive'
+
+
+def test_connect_and_full():
+    assert project_cards([CARD], 'connect') == [{'agent_id': 'seo-1', 'url': 'http://ranker'}]
+    assert project_card(CARD, 'full') is CARD
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder.query_cache import (
+    QueryCache, cached_tool, normalize_capabilities, normalize_lower
+)
+
+
+def test_get_put_and_ttl_expiry():
+    cache = QueryCache(max_entries=4, ttl_seconds=0.05)
+    cache.put('k', [1])
+    assert cache.get('k') == (True, [1])
+    time.sleep(0.06)
+    assert cache.get('k') == (False, None)
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate_drops_entries_and_bumps_generation():
+    cache = QueryCache()
+    cache.put('a', 1)
+    generation = cache.generation
+    cache.invalidate()
+    assert cache.get('a') == (False, None)
+    assert cache.generation == generation + 1
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_result_from_older_generation_is_not_stored():
+    cache = QueryCache()
+    generation = cache.generation
+    cache.invalidate()
+    cache.put('a', 1, generation=generation)
+    assert cache.get('a') == (False, None)
+    cache.put('a', 1, generation=cache.generation)
+    assert cache.get('a') == (True, 1)
+
+
+def test_disabled_cache():
+    assert not QueryCache(max_entries=0).enabled
+    assert not QueryCache(ttl_seconds=0).enabled
+
+
+def test_normalize_capabilities_skips_non_strings():
+    assert normalize_capabilities([' seo', 42, None, 'seo', 'translation']) == ['seo', 'translation']
+    assert normalize_capabilities([]) == []
+    assert normalize_capabilities(None) is None
+    assert normalize_capabilities('seo') == 'seo'
+
+
+def test_cached_tool_normalizes_arguments_and_copies_results():
+    cache = QueryCache()
+    calls = []
+
+    @cached_tool(cache, {'capabilities': normalize_capabilities, 'sort_by': normalize_lower})
+    async def find(capabilities, sort_by='karma'):
+        calls.append((capabilities, sort_by))
+        return [{'agent_id': 'a', 'capabilities': capabilities}]
+
+    async def run():
+        first = await find(['seo', 'translation'], 'Karma')
+        first[0]['annotated'] = True
+        return await find(capabilities=['translation', 'seo', 'seo'])
+
+    second = asyncio.run(run())
+    assert calls == [(['seo', 'translation'], 'karma')]
+    assert 'annotated' not in second[0]
+
+
+def test_cached_tool_skips_empty_and_error_results():
+    cache = QueryCache()
+    results = iter([[], {'error': 'unavailable'}, [{'agent_id': 'a'}]])
+
+    @cached_tool(cache)
+    async def find(query):
+        return next(results)
+
+    async def run():
+        return [await find('x') for _ in range(4)]
+
+    assert asyncio.run(run()) == [[], {'error': 'unavailable'}, [{'agent_id': 'a'}], [{'agent_id': 'a'}]]
+
+
+def test_cached_tool_bypasses_a_disabled_cache():
+    cache = QueryCache(max_entries=0)
+    calls = []
+
+    @cached_tool(cache)
+    async def find(query):
+        calls.append(query)
+        return [{'agent_id': 'a'}]
+
+    async def run():
+        await find('x')
+        await find('x')
+
+    asyncio.run(run())
+    assert calls == ['x', 'x']
+
+
+def test_cached_tool_rejects_plain_functions():
+    with pytest.raises(TypeError):
+        @cached_tool(QueryCache())
+        def find(query):
+            return []
+
+
+def test_cached_coroutine_tool_ignores_result_computed_across_invalidation():
+    cache = QueryCache()
+    calls = []
+
+    @cached_tool(cache)
+    async def find(query):
+        calls.append(query)
+        # The catalog changes while this result is being computed
+        cache.invalidate()
+        await asyncio.sleep(0)
+        return [{'agent_id': 'a'}]
+
+    async def run():
+        await find('x')
+        await find('x')
+
+    asyncio.run(run())
+    assert calls == ['x', 'x']
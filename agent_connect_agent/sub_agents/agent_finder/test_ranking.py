@@ -0,0 +1,174 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder.ranking import (
+    ColumnarCatalog, blended_score, select_top_k, telemetry_only_change
+)
+
+
+def random_agents(count, seed=1):
+    rng = random.Random(seed)
+    agents = []
+    for i in range(count):
+        agent_data = {'agent_id': f"agent-{i:03d}", 'agent_name': f"Agent {rng.randint(0, 20)}"}
+        # Leave fields out (or non-numeric) now and then, like documents written before they existed
+        if rng.random() > 0.1:
+            agent_data['karma'] = rng.choice([rng.randint(0, 50), rng.randint(0, 50), 'n/a'])
+        if rng.random() > 0.1:
+            agent_data['agent_pricing'] = round(rng.uniform(0, 0.2), 2)
+        if rng.random() > 0.5:
+            agent_data['latency_p95_ms'] = round(rng.uniform(10, 2000), 1)
+            agent_data['success_rate'] = round(rng.uniform(0.5, 1), 2)
+        agents.append(agent_data)
+    return agents
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def expected_top(agents, field, descending, limit):
+    # Firestore order_by: documents without the field drop out; ties fall back to agent_id
+    ranked = sorted(
+        (agent_data for agent_data in agents if is_number(agent_data.get(field))),
+        key=lambda agent_data: (-agent_data[field] if descending else agent_data[field], agent_data['agent_id'])
+    )
+    return [agent_data['agent_id'] for agent_data in ranked[:limit]]
+
+
+@pytest.mark.parametrize('field', ['karma', 'agent_pricing', 'latency_p95_ms'])
+@pytest.mark.parametrize('descending', [True, False])
+@pytest.mark.parametrize('limit', [1, 5, 40, None])
+def test_top_k_matches_sorting(field, descending, limit):
+    agents = random_agents(150)
+    columns = ColumnarCatalog(agents, [agent_data['agent_id'] for agent_data in agents])
+    mask = columns.filter_mask()
+    rows = columns.top_k(mask, [(columns.column(field), descending)], limit)
+    assert list(columns.ids[rows]) == expected_top(agents, field, descending, limit)
+
+
+def test_top_k_secondary_key_breaks_ties():
+    agents = [
+        {'agent_id': 'a', 'karma': 10, 'agent_pricing': 0.3},
+        {'agent_id': 'b', 'karma': 10, 'agent_pricing': 0.1},
+        {'agent_id': 'c', 'karma': 10, 'agent_pricing': 0.2},
+        {'agent_id': 'd', 'karma': 5, 'agent_pricing': 0.0},
+    ]
+    columns = ColumnarCatalog(agents, ['a', 'b', 'c', 'd'])
+    rows = columns.top_k(columns.filter_mask(), [(columns.karma, True), (columns.pricing, False)], 2)
+    assert list(columns.ids[rows]) == ['b', 'c']
+
+
+def test_missing_and_non_numeric_fields_are_nan():
+    agents = [
+        {'agent_id': 'a', 'karma': 'high'},
+        {'agent_id': 'b', 'karma': True},
+        {'agent_id': 'c'},
+        {'agent_id': 'd', 'karma': 3},
+    ]
+    columns = ColumnarCatalog(agents, ['a', 'b', 'c', 'd'])
+    assert np.isnan(columns.karma[:3]).all()
+    assert columns.karma[3] == 3
+    rows = columns.top_k(columns.filter_mask(), [(columns.karma, True)], None)
+    assert list(columns.ids[rows]) == ['d']
+
+
+def test_nan_never_passes_range_filters():
+    agents = [{'agent_id': 'a'}, {'agent_id': 'b', 'karma': 7, 'agent_pricing': 0.05}]
+    columns = ColumnarCatalog(agents, ['a', 'b'])
+    assert list(columns.filter_mask(min_karma=0)) == [False, True]
+    assert list(columns.filter_mask(max_price=1.0)) == [False, True]
+
+
+def test_filter_mask_excludes_agents_without_card():
+    agents = [{'agent_id': 'a', 'karma': 1}, {'agent_id': 'b', 'karma': 2}]
+    columns = ColumnarCatalog(agents, ['a'])
+    assert list(columns.filter_mask()) == [True, False]
+    assert list(columns.filter_mask(agent_ids=['b'])) == [False, False]
+
+
+def test_unmeasured_agents_sort_after_measured_ones():
+    agents = [
+        {'agent_id': 'a', 'karma': 1},
+        {'agent_id': 'b', 'karma': 1, 'latency_p95_ms': 900.0},
+        {'agent_id': 'c', 'karma': 1, 'latency_p95_ms': 100.0},
+    ]
+    columns = ColumnarCatalog(agents, ['a', 'b', 'c'])
+    rows = columns.top_k(columns.filter_mask(), [(columns.latency_order, False)], None)
+    assert list(columns.ids[rows]) == ['c', 'b', 'a']
+
+
+def test_blended_column_matches_blended_score():
+    agents = random_agents(60, seed=4)
+    columns = ColumnarCatalog(agents)
+    by_id = {agent_data['agent_id']: agent_data for agent_data in agents}
+    for agent_id, blended in zip(columns.ids, columns.blended):
+        assert math.isclose(blended, blended_score(by_id[agent_id]))
+
+
+def test_with_telemetry_matches_rebuild():
+    agents = random_agents(80, seed=9)
+    columns = ColumnarCatalog(agents)
+    rng = random.Random(2)
+    for agent_data in agents:
+        agent_data['latency_p95_ms'] = round(rng.uniform(10, 500), 1)
+        agent_data['success_rate'] = round(rng.uniform(0.5, 1), 2)
+
+    refreshed = columns.with_telemetry({agent_data['agent_id']: agent_data for agent_data in agents})
+    rebuilt = ColumnarCatalog(agents)
+    for name in ('latency_p95', 'success_rate', 'latency_order', 'blended'):
+        assert np.array_equal(getattr(refreshed, name), getattr(rebuilt, name))
+    # The original view is left as it was
+    assert np.isnan(columns.latency_p95).any()
+    assert refreshed.names_lower is columns.names_lower
+
+
+def test_telemetry_only_change():
+    previous = {'agent_id': 'a', 'karma': 5, 'telemetry_updated_at': 1, 'latency_p95_ms': 10.0, 'updated_at': 1}
+    flushed = dict(previous, telemetry_updated_at=2, latency_p95_ms=20.0, updated_at=2)
+    assert telemetry_only_change(previous, flushed)
+    assert not telemetry_only_change(None, flushed)
+    assert not telemetry_only_change(previous, dict(flushed, karma=6))
+    # A writer replacing the document drops the telemetry stamp
+    rewritten = {'agent_id': 'a', 'karma': 5, 'updated_at': 3}
+    assert not telemetry_only_change(previous, rewritten)
+
+
+@pytest.mark.parametrize('limit', [1, 5, 20, 500])
+def test_select_top_k_matches_a_stable_sort(limit):
+    rng = random.Random(limit)
+    # Few distinct scores, so ties are common
+    candidates = [{'agent_id': f"agent-{i:03d}", 'score': rng.randint(0, 5)} for i in range(200)]
+    expected = sorted(candidates, key=lambda agent_data: agent_data['score'], reverse=True)[:limit]
+    assert select_top_k(iter(candidates), limit, lambda agent_data: agent_data['score']) == expected
+
+
+def test_select_top_k_takes_ranked_candidates_as_they_come():
+    consumed = []
+
+    def candidates():
+        for i in range(100):
+            consumed.append(i)
+            yield {'agent_id': str(i)}
+
+    assert [agent_data['agent_id'] for agent_data in select_top_k(candidates(), 3)] == ['0', '1', '2']
+    # Nothing beyond the winners is read
+    assert consumed == [0, 1, 2]
+    assert select_top_k(candidates(), 0, lambda agent_data: 1) == []
+
+
+def test_match_rank_key_orders_by_match_score_first():
+    from agent_connect_agent.sub_agents.agent_finder import agent as finder
+
+    candidates = [
+        {'agent_id': 'partial-fast', 'capability_match_score': 1, 'latency_p95_ms': 10.0, 'karma': 50},
+        {'agent_id': 'exact-unmeasured', 'capability_match_score': 2, 'karma': 50},
+        {'agent_id': 'exact-slow', 'capability_match_score': 2, 'latency_p95_ms': 900.0, 'karma': 1},
+    ]
+    by_latency = select_top_k(candidates, 3, finder._match_rank_key('latency'))
+    assert [agent_data['agent_id'] for agent_data in by_latency] == ['exact-slow', 'exact-unmeasured', 'partial-fast']
+    by_karma = select_top_k(candidates, 2, finder._match_rank_key('karma'))
+    assert [agent_data['agent_id'] for agent_data in by_karma] == ['exact-unmeasured', 'exact-slow']
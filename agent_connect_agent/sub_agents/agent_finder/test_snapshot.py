@@ -0,0 +1,93 @@
+import datetime
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from agent_connect_agent.sub_agents.agent_finder.snapshot import CatalogSnapshot, export_snapshot, write_snapshot
+
+AGENTS = {
+    'b': {'agent_id': 'b', 'agent_name': 'Hotels', 'agent_url': 'http://hotels', 'karma': 7, 'agent_pricing': 0.5,
+          'capabilities': ['booking', 'travel'], 'updated_at': datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)},
+    'a': {'agent_id': 'a', 'agent_name': 'Weather', 'agent_url': 'http://weather', 'karma': True,
+          'capabilities': ['travel', None]},
+}
+CARDS = {
+    'a': {'agent_id': 'a', 'name': 'Weather', 'skills': [{'name': 'forecast'}]},
+    'c': {'agent_id': 'c', 'name': 'Card only'},
+}
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / 'catalog.snap')
+    write_snapshot(path, AGENTS, CARDS, created_at=1700000000.0)
+    snapshot = CatalogSnapshot.open(path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_rows_round_trip_in_agent_id_order(snapshot):
+    assert len(snapshot) == 3
+    rows = list(snapshot.items())
+    assert [agent_id for agent_id, _, _ in rows] == ['a', 'b', 'c']
+    assert rows[0][2] == CARDS['a']
+    # Timestamps are stored as ISO 8601 strings
+    assert rows[1][1]['updated_at'] == '2024-05-01T00:00:00+00:00'
+    assert rows[2][1] is None
+
+
+def test_numeric_columns_and_capabilities(snapshot):
+    karma = snapshot.column('karma')
+    # Booleans and missing values are not numbers
+    assert math.isnan(karma[0]) and karma[1] == 7 and math.isnan(karma[2])
+    assert snapshot.column('agent_pricing')[1] == 0.5
+    assert snapshot.capabilities(0) == ['travel']
+    assert snapshot.capabilities(1) == ['booking', 'travel']
+    assert snapshot.capabilities(2) == []
+
+
+def test_created_at(snapshot):
+    assert snapshot.created_at_datetime == datetime.datetime.fromtimestamp(1700000000, tz=datetime.timezone.utc)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'not_a_snapshot'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError, match='not a version 1'):
+        CatalogSnapshot.open(str(path))
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data, parent_id=None):
+        self.id = doc_id
+        self._data = data
+        self.reference = SimpleNamespace(parent=SimpleNamespace(parent=SimpleNamespace(id=parent_id)))
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeDb:
+    def collection(self, name):
+        assert name == 'agents'
+        return SimpleNamespace(stream=lambda: [FakeDoc('a', {'agent_name': 'Weather'})])
+
+    def collection_group(self, name):
+        assert name == 'agent_cards'
+        return SimpleNamespace(stream=lambda: [
+            FakeDoc('card', {'name': 'Weather'}, parent_id='a'),
+            FakeDoc('draft', {'name': 'Ignored'}, parent_id='b'),
+        ])
+
+
+def test_export_reads_agents_and_their_cards(tmp_path):
+    path = str(tmp_path / 'catalog.snap')
+    assert export_snapshot(FakeDb(), path) == 1
+    snapshot = CatalogSnapshot.open(path)
+    try:
+        [(agent_id, agent_data, agent_card)] = list(snapshot.items())
+        assert agent_data == {'agent_name': 'Weather', 'agent_id': 'a'}
+        assert agent_card == {'name': 'Weather', 'agent_id': 'a'}
+    finally:
+        snapshot.close()
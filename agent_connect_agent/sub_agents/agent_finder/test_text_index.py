@@ -0,0 +1,55 @@
+from agent_connect_agent.sub_agents.agent_finder.text_index import TextIndex, agent_document_text, tokenize
+
+
+def test_tokenize_splits_on_punctuation_and_lowercases():
+    assert tokenize('SEO-audit for web_sites, 2024!') == ['seo', 'audit', 'for', 'web', 'sites', '2024']
+
+
+def test_document_text_covers_description_and_skills():
+    card = {
+        'name': 'Card name',
+        'skills': [{'description': 'Audits pages', 'tags': ['seo', 7], 'examples': ['Audit my site']}],
+    }
+    text = agent_document_text({'agent_name': 'Ranker', 'description': 'Search ranking'}, card)
+    assert text == 'Ranker Search ranking Audits pages seo Audit my site'
+    # Without the agent document the card's name stands in
+    assert agent_document_text(None, card).startswith('Card name')
+
+
+def index():
+    index = TextIndex()
+    index.add('seo', 'SEO audit and keyword research for websites')
+    index.add('translate', 'Translate documents between languages')
+    index.add('seo-lite', 'Keyword research')
+    return index
+
+
+def test_search_ranks_by_bm25():
+    results = index().search('seo keyword audit')
+    assert [agent_id for agent_id, _ in results] == ['seo', 'seo-lite']
+    assert results[0][1] > results[1][1] > 0
+    assert index().search('weather') == []
+    assert len(index().search('keyword', limit=1)) == 1
+
+
+def test_reindexing_and_removal_update_the_postings():
+    text_index = index()
+    text_index.add('translate', 'Weather forecasts')
+    assert [agent_id for agent_id, _ in text_index.search('weather')] == ['translate']
+    assert text_index.search('languages') == []
+    text_index.remove('seo')
+    text_index.remove('unknown')
+    assert len(text_index) == 2
+    assert 'seo' not in text_index.scores('audit keyword')
+
+
+def test_from_catalog_and_save_load_round_trip(tmp_path):
+    text_index = TextIndex.from_catalog(
+        {'a': {'agent_name': 'Weather', 'description': 'Forecasts'}},
+        {'b': {'name': 'Hotels', 'skills': [{'tags': ['booking']}]}},
+    )
+    path = tmp_path / 'text_index.json'
+    text_index.save(str(path))
+    loaded = TextIndex.load(str(path))
+    assert loaded.search('booking forecasts') == text_index.search('booking forecasts')
+    assert len(loaded) == 2
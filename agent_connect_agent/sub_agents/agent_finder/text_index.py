@@ -0,0 +1,165 @@
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into alphanumeric tokens (underscores and hyphens split words)."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def agent_document_text(agent_data: Optional[Dict[str, Any]], agent_card: Optional[Dict[str, Any]]) -> str:
+    """
+    Builds the searchable text for an agent.
+
+    Covers the agent name and description plus every skill's description, tags
+    and examples from the agent card. The card's name and description are used
+    when the main agent document is not available.
+    """
+    source = agent_data or agent_card or {}
+    parts = [source.get('agent_name', source.get('name')), source.get('description')]
+    for skill in (agent_card or {}).get('skills') or []:
+        parts.append(skill.get('description'))
+        parts.extend(skill.get('tags') or [])
+        parts.extend(skill.get('examples') or [])
+    return ' '.join(part for part in parts if isinstance(part, str))
+
+
+class TextIndex:
+    """
+    Incrementally updatable BM25 index over agent text.
+
+    The index can be built offline from a catalog snapshot with from_catalog(),
+    persisted with save() and reopened with load(); the catalog mirror keeps a
+    live instance current through add() and remove().
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    @classmethod
+    def from_catalog(cls, agents: Dict[str, Dict[str, Any]], cards: Dict[str, Dict[str, Any]]) -> 'TextIndex':
+        """
+        Builds an index from a catalog snapshot.
+
+        Args:
+            agents: Main agent documents keyed by agent ID
+            cards: Agent cards keyed by agent ID
+
+        Returns:
+            A populated TextIndex
+        """
+        index = cls()
+        for agent_id in set(agents) | set(cards):
+            index.add(agent_id, agent_document_text(agents.get(agent_id), cards.get(agent_id)))
+        return index
+
+    def add(self, agent_id: str, text: str):
+        """Indexes (or re-indexes) the text for an agent."""
+        term_counts = Counter(tokenize(text))
+        with self._lock:
+            self._remove(agent_id)
+            for term, count in term_counts.items():
+                self._postings[term][agent_id] = count
+            self._doc_terms[agent_id] = dict(term_counts)
+            self._doc_lengths[agent_id] = sum(term_counts.values())
+            self._total_length += self._doc_lengths[agent_id]
+
+    def remove(self, agent_id: str):
+        """Removes an agent from the index."""
+        with self._lock:
+            self._remove(agent_id)
+
+    def _remove(self, agent_id: str):
+        for term in self._doc_terms.pop(agent_id, {}):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(agent_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(agent_id, 0)
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """
+        Computes BM25 scores for every agent containing at least one query term.
+
+        Args:
+            query: Free-text query
+
+        Returns:
+            Dictionary mapping agent ID to BM25 score
+        """
+        scores: Dict[str, float] = defaultdict(float)
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if doc_count == 0:
+                return {}
+            average_length = self._total_length / doc_count or 1.0
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for agent_id, term_frequency in postings.items():
+                    length_norm = 1 - BM25_B + BM25_B * self._doc_lengths[agent_id] / average_length
+                    scores[agent_id] += idf * term_frequency * (BM25_K1 + 1) / (term_frequency + BM25_K1 * length_norm)
+        return dict(scores)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Returns the best matching agents for a free-text query.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+
+        Returns:
+            List of (agent ID, BM25 score) pairs, best first (ties broken by agent ID)
+        """
+        scores = self.scores(query)
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializes the index to a JSON-compatible dictionary."""
+        with self._lock:
+            return {'documents': {agent_id: dict(terms) for agent_id, terms in self._doc_terms.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TextIndex':
+        """Restores an index serialized with to_dict()."""
+        index = cls()
+        for agent_id, terms in data.get('documents', {}).items():
+            for term, count in terms.items():
+                index._postings[term][agent_id] = count
+            index._doc_terms[agent_id] = dict(terms)
+            index._doc_lengths[agent_id] = sum(terms.values())
+            index._total_length += index._doc_lengths[agent_id]
+        return index
+
+    def save(self, path: str):
+        """Writes the index to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> 'TextIndex':
+        """Reads an index written by save()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
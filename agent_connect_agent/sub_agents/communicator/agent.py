@@ -1,11 +1,115 @@
+import asyncio
+import functools
+import os
+import time
 from google.adk.agents import Agent
-from python_a2a import A2AClient, Message, TextContent, MessageRole
-from typing import Dict
+from google.adk.tools import ToolContext
+from python_a2a import Message, TextContent, MessageRole
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
-# Global dictionary to store initialized clients
-_clients: Dict[str, A2AClient] = {}
+from .batching import MessageBatcher
+from .deadline import call_deadline, set_task_budget, task_deadline
+from .health import HEALTH_PROBE_ENABLED, get_prober
+from .registry import ClientRegistry
+from .resilience import HEDGE_DELAY, CircuitBreaker, CircuitOpenError, hedged_call
+from .response_cache import ResponseCache
+from .telemetry import TELEMETRY_PERSIST_ENABLED, AgentTelemetry
+from .transport import DEFAULT_TIMEOUT, PooledA2AClient
+from .workflow import WorkflowError, execute_workflow
 
-def connect_to_agent(agent_url: str) -> str:
+# Connected clients, bounded and reaped when idle (see registry.py). Clients share one pooled
+# keep-alive HTTP transport (see transport.py), so connections are reused across messages and agents.
+_clients = ClientRegistry()
+
+# Set COMMUNICATOR_SESSION_SCOPED=1 to give every session its own set of connected agents
+SESSION_SCOPED = os.getenv('COMMUNICATOR_SESSION_SCOPED', '').lower() in ('1', 'true', 'yes')
+
+# Responses to messages sent with cacheable=True, shared by every session (see response_cache.py)
+_response_cache = ResponseCache()
+
+# Messages to agents listed in COMMUNICATOR_BATCH_AGENTS are gathered for a few milliseconds and sent
+# to each agent together, identical cacheable ones only once (see batching.py)
+_batcher = MessageBatcher()
+
+# Set COMMUNICATOR_STREAMING_TOOLS=1 to also offer the *_stream tools. ADK only streams async-generator
+# tools in live sessions (runner.run_live); under the regular runner they would return a generator
+# object instead of the answer, so they stay off unless the communicator runs in a streaming session.
+STREAMING_TOOLS = os.getenv('COMMUNICATOR_STREAMING_TOOLS', '').lower() in ('1', 'true', 'yes')
+
+# Failure and latency window per agent URL; agents failing too often are fast-failed for a while (see resilience.py)
+_breaker = CircuitBreaker()
+
+# Rolling latency percentiles and success rates per agent, written to the agents' Firestore documents
+# for agent_finder's latency ranking when COMMUNICATOR_TELEMETRY_PERSIST=1 (see telemetry.py)
+_telemetry = AgentTelemetry()
+
+def _telemetry_db():
+    # Imported here: agent_finder owns the Firestore client and imports this package itself
+    from ..agent_finder.agent import get_firestore_client
+    return get_firestore_client()
+
+def _record_outcome(agent_url: str, succeeded: bool, latency: Optional[float] = None):
+    """Feeds the outcome of a call to the circuit breaker and the latency telemetry."""
+    _breaker.record(agent_url, succeeded, latency)
+    _telemetry.record(agent_url, succeeded, latency)
+    if TELEMETRY_PERSIST_ENABLED:
+        _telemetry.start(_telemetry_db)
+
+# Liveness and RTT of agents, probed in the background when COMMUNICATOR_HEALTH_PROBE=1 (see health.py)
+_prober = get_prober()
+
+def _watch(agent_urls: List[str]):
+    """Adds agents to the background health probes, starting the prober on first use."""
+    if HEALTH_PROBE_ENABLED:
+        _prober.watch(agent_urls)
+        _prober.start()
+
+def _health_note(agent_url: str) -> str:
+    status = _prober.status(agent_url)
+    if status is None:
+        return ""
+    if not status['alive']:
+        return f" (failed its last {status['consecutive_failures']} health checks: {status['error']})"
+    return f" (healthy, {status['rtt_ms']} ms round trip)"
+
+def _scope(tool_context: Optional[ToolContext]) -> Optional[str]:
+    """Registry scope of the calling session, or None when connections are shared by all sessions."""
+    if not SESSION_SCOPED or tool_context is None:
+        return None
+    session = getattr(tool_context, 'session', None) or tool_context._invocation_context.session
+    return session.id
+
+def _task_deadline(tool_context: Optional[ToolContext]) -> Optional[float]:
+    """Deadline of the current user turn (see deadline.py), or None when it is unbounded."""
+    if tool_context is None:
+        return None
+    return task_deadline(tool_context.state, tool_context.invocation_id)
+
+def set_task_deadline(seconds: float, tool_context: ToolContext = None) -> str:
+    """
+    Set the total time all agent calls of the current request may take.
+    
+    Every later call (single messages, broadcasts, workflow nodes, streams) is given only the
+    time that is left as its timeout, and calls still running when the budget is spent are
+    cancelled. The budget applies until the user's next message.
+    
+    Args:
+        seconds (float): Seconds from now
+        
+    Returns:
+        str: Confirmation message
+        
+    Example:
+        result = set_task_deadline(60)
+    """
+    if tool_context is None:
+        return "Task deadlines need a session; pass a timeout to each call instead"
+    if seconds <= 0:
+        return "The deadline must be a positive number of seconds"
+    set_task_budget(tool_context.state, tool_context.invocation_id, seconds)
+    return f"Agent calls for this request must finish within {seconds} seconds"
+
+def connect_to_agent(agent_url: str, tool_context: ToolContext = None) -> str:
     """
     Connect to an A2A agent and return a connection status message.
     
@@ -19,19 +123,33 @@ def connect_to_agent(agent_url: str) -> str:
         result = connect_to_agent("http://127.0.0.1:5001")
     """
     try:
-        client = A2AClient(agent_url)
-        _clients[agent_url] = client
+        client = _clients.connect(agent_url, _scope(tool_context))
+        _watch([agent_url])
+        agent_card = _prober.agent_card(agent_url)
+        if agent_card is not None:
+            client.set_agent_card(agent_card)
+        if not _prober.is_alive(agent_url):
+            return f"Connected to agent at {agent_url}, but it looks down{_health_note(agent_url)}. Consider an alternative agent."
         return f"Successfully connected to agent at {agent_url}"
     except Exception as e:
         return f"Failed to connect to agent at {agent_url}: {str(e)}"
 
-def send_message_to_agent(agent_url: str, message: str) -> str:
+async def send_message_to_agent(
+    agent_url: str,
+    message: str,
+    cacheable: bool = False,
+    timeout: float = DEFAULT_TIMEOUT,
+    tool_context: ToolContext = None
+) -> str:
     """
     Send a message to a connected A2A agent and return the response.
     
     Args:
         agent_url (str): URL of the agent to send message to (must be previously connected)
         message (str): Text message to send to the agent
+        cacheable (bool): True for idempotent lookups whose answer does not change between
+            calls; a recent response to the same message is then reused instead of asking again
+        timeout (float): Seconds to wait for the answer (cut short by the task deadline, if set)
         
     Returns:
         str: Response text from the agent if successful, error message if failed
@@ -39,22 +157,375 @@ def send_message_to_agent(agent_url: str, message: str) -> str:
     Example:
         response = send_message_to_agent("http://127.0.0.1:5001", "What is the weather like today?")
     """
-    if agent_url not in _clients:
+    scope = _scope(tool_context)
+    if _clients.get(agent_url, scope) is None:
         return f"No connection found for {agent_url}. Please connect to the agent first using connect_to_agent()."
     
-    client = _clients[agent_url]
+    # Awaited rather than run on a worker thread, so a hung agent is cancelled at the deadline
+    result = await _send_one(agent_url, message, timeout, scope, cacheable, deadline=_task_deadline(tool_context))
+    return result['response'] if result['status'] == 'ok' else result['error']
+
+async def send_message_to_agent_stream(
+    agent_url: str,
+    message: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    tool_context: ToolContext = None
+) -> AsyncGenerator[str, None]:
+    """
+    Send a message to a connected A2A agent and stream the response as it is generated.
+    
+    Agents whose agent card advertises capabilities.streaming are read chunk by chunk, so
+    the first words arrive long before a long answer is complete. Other agents answer in
+    one chunk, exactly like send_message_to_agent. ADK streams it only in live sessions, so it is
+    offered only with COMMUNICATOR_STREAMING_TOOLS=1 (see STREAMING_TOOLS).
+    
+    Args:
+        agent_url (str): URL of the agent to send message to (must be previously connected)
+        message (str): Text message to send to the agent
+        timeout (float): Seconds the whole response may take (cut short by the task deadline, if set)
+        
+    Yields:
+        str: Response text chunks; an error message if the agent fails or runs out of time
+        
+    Example:
+        async for chunk in send_message_to_agent_stream("http://127.0.0.1:5001", "Write a 7 day forecast report"):
+            print(chunk, end="")
+    """
+    client = _clients.get(agent_url, _scope(tool_context))
+    if client is None:
+        yield f"No connection found for {agent_url}. Please connect to the agent first using connect_to_agent()."
+        return
+    if _breaker.state(agent_url) == 'open':
+        yield _circuit_open_message(agent_url)
+        return
+    
     send_message = Message(content=TextContent(text=message), role=MessageRole.USER)
+    deadline = call_deadline(timeout, _task_deadline(tool_context))
+    chunks = _stream_chunks(client, send_message)
     
     try:
-        response = client.send_message(send_message)
-        if hasattr(response.content, 'text'):
-            return response.content.text
+        while True:
+            # Each wait is bounded by what is left, so a stalled stream is cancelled at the deadline
+            yield await asyncio.wait_for(chunks.__anext__(), deadline - time.perf_counter())
+    except StopAsyncIteration:
+        pass
+    except asyncio.TimeoutError:
+        yield f"\n[{agent_url} did not finish within the time available; the response is incomplete]"
+    except Exception as e:
+        yield f"Error sending message to {agent_url}: {str(e)}"
+    finally:
+        await chunks.aclose()
+
+async def _stream_chunks(client: PooledA2AClient, send_message: Message) -> AsyncGenerator[str, None]:
+    if await client.supports_streaming_async():
+        async for chunk in client.stream_message_async(send_message):
+            yield chunk
+    else:
+        response = await client.send_message_async(send_message)
+        yield _response_text(response)
+
+def _response_text(response: Message) -> str:
+    if hasattr(response.content, 'text'):
+        return response.content.text
+    else:
+        return "No text response received from agent"
+
+def _circuit_open_message(agent_url: str) -> str:
+    return (f"{agent_url} has been failing and is paused for {_breaker.retry_after(agent_url):.0f} more seconds. "
+            f"Use an alternative agent from agent_finder instead.")
+
+def _hedge_delay(agent_url: str) -> float:
+    """Seconds to wait on an agent before hedging: its recent p95 latency, or HEDGE_DELAY while unknown."""
+    p95 = _breaker.p95(agent_url)
+    return HEDGE_DELAY if p95 is None else p95
+
+async def _attempt(
+    agent_url: str,
+    message: str,
+    deadline: float,
+    scope: Optional[str] = None,
+    cacheable: bool = False
+) -> Tuple[str, bool]:
+    """Sends one message to one agent, recording the outcome in the circuit breaker; raises on failure."""
+    if not _breaker.allow(agent_url):
+        raise CircuitOpenError(_circuit_open_message(agent_url))
+    # Clients hold no connections of their own, so unconnected agents get a throwaway one
+    client = _clients.get(agent_url, scope) or PooledA2AClient(agent_url)
+    send_message = Message(content=TextContent(text=message), role=MessageRole.USER)
+    shared = False
+    
+    async def fetch():
+        nonlocal shared
+        if _batcher.enabled_for(agent_url):
+            response, shared = _batcher.submit(client, send_message, cacheable)
+            return _response_text(await response)
+        return _response_text(await client.send_message_async(send_message))
+    
+    started = time.perf_counter()
+    if cacheable:
+        response, cached = _response_cache.fetch_async(agent_url, message, fetch)
+    else:
+        response, cached = fetch(), False
+    try:
+        response_text = await asyncio.wait_for(response, deadline - started)
+    except asyncio.CancelledError:
+        # A hedge lost the race; that says nothing about the agent's health
+        _breaker.release(agent_url)
+        raise
+    except Exception:
+        # A response shared with another caller is recorded once, by that caller
+        if cached or shared:
+            _breaker.release(agent_url)
+        else:
+            _record_outcome(agent_url, False)
+        raise
+    if cached or shared:
+        _breaker.release(agent_url)
+    else:
+        _record_outcome(agent_url, True, time.perf_counter() - started)
+    return response_text, cached
+
+async def _send_one(
+    agent_url: str,
+    message: str,
+    timeout: float,
+    scope: Optional[str] = None,
+    cacheable: bool = False,
+    alternate_urls: Optional[List[str]] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Sends one message of a broadcast, capturing failures in the result instead of raising.
+    
+    With alternate_urls the request is hedged: the next alternate is tried as soon as the
+    current agent fails, or once it runs past its p95 latency, and the first answer wins.
+    The call gets timeout seconds, or less if the task deadline (perf_counter clock) is sooner.
+    """
+    result = {'agent_url': agent_url, 'message': message}
+    started = time.perf_counter()
+    call_ends = call_deadline(timeout, deadline)
+    if call_ends <= started:
+        result['status'] = 'timeout'
+        result['error'] = f"The time budget for this request ran out before {agent_url} was asked"
+        result['elapsed_ms'] = 0.0
+        return result
+    attempt = functools.partial(
+        _attempt, message=message, deadline=call_ends, scope=scope, cacheable=cacheable
+    )
+    try:
+        if alternate_urls:
+            candidates = list(dict.fromkeys([agent_url, *alternate_urls]))
+            # Agents known to be down are only tried after the others
+            candidates.sort(key=lambda url: not _prober.is_alive(url))
+            answered_by, (response_text, cached), attempted = await hedged_call(candidates, attempt, _hedge_delay)
+            result['answered_by'] = answered_by
+            result['attempted'] = attempted
         else:
-            return "No text response received from agent"
+            response_text, cached = await attempt(agent_url)
+        if cacheable:
+            result['cached'] = cached
+        result['status'] = 'ok'
+        result['response'] = response_text
+    except asyncio.TimeoutError:
+        result['status'] = 'timeout'
+        result['error'] = f"No response from {agent_url} within {round(call_ends - started, 1)} seconds"
+    except CircuitOpenError as e:
+        result['status'] = 'unavailable'
+        result['error'] = str(e)
     except Exception as e:
-        return f"Error sending message to {agent_url}: {str(e)}"
+        result['status'] = 'error'
+        result['error'] = f"Error sending message to {agent_url}: {str(e)}"
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
 
-def disconnect_from_agent(agent_url: str) -> str:
+async def send_message_with_fallback(
+    agent_url: str,
+    message: str,
+    alternate_urls: List[str],
+    timeout: float = DEFAULT_TIMEOUT,
+    cacheable: bool = False,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """
+    Send a message to an agent, falling back to equivalent agents when it is slow or failing.
+    
+    If the agent fails (or has been failing and is paused), the next alternate is asked right
+    away. If it takes longer than it usually does (its 95th percentile latency), the next
+    alternate is asked in parallel and whichever answers first wins, so one slow agent does not
+    hold up the answer. Agents do not need to be connected first.
+    
+    Args:
+        agent_url (str): Preferred agent
+        message (str): Text message to send
+        alternate_urls (List[str]): Agents with the same capability, best first (e.g. the next
+            results of agent_finder)
+        timeout (float): Seconds to wait for an answer in total (cut short by the task deadline, if set)
+        cacheable (bool): True for idempotent lookups (see send_message_to_agent)
+        
+    Returns:
+        Dict[str, Any]: agent_url, message, status ("ok", "error", "timeout" or "unavailable"),
+            response or error, 'answered_by' (the agent that answered), 'attempted' and elapsed_ms
+        
+    Example:
+        result = send_message_with_fallback("http://127.0.0.1:5001", "Weather for Paris",
+                                            ["http://127.0.0.1:5004", "http://127.0.0.1:5005"])
+    """
+    return await _send_one(
+        agent_url, message, timeout, _scope(tool_context), cacheable, alternate_urls or [],
+        deadline=_task_deadline(tool_context)
+    )
+
+async def check_agent_health(agent_urls: List[str]) -> Dict[str, Any]:
+    """
+    Check right now whether agents are up, and how fast they answer.
+    
+    Each agent's card is fetched (the card is kept for later connections). Use it to rule out
+    dead agents before recommending or messaging them.
+    
+    Args:
+        agent_urls (List[str]): Agent URLs to check
+        
+    Returns:
+        Dict[str, Any]: For each URL, 'alive' (whether it answered this check), 'rtt_ms' (round trip
+            time), 'has_card' and 'error'
+        
+    Example:
+        health = check_agent_health(["http://127.0.0.1:5001", "http://127.0.0.1:5002"])
+    """
+    _watch(agent_urls)
+    statuses = await _prober.probe_async(agent_urls)
+    return {
+        agent_url: {
+            'alive': status['reachable'],
+            'rtt_ms': status['rtt_ms'],
+            'has_card': status['has_card'],
+            'error': status['error'],
+        }
+        for agent_url, status in statuses.items()
+    }
+
+async def send_messages_to_agents(
+    messages: List[Dict[str, str]],
+    timeout: float = DEFAULT_TIMEOUT,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """
+    Send messages to several A2A agents concurrently and return every response.
+    
+    All messages are in flight at once, so the call takes about as long as the slowest
+    agent instead of the sum of all of them. Agents do not need to be connected first.
+    
+    Args:
+        messages (List[Dict[str, str]]): Messages to send, each {"agent_url": ..., "message": ...};
+            add "cacheable": true to idempotent lookups to reuse a recent identical response, and
+            "alternate_urls": [...] to fall back to equivalent agents (see send_message_with_fallback)
+        timeout (float): Seconds to wait for each agent before giving up on it (cut short by the task deadline, if set)
+        
+    Returns:
+        Dict[str, Any]: 'results' in the order of messages, each with agent_url, message, status
+            ("ok", "error", "timeout" or "unavailable"), response or error and elapsed_ms (cacheable
+            messages also report 'cached'); plus 'succeeded', 'failed' and the total 'elapsed_ms'
+        
+    Example:
+        results = send_messages_to_agents([
+            {"agent_url": "http://127.0.0.1:5001", "message": "Weather for Paris"},
+            {"agent_url": "http://127.0.0.1:5002", "message": "Hotels in Paris"},
+        ])
+    """
+    started = time.perf_counter()
+    deadline = _task_deadline(tool_context)
+    invalid = [
+        index for index, item in enumerate(messages)
+        if not isinstance(item, dict) or not item.get('agent_url') or item.get('message') is None
+    ]
+    if invalid:
+        return {'error': f"Messages {invalid} need both 'agent_url' and 'message'"}
+    
+    results = await asyncio.gather(*(
+        _send_one(
+            item['agent_url'], item['message'], timeout, _scope(tool_context),
+            bool(item.get('cacheable')), item.get('alternate_urls') or [], deadline
+        )
+        for item in messages
+    ))
+    succeeded = sum(1 for result in results if result['status'] == 'ok')
+    return {
+        'results': list(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+async def run_agent_workflow(
+    nodes: List[Dict[str, Any]],
+    timeout: float = DEFAULT_TIMEOUT,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """
+    Run a chain of agent calls in one step, passing upstream answers into downstream messages.
+    
+    Each node is {"id": ..., "agent_url": ..., "message": ..., "depends_on": [...], "cacheable": bool,
+    "alternate_urls": [...]}. A message
+    may contain {{other_node_id}}, which is replaced with that node's response (and makes the
+    node depend on it). Nodes start as soon as their dependencies have answered, so independent
+    branches run in parallel. Nodes whose dependencies failed are skipped.
+    
+    Args:
+        nodes (List[Dict[str, Any]]): The workflow nodes
+        timeout (float): Seconds to wait for each agent (cut short by the task deadline, if set)
+        
+    Returns:
+        Dict[str, Any]: 'results' in completion order, each with node_id, agent_url, the sent message,
+            status ("ok", "error", "timeout", "unavailable" or "skipped") and response or error; plus
+            'succeeded', 'failed' and the total 'elapsed_ms'. Invalid workflows return 'error'.
+        
+    Example:
+        results = run_agent_workflow([
+            {"id": "weather", "agent_url": "http://127.0.0.1:5001", "message": "Weather in Paris this weekend"},
+            {"id": "hotels", "agent_url": "http://127.0.0.1:5002", "message": "Hotels in Paris given this weather: {{weather}}"},
+            {"id": "activities", "agent_url": "http://localhost:5003/a2a",
+             "message": "Activities in Paris. Weather: {{weather}} Hotel area: {{hotels}}"}
+        ])
+    """
+    started = time.perf_counter()
+    try:
+        send = functools.partial(_send_one, scope=_scope(tool_context), deadline=_task_deadline(tool_context))
+        results = [result async for result in execute_workflow(nodes, send, timeout)]
+    except WorkflowError as e:
+        return {'error': str(e)}
+    
+    succeeded = sum(1 for result in results if result['status'] == 'ok')
+    return {
+        'results': results,
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+async def run_agent_workflow_stream(
+    nodes: List[Dict[str, Any]],
+    timeout: float = DEFAULT_TIMEOUT,
+    tool_context: ToolContext = None
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Streaming version of run_agent_workflow: yields each node's result as soon as it completes.
+    Offered only with COMMUNICATOR_STREAMING_TOOLS=1, since ADK streams it only in live sessions.
+    
+    Args:
+        nodes (List[Dict[str, Any]]): The workflow nodes (see run_agent_workflow)
+        timeout (float): Seconds to wait for each agent (cut short by the task deadline, if set)
+        
+    Yields:
+        Dict[str, Any]: One node result at a time, in completion order, or a single 'error' for invalid workflows
+    """
+    try:
+        send = functools.partial(_send_one, scope=_scope(tool_context), deadline=_task_deadline(tool_context))
+        async for result in execute_workflow(nodes, send, timeout):
+            yield result
+    except WorkflowError as e:
+        yield {'error': str(e)}
+
+def disconnect_from_agent(agent_url: str, tool_context: ToolContext = None) -> str:
     """
     Disconnect from an A2A agent and clean up the connection.
     
@@ -67,13 +538,12 @@ def disconnect_from_agent(agent_url: str) -> str:
     Example:
         result = disconnect_from_agent("http://127.0.0.1:5001")
     """
-    if agent_url in _clients:
-        del _clients[agent_url]
+    if _clients.disconnect(agent_url, _scope(tool_context)):
         return f"Successfully disconnected from agent at {agent_url}"
     else:
         return f"No active connection found for {agent_url}"
 
-def list_connected_agents() -> str:
+def list_connected_agents(tool_context: ToolContext = None) -> str:
     """
     List all currently connected agents.
     
@@ -83,12 +553,22 @@ def list_connected_agents() -> str:
     Example:
         agents = list_connected_agents()
     """
-    if _clients:
-        connected_urls = list(_clients.keys())
-        return f"Connected to {len(connected_urls)} agents: {', '.join(connected_urls)}"
+    connected_urls = _clients.urls(_scope(tool_context))
+    if connected_urls:
+        return f"Connected to {len(connected_urls)} agents: {', '.join(url + _health_note(url) for url in connected_urls)}"
     else:
         return "No agents currently connected"
 
+# Offered only with COMMUNICATOR_STREAMING_TOOLS=1 (live sessions); the tools above are the default path
+_STREAMING_TOOLS = [send_message_to_agent_stream, run_agent_workflow_stream]
+
+_STREAMING_INSTRUCTION = """
+        ## Streaming Tools:
+        These tools only work in a streaming (live) session; everywhere else use the tools above.
+        - send_message_to_agent_stream(agent_url, message, timeout): Same as send_message_to_agent, streaming the response as it is generated (agents without streaming support answer in one chunk)
+        - run_agent_workflow_stream(nodes, timeout): Same as run_agent_workflow, streaming each node's result as it completes
+"""
+
 communicator_agent = Agent(
     model='gemini-2.0-flash-001',
     name='communicator_agent',
@@ -105,9 +585,14 @@ communicator_agent = Agent(
 
         ## Available Tools:
         - connect_to_agent(agent_url): Connect to an A2A agent server using the provided URL
-        - send_message_to_agent(agent_url, message): Send messages to connected A2A agents
+        - set_task_deadline(seconds): Limit how long all agent calls for the current request may take in total
+        - send_message_to_agent(agent_url, message, cacheable, timeout): Send messages to connected A2A agents
+        - send_message_with_fallback(agent_url, message, alternate_urls, timeout): Send a message with equivalent agents as fallbacks; slow or failing agents are covered by the next alternate automatically
+        - send_messages_to_agents(messages, timeout): Send messages to several agents at once; each message is {"agent_url": ..., "message": ...}. Returns every response (including failures) in one result
+        - run_agent_workflow(nodes, timeout): Run a chain of dependent agent calls in one step; {{node_id}} in a message inserts that node's response
         - disconnect_from_agent(agent_url): Clean up connections when done
-        - list_connected_agents(): See which agents are currently connected
+        - list_connected_agents(): See which agents are currently connected (with their health when known)
+        - check_agent_health(agent_urls): Check whether agents are up and how fast they answer, before relying on them
 
         ## A2A Communication Workflow:
         1. **Connect**: Use connect_to_agent() with the agent's base URL from agent_finder
@@ -124,7 +609,35 @@ communicator_agent = Agent(
         ```
 
         ## Multi-Agent Communication:
-        For complex tasks requiring multiple agents:
+        When the messages to several agents do not depend on each other's answers, send them all at once:
+        ```
+        send_messages_to_agents([
+            {"agent_url": "http://127.0.0.1:5001", "message": "Weather for Paris"},
+            {"agent_url": "http://127.0.0.1:5002", "message": "Hotels in Paris"}
+        ])
+        ```
+        Report failed or timed-out entries individually; the successful responses are still valid.
+
+        Pass cacheable=True (or "cacheable": true in a message or workflow node) only for read-only lookups
+        whose answer does not depend on when they are asked twice in a row (e.g. "Weather for Paris",
+        "Capital of France"). Never mark bookings, purchases or other actions as cacheable.
+
+        When agent_finder returned several agents with the capability you need, pass the runners-up as
+        alternate_urls (send_message_with_fallback, or "alternate_urls" in a message or workflow node).
+        Agents that keep failing are paused automatically ("unavailable"); do not retry them, use an alternative.
+        Read-only requests only: a hedged request may be answered by, and sent to, more than one agent.
+
+        When a message needs another agent's answer, run the whole chain as one workflow instead of one
+        call per hop. Nodes without dependencies on each other run in parallel:
+        ```
+        run_agent_workflow([
+            {"id": "weather", "agent_url": "http://127.0.0.1:5001", "message": "Weather in Paris this weekend"},
+            {"id": "hotels", "agent_url": "http://127.0.0.1:5002", "message": "Hotels in Paris for this weather: {{weather}}"},
+            {"id": "activities", "agent_url": "http://localhost:5003/a2a", "message": "Activities in Paris for this weather: {{weather}}, near: {{hotels}}"}
+        ])
+        ```
+
+        Or send them one at a time:
         ```
         1. connect_to_agent("http://127.0.0.1:5001")  # Weather agent
         2. connect_to_agent("http://127.0.0.1:5002")  # Hotel agent
@@ -134,17 +647,23 @@ communicator_agent = Agent(
         6. disconnect_from_agent("http://127.0.0.1:5002")
         ```
 
+        ## Time Budgets:
+        When the handoff includes a TIME_BUDGET (or the user says how long they are willing to wait), call
+        set_task_deadline(seconds) before the first message. Every call then gets only the time that is left,
+        and calls still running when it is spent are cancelled and reported as "timeout". Present the answers
+        that did arrive instead of retrying once the budget is spent.
+
         ## Connection Management:
         - Always connect before sending messages
         - Check connection status if messages fail
-        - Disconnect when tasks are complete to free resources
+        - Disconnect when tasks are complete to free resources (unused connections are also dropped automatically after a while; just connect again)
         - Use list_connected_agents() to track active connections
         - Handle connection errors gracefully with retry logic
 
         ## Error Handling:
         - Connection failures: Report detailed error messages, suggest retries
         - Message failures: Check connection status, reconnect if needed
-        - Agent unavailability: Suggest alternative agents from agent_finder
+        - Agent unavailability: Suggest alternative agents from agent_finder; if connect_to_agent reports an agent looks down, switch before sending
         - Timeout issues: Implement appropriate timeout handling and user notification
 
         ## Communication Strategies:
@@ -172,6 +691,10 @@ communicator_agent = Agent(
         - **Error escalation**: Hand back to root_agent when communication fails persistently
 
         **Key Principle**: Act as a reliable bridge between users and marketplace agents, ensuring smooth, efficient, and error-free communication while maintaining proper connection lifecycle management.
-    """,
-    tools=[connect_to_agent, send_message_to_agent, disconnect_from_agent, list_connected_agents],
+    """ + (_STREAMING_INSTRUCTION if STREAMING_TOOLS else ''),
+    tools=[
+        set_task_deadline, connect_to_agent, send_message_to_agent,
+        send_message_with_fallback, send_messages_to_agents, run_agent_workflow,
+        check_agent_health, disconnect_from_agent, list_connected_agents
+    ] + (_STREAMING_TOOLS if STREAMING_TOOLS else []),
 )
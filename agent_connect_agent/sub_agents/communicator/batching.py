@@ -0,0 +1,154 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from python_a2a import Message
+
+    from .transport import PooledA2AClient
+
+# Agent URLs whose messages are batched, comma-separated, or "*" for every agent; empty disables batching.
+# Identical messages sent with cacheable=True are sent once per batch; all others keep their own request.
+BATCH_AGENTS = os.getenv('COMMUNICATOR_BATCH_AGENTS', '')
+# Seconds a batch stays open for more messages to the same agent after its first one
+BATCH_WINDOW = float(os.getenv('COMMUNICATOR_BATCH_WINDOW', '0.01'))
+# Distinct messages per batch; a full batch is sent without waiting for the window to end
+BATCH_MAX_SIZE = int(os.getenv('COMMUNICATOR_BATCH_MAX_SIZE', '32'))
+
+
+def parse_batch_agents(spec: str) -> Optional[Set[str]]:
+    """Parses COMMUNICATOR_BATCH_AGENTS into a set of agent URLs, or None for every agent."""
+    agent_urls = {item.strip().rstrip('/') for item in spec.split(',') if item.strip()}
+    return None if '*' in agent_urls else agent_urls
+
+
+class _Batch:
+    def __init__(self, client: 'PooledA2AClient'):
+        self.client = client
+        self.messages: List['Message'] = []
+        self.futures: Dict[Any, asyncio.Future] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MessageBatcher:
+    """
+    Gathers messages bound for the same agent within a short window and sends them together.
+
+    A2A has no multi-message task, so a batch goes out as concurrent requests that hold
+    a single per-host slot of the shared transport; over HTTP/2 they travel as streams
+    of one connection. Identical message texts submitted as cacheable (the contract of
+    ResponseCache: read-only lookups any session may share) are sent once and the response
+    is handed to every such caller; other messages are never merged, even when their texts
+    match. Callers get their own response (or failure) back, and a
+    caller that stops waiting (timeout, lost hedge) does not affect the others.
+
+    A batch goes out on the client of its first message. Clients of one agent hold no
+    connections or session state of their own (see transport.py), so any of them will do.
+    Batches are kept per event loop, as the futures handed out belong to one.
+    """
+
+    def __init__(
+        self,
+        agents: str = BATCH_AGENTS,
+        window: float = BATCH_WINDOW,
+        max_size: int = BATCH_MAX_SIZE
+    ):
+        self.agent_urls = parse_batch_agents(agents)
+        self.window = window
+        self.max_size = max(max_size, 1)
+        self._lock = threading.Lock()
+        self._pending: 'weakref.WeakKeyDictionary[Any, Dict[str, _Batch]]' = weakref.WeakKeyDictionary()
+        # Running sends, referenced until they finish so they are not garbage collected
+        self._sending: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.messages = 0
+        self.coalesced = 0
+
+    def enabled_for(self, agent_url: str) -> bool:
+        """Whether messages to an agent are batched."""
+        return self.agent_urls is None or agent_url.rstrip('/') in self.agent_urls
+
+    def submit(
+        self,
+        client: 'PooledA2AClient',
+        message: 'Message',
+        cacheable: bool = False
+    ) -> Tuple[Awaitable['Message'], bool]:
+        """
+        Adds a message to the open batch of its agent, opening one if needed.
+
+        Must be called from the event loop that awaits the result.
+
+        Args:
+            client: Client of the agent; the batch is sent with the client of its first message
+            message: Message to send
+            cacheable: Whether the caller allows its response to be shared with identical
+                cacheable messages (read-only lookups only)
+
+        Returns:
+            (awaitable of the agent's response message, True if an identical cacheable message
+            in the batch is already being sent and this one shares its response)
+        """
+        loop = asyncio.get_running_loop()
+        agent_url = client.endpoint_url
+        text = getattr(message.content, 'text', None)
+        with self._lock:
+            batches = self._pending.setdefault(loop, {})
+            batch = batches.get(agent_url)
+            if batch is None:
+                batch = batches[agent_url] = _Batch(client)
+                batch.timer = loop.call_later(self.window, self._flush, loop, agent_url, batch)
+            # Only cacheable text messages can be matched up; anything else is always sent on its own
+            key = text if cacheable and text is not None else object()
+            future = batch.futures.get(key)
+            coalesced = future is not None
+            if coalesced:
+                self.coalesced += 1
+            else:
+                future = batch.futures[key] = loop.create_future()
+                batch.messages.append(message)
+            self.messages += 1
+            full = len(batch.messages) >= self.max_size
+        if full:
+            self._flush(loop, agent_url, batch)
+        # A waiter giving up must not cancel the response other callers are waiting for
+        return asyncio.shield(future), coalesced
+
+    def _flush(self, loop, agent_url: str, batch: _Batch):
+        with self._lock:
+            batches = self._pending.get(loop)
+            if batches is None or batches.get(agent_url) is not batch:
+                # Already sent (filled up before its window ended)
+                return
+            del batches[agent_url]
+            self.batches += 1
+        batch.timer.cancel()
+        task = loop.create_task(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: _Batch):
+        futures = list(batch.futures.values())
+        try:
+            results = await batch.client.send_messages_async(batch.messages)
+        except Exception as e:
+            results = [e] * len(futures)
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns how many batches were sent and how many messages they carried or coalesced."""
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'messages': self.messages,
+                'coalesced': self.coalesced,
+                'average_batch_size': round((self.messages - self.coalesced) / self.batches, 2) if self.batches else None,
+            }
@@ -0,0 +1,58 @@
+import os
+import time
+from typing import Any, MutableMapping, Optional
+
+# Seconds every user turn may spend on agent calls in total unless a budget is set; 0 means unbounded
+TASK_BUDGET = float(os.getenv('COMMUNICATOR_TASK_BUDGET', '0'))
+
+# Session state key holding {'invocation_id': ..., 'deadline': wall-clock seconds}
+DEADLINE_STATE_KEY = 'communicator_deadline'
+
+
+def set_task_budget(state: MutableMapping[str, Any], invocation_id: Optional[str], budget: float) -> float:
+    """
+    Starts an overall time budget for the current invocation (user turn).
+
+    The deadline is stored in session state so every agent that handles the same
+    invocation (e.g. the root agent and the communicator after a transfer) shares it.
+
+    Args:
+        state: Session state (tool_context.state or callback_context.state)
+        invocation_id: ID of the current invocation; later invocations get a fresh budget
+        budget: Seconds from now
+
+    Returns:
+        The deadline as a time.time() timestamp
+    """
+    deadline = time.time() + budget
+    state[DEADLINE_STATE_KEY] = {'invocation_id': invocation_id, 'deadline': deadline}
+    return deadline
+
+
+def remaining_budget(state: Optional[MutableMapping[str, Any]], invocation_id: Optional[str]) -> Optional[float]:
+    """
+    Seconds left of the current invocation's budget (negative once it has passed), or None if unbounded.
+
+    Without a budget set for this invocation, one of TASK_BUDGET seconds is started when configured.
+    """
+    if state is None:
+        return None
+    entry = state.get(DEADLINE_STATE_KEY)
+    if not entry or entry.get('invocation_id') != invocation_id:
+        if TASK_BUDGET <= 0:
+            return None
+        set_task_budget(state, invocation_id, TASK_BUDGET)
+        return TASK_BUDGET
+    return entry['deadline'] - time.time()
+
+
+def task_deadline(state: Optional[MutableMapping[str, Any]], invocation_id: Optional[str]) -> Optional[float]:
+    """The invocation's deadline on the time.perf_counter() clock used for call timeouts, or None if unbounded."""
+    remaining = remaining_budget(state, invocation_id)
+    return None if remaining is None else time.perf_counter() + remaining
+
+
+def call_deadline(timeout: float, deadline: Optional[float]) -> float:
+    """Deadline (time.perf_counter() clock) of a call starting now: its own timeout, cut short by the task deadline."""
+    own = time.perf_counter() + timeout
+    return own if deadline is None else min(own, deadline)
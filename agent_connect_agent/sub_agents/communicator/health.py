@@ -0,0 +1,255 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+import httpx
+
+from .transport import AGENT_CARD_PATHS, A2ATransport, get_transport
+
+# Set COMMUNICATOR_HEALTH_PROBE=1 to probe watched agents in the background
+HEALTH_PROBE_ENABLED = os.getenv('COMMUNICATOR_HEALTH_PROBE', '').lower() in ('1', 'true', 'yes')
+# Seconds between probe rounds
+PROBE_INTERVAL = float(os.getenv('COMMUNICATOR_PROBE_INTERVAL', '30'))
+# Seconds one probe request may take before the agent counts as unreachable
+PROBE_TIMEOUT = float(os.getenv('COMMUNICATOR_PROBE_TIMEOUT', '3'))
+# Consecutive failed probes before an agent is reported dead (one miss may be a blip)
+PROBE_FAILURES = int(os.getenv('COMMUNICATOR_PROBE_FAILURES', '2'))
+# Probes in flight at once
+PROBE_CONCURRENCY = int(os.getenv('COMMUNICATOR_PROBE_CONCURRENCY', '20'))
+# Agent URLs watched at most; the least recently watched are dropped first
+PROBE_MAX_TARGETS = int(os.getenv('COMMUNICATOR_PROBE_MAX_TARGETS', '1024'))
+
+
+class HealthProber:
+    """
+    Probes agent URLs for liveness and round-trip time, prefetching their agent cards.
+
+    A probe GETs the agent card paths over the shared pooled transport. Any HTTP answer
+    below 500 shows the agent is reachable; the first JSON card found is kept so clients
+    need not fetch it again. Connection errors, timeouts and 5xx answers are failures,
+    and an agent is dead after failures_to_dead of them in a row.
+
+    Watched URLs are probed by a background thread (start()) with its own event loop,
+    or on demand with probe_async(). Agents never probed are reported as alive, so
+    health data only ever removes agents known to be down.
+    """
+
+    def __init__(
+        self,
+        interval: float = PROBE_INTERVAL,
+        timeout: float = PROBE_TIMEOUT,
+        failures_to_dead: int = PROBE_FAILURES,
+        concurrency: int = PROBE_CONCURRENCY,
+        max_targets: int = PROBE_MAX_TARGETS,
+        transport: Optional[A2ATransport] = None
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.failures_to_dead = max(failures_to_dead, 1)
+        self.concurrency = max(concurrency, 1)
+        self.max_targets = max(max_targets, 1)
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._targets: 'OrderedDict[str, None]' = OrderedDict()
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._cards: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.rounds = 0
+        self.probes = 0
+
+    @property
+    def transport(self) -> A2ATransport:
+        return self._transport or get_transport()
+
+    def watch(self, agent_urls: Iterable[str]):
+        """Adds agent URLs to the background probe rounds."""
+        with self._lock:
+            for agent_url in agent_urls:
+                if not agent_url:
+                    continue
+                agent_url = agent_url.rstrip('/')
+                self._targets[agent_url] = None
+                self._targets.move_to_end(agent_url)
+            while len(self._targets) > self.max_targets:
+                dropped, _ = self._targets.popitem(last=False)
+                self._status.pop(dropped, None)
+                self._cards.pop(dropped, None)
+
+    def targets(self):
+        with self._lock:
+            return list(self._targets)
+
+    async def _probe_one(self, agent_url: str) -> Dict[str, Any]:
+        reachable = False
+        agent_card = None
+        error = None
+        rtt = None
+        for path in AGENT_CARD_PATHS:
+            started = time.perf_counter()
+            try:
+                document = await self.transport.get_json_async(f"{agent_url}{path}", timeout=self.timeout)
+            except httpx.HTTPStatusError as e:
+                rtt = time.perf_counter() - started
+                if e.response.status_code >= 500:
+                    error = f"HTTP {e.response.status_code}"
+                    break
+                # The server answered, it just has no card here
+                reachable = True
+                continue
+            except httpx.HTTPError as e:
+                error = str(e) or type(e).__name__
+                break
+            except ValueError:
+                rtt = time.perf_counter() - started
+                reachable = True
+                continue
+            rtt = time.perf_counter() - started
+            reachable = True
+            if isinstance(document, dict):
+                agent_card = document
+                break
+        return self._record(agent_url, reachable, rtt, error, agent_card)
+
+    def _record(self, agent_url, reachable, rtt, error, agent_card) -> Dict[str, Any]:
+        with self._lock:
+            previous = self._status.get(agent_url) or {}
+            failures = 0 if reachable else previous.get('consecutive_failures', 0) + 1
+            status = {
+                'alive': failures < self.failures_to_dead,
+                'reachable': reachable,
+                'rtt_ms': round(rtt * 1000, 1) if reachable and rtt is not None else None,
+                'consecutive_failures': failures,
+                'error': error,
+                'has_card': agent_card is not None or (reachable and agent_url in self._cards),
+                'checked_at': time.time(),
+            }
+            self._status[agent_url] = status
+            if agent_card is not None:
+                self._cards[agent_url] = agent_card
+            self.probes += 1
+            return dict(status)
+
+    async def probe_async(self, agent_urls: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Probes agents now (the watched ones by default), concurrency-limited.
+
+        Returns:
+            Dictionary mapping each probed URL to its new status
+        """
+        agent_urls = [url.rstrip('/') for url in agent_urls] if agent_urls is not None else self.targets()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe(agent_url):
+            async with semaphore:
+                return agent_url, await self._probe_one(agent_url)
+
+        return dict(await asyncio.gather(*(probe(agent_url) for agent_url in dict.fromkeys(agent_urls))))
+
+    def status(self, agent_url: str) -> Optional[Dict[str, Any]]:
+        """Latest probe status of an agent, or None if it has not been probed."""
+        with self._lock:
+            status = self._status.get(agent_url.rstrip('/'))
+            return dict(status) if status else None
+
+    def is_alive(self, agent_url: str) -> bool:
+        """False only for agents whose recent probes failed; unprobed agents count as alive."""
+        status = self.status(agent_url)
+        return status is None or status['alive']
+
+    def dead_urls(self) -> Set[str]:
+        """URLs of the watched agents whose recent probes failed."""
+        with self._lock:
+            return {url for url, status in self._status.items() if not status['alive']}
+
+    def agent_card(self, agent_url: str) -> Optional[Dict[str, Any]]:
+        """The agent card fetched by the latest successful probe, if any."""
+        with self._lock:
+            return self._cards.get(agent_url.rstrip('/'))
+
+    def start(self, url_source: Optional[Callable[[], Iterable[str]]] = None) -> bool:
+        """
+        Starts the background probe thread (once per process).
+
+        Args:
+            url_source: Optional function returning agent URLs to watch, called on the probe
+                thread before the first round (e.g. a catalog read)
+
+        Returns:
+            True if the thread was started by this call
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, args=(url_source,), name='a2a-health-prober', daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, url_source):
+        if url_source is not None:
+            try:
+                self.watch(url_source())
+            except Exception as e:
+                print(f"Error loading agent URLs to probe: {e}")
+        asyncio.run(self._probe_rounds())
+
+    async def _probe_rounds(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while not self._stopping:
+            try:
+                await self.probe_async()
+                self.rounds += 1
+            except Exception as e:
+                print(f"Error probing agents: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the background probe thread after its current round."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+        if thread is None:
+            return
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns probe counters and how many watched agents are alive, dead or unprobed."""
+        with self._lock:
+            alive = sum(1 for url in self._targets if (self._status.get(url) or {}).get('alive'))
+            dead = sum(1 for url in self._targets if url in self._status and not self._status[url]['alive'])
+            return {
+                'targets': len(self._targets),
+                'alive': alive,
+                'dead': dead,
+                'unprobed': len(self._targets) - alive - dead,
+                'cards': len(self._cards),
+                'rounds': self.rounds,
+                'probes': self.probes,
+                'running': self._thread is not None,
+            }
+
+
+_prober: Optional[HealthProber] = None
+_prober_lock = threading.Lock()
+
+
+def get_prober() -> HealthProber:
+    """The process-wide prober shared by the communicator and agent_finder."""
+    global _prober
+    with _prober_lock:
+        if _prober is None:
+            _prober = HealthProber()
+        return _prober
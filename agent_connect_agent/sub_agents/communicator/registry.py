@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .transport import PooledA2AClient
+
+# Maximum connected agents kept across all sessions; the least recently used are dropped first
+MAX_CLIENTS = int(os.getenv('COMMUNICATOR_MAX_CLIENTS', '256'))
+# Seconds a connection may go unused before it is dropped; 0 keeps idle connections
+IDLE_TIMEOUT = float(os.getenv('COMMUNICATOR_IDLE_TIMEOUT', '900'))
+
+RegistryKey = Tuple[Optional[str], str]
+
+
+class ClientRegistry:
+    """
+    Bounded, thread-safe registry of connected A2A clients.
+
+    Clients are keyed by (scope, agent_url). The scope is a session ID when connections
+    are scoped per session, or None for connections shared by every session. Entries are
+    kept in least-recently-used order: beyond max_clients the oldest are evicted, and
+    entries idle for longer than idle_timeout are reaped on every access. Evicted clients
+    are closed. The lock is never held across I/O, so async tools may use it directly.
+
+    Reaping needs no timer: PooledA2AClient owns no sockets, so an idle entry costs only
+    a small object, and there are at most max_clients of them. Connections belong to the
+    shared A2ATransport, whose pool keeps at most COMMUNICATOR_KEEPALIVE_CONNECTIONS
+    idle ones and closes those idle for COMMUNICATOR_KEEPALIVE_EXPIRY seconds, whether
+    or not a client for their host is still registered.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = MAX_CLIENTS,
+        idle_timeout: float = IDLE_TIMEOUT,
+        client_factory: Callable[[str], Any] = PooledA2AClient
+    ):
+        self.max_clients = max(max_clients, 1)
+        self.idle_timeout = idle_timeout
+        self._client_factory = client_factory
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[RegistryKey, Tuple[float, Any]]' = OrderedDict()
+        self.evictions = 0
+        self.reaped = 0
+
+    def _reap(self, now: float) -> List[Any]:
+        # Called with the lock held. LRU order is also last-use order, so idle entries are at the front
+        dropped = []
+        if self.idle_timeout > 0:
+            while self._entries:
+                key, (last_used, client) = next(iter(self._entries.items()))
+                if now - last_used < self.idle_timeout:
+                    break
+                del self._entries[key]
+                dropped.append(client)
+                self.reaped += 1
+        return dropped
+
+    def _evict(self) -> List[Any]:
+        # Called with the lock held
+        dropped = []
+        while len(self._entries) > self.max_clients:
+            _, (_, client) = self._entries.popitem(last=False)
+            dropped.append(client)
+            self.evictions += 1
+        return dropped
+
+    @staticmethod
+    def _close(clients: List[Any]):
+        # A no-op for PooledA2AClient; kept for client factories that do own connections
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                print(f"Error closing A2A client: {e}")
+
+    def connect(self, agent_url: str, scope: Optional[str] = None) -> Any:
+        """Returns the client for agent_url in scope, creating it if needed."""
+        key = (scope, agent_url)
+        now = time.monotonic()
+        with self._lock:
+            dropped = self._reap(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                client = self._client_factory(agent_url)
+            else:
+                client = entry[1]
+            self._entries[key] = (now, client)
+            self._entries.move_to_end(key)
+            dropped.extend(self._evict())
+        self._close(dropped)
+        return client
+
+    def get(self, agent_url: str, scope: Optional[str] = None) -> Optional[Any]:
+        """Returns the connected client for agent_url in scope (marking it used), or None."""
+        key = (scope, agent_url)
+        now = time.monotonic()
+        with self._lock:
+            dropped = self._reap(now)
+            entry = self._entries.get(key)
+            client = None
+            if entry is not None:
+                client = entry[1]
+                self._entries[key] = (now, client)
+                self._entries.move_to_end(key)
+        self._close(dropped)
+        return client
+
+    def disconnect(self, agent_url: str, scope: Optional[str] = None) -> bool:
+        """Closes and removes a client; returns False if it was not connected."""
+        with self._lock:
+            entry = self._entries.pop((scope, agent_url), None)
+        if entry is None:
+            return False
+        self._close([entry[1]])
+        return True
+
+    def close_scope(self, scope: Optional[str]) -> int:
+        """Closes every client of a scope (e.g. when a session ends), returning how many were closed."""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == scope]
+            dropped = [self._entries.pop(key)[1] for key in keys]
+        self._close(dropped)
+        return len(dropped)
+
+    def urls(self, scope: Optional[str] = None) -> List[str]:
+        """Connected agent URLs of a scope, least recently used first."""
+        with self._lock:
+            dropped = self._reap(time.monotonic())
+            urls = [agent_url for entry_scope, agent_url in self._entries if entry_scope == scope]
+        self._close(dropped)
+        return urls
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the registry size, limits and eviction counters."""
+        with self._lock:
+            return {
+                'clients': len(self._entries),
+                'max_clients': self.max_clients,
+                'idle_timeout': self.idle_timeout,
+                'evictions': self.evictions,
+                'reaped': self.reaped,
+            }
@@ -0,0 +1,215 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Recent calls per agent the failure rate and latency percentiles are computed over
+CIRCUIT_WINDOW = int(os.getenv('COMMUNICATOR_CIRCUIT_WINDOW', '20'))
+# Calls needed in the window before a circuit may open or a p95 is trusted
+CIRCUIT_MIN_CALLS = int(os.getenv('COMMUNICATOR_CIRCUIT_MIN_CALLS', '5'))
+# Failure rate over the window that opens the circuit
+CIRCUIT_FAILURE_RATE = float(os.getenv('COMMUNICATOR_CIRCUIT_FAILURE_RATE', '0.5'))
+# Seconds an open circuit fast-fails before one trial call is let through
+CIRCUIT_COOLDOWN = float(os.getenv('COMMUNICATOR_CIRCUIT_COOLDOWN', '30'))
+# Agents tracked at most; the least recently called are forgotten first
+CIRCUIT_MAX_AGENTS = int(os.getenv('COMMUNICATOR_CIRCUIT_MAX_AGENTS', '1024'))
+# Seconds before hedging to an alternate agent when the agent has no p95 yet
+HEDGE_DELAY = float(os.getenv('COMMUNICATOR_HEDGE_DELAY', '2'))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an agent whose circuit is open."""
+
+
+class _Circuit:
+    __slots__ = ('outcomes', 'opened_at', 'probing')
+
+    def __init__(self, window: int):
+        # (succeeded, latency in seconds or None) of the most recent calls
+        self.outcomes = deque(maxlen=window)
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    Per-agent circuit breaker over a sliding window of call outcomes and latencies.
+
+    Closed: calls go through. Once at least min_calls are in the window and the failure
+    rate reaches failure_rate, the circuit opens and calls fast-fail for cooldown seconds.
+    Then it is half-open: a single trial call goes through, closing the circuit on success
+    and reopening it on failure. Callers must follow every allowed call with record()
+    or, if the call was abandoned (cancelled, answered from a cache), release().
+    """
+
+    def __init__(
+        self,
+        window: int = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        cooldown: float = CIRCUIT_COOLDOWN,
+        max_agents: int = CIRCUIT_MAX_AGENTS
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.max_agents = max(max_agents, 1)
+        self._lock = threading.Lock()
+        self._circuits: 'OrderedDict[str, _Circuit]' = OrderedDict()
+        self.opened = 0
+        self.rejected = 0
+
+    def _circuit(self, agent_url: str) -> _Circuit:
+        # Called with the lock held
+        agent_url = agent_url.rstrip('/')
+        circuit = self._circuits.get(agent_url)
+        if circuit is None:
+            circuit = self._circuits[agent_url] = _Circuit(self.window)
+            while len(self._circuits) > self.max_agents:
+                self._circuits.popitem(last=False)
+        self._circuits.move_to_end(agent_url)
+        return circuit
+
+    def _state(self, circuit: _Circuit, now: float) -> str:
+        if circuit.opened_at is None:
+            return 'closed'
+        if now - circuit.opened_at < self.cooldown or circuit.probing:
+            return 'open'
+        return 'half_open'
+
+    def allow(self, agent_url: str) -> bool:
+        """Whether a call to the agent may be made now (reserving the trial call of a half-open circuit)."""
+        with self._lock:
+            circuit = self._circuit(agent_url)
+            state = self._state(circuit, time.monotonic())
+            if state == 'open':
+                self.rejected += 1
+                return False
+            if state == 'half_open':
+                circuit.probing = True
+            return True
+
+    def record(self, agent_url: str, succeeded: bool, latency: Optional[float] = None):
+        """Records the outcome of an allowed call (latency in seconds, for successes)."""
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit(agent_url)
+            was_probing, circuit.probing = circuit.probing, False
+            if circuit.opened_at is not None and was_probing:
+                if not succeeded:
+                    circuit.opened_at = now
+                    return
+                # The agent recovered: judge it on calls made from now on
+                circuit.opened_at = None
+                circuit.outcomes.clear()
+            circuit.outcomes.append((succeeded, latency if succeeded else None))
+            failures = sum(1 for ok, _ in circuit.outcomes if not ok)
+            if (circuit.opened_at is None and len(circuit.outcomes) >= self.min_calls
+                    and failures / len(circuit.outcomes) >= self.failure_rate):
+                circuit.opened_at = now
+                self.opened += 1
+
+    def release(self, agent_url: str):
+        """Gives back an allowed call that ended without an outcome to record."""
+        with self._lock:
+            circuit = self._circuits.get(agent_url.rstrip('/'))
+            if circuit is not None:
+                circuit.probing = False
+
+    def p95(self, agent_url: str) -> Optional[float]:
+        """95th percentile latency (seconds) of the agent's recent successful calls, or None if too few."""
+        with self._lock:
+            circuit = self._circuits.get(agent_url.rstrip('/'))
+            latencies = sorted(latency for ok, latency in circuit.outcomes if ok) if circuit else []
+        if len(latencies) < self.min_calls:
+            return None
+        return latencies[math.ceil(0.95 * len(latencies)) - 1]
+
+    def retry_after(self, agent_url: str) -> float:
+        """Seconds until an open circuit lets a trial call through (0 if calls are allowed)."""
+        with self._lock:
+            circuit = self._circuits.get(agent_url.rstrip('/'))
+            if circuit is None or circuit.opened_at is None:
+                return 0.0
+            return max(circuit.opened_at + self.cooldown - time.monotonic(), 0.0)
+
+    def state(self, agent_url: str) -> str:
+        """'closed', 'open' or 'half_open'."""
+        with self._lock:
+            circuit = self._circuits.get(agent_url.rstrip('/'))
+            return self._state(circuit, time.monotonic()) if circuit else 'closed'
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the breaker counters and the state of every tracked agent."""
+        now = time.monotonic()
+        with self._lock:
+            agents = {
+                agent_url: {
+                    'state': self._state(circuit, now),
+                    'calls': len(circuit.outcomes),
+                    'failures': sum(1 for ok, _ in circuit.outcomes if not ok),
+                }
+                for agent_url, circuit in self._circuits.items()
+            }
+            return {'agents': agents, 'opened': self.opened, 'rejected': self.rejected}
+
+
+async def hedged_call(
+    candidates: List[str],
+    attempt: Callable[[str], Awaitable[Any]],
+    hedge_delay: Callable[[str], float]
+) -> Tuple[str, Any, List[str]]:
+    """
+    Calls the first candidate and hedges to the next ones when it is slow or fails.
+
+    The next candidate is started as soon as the latest one fails, or once it has been
+    running for hedge_delay(url) without answering. The first success wins and the
+    attempts still running are cancelled.
+
+    Args:
+        candidates: Agent URLs in order of preference
+        attempt: Coroutine function making one call, attempt(url); it must raise on failure
+            and bound its own duration
+        hedge_delay: Seconds to wait on an agent before starting the next candidate
+
+    Returns:
+        Tuple of (URL that answered, its result, URLs attempted in order)
+
+    Raises:
+        The exception of the last failed attempt, if every candidate failed
+    """
+    remaining = list(candidates)
+    attempted: List[str] = []
+    pending: Dict[asyncio.Future, str] = {}
+    error: Optional[BaseException] = None
+
+    def launch():
+        agent_url = remaining.pop(0)
+        attempted.append(agent_url)
+        pending[asyncio.ensure_future(attempt(agent_url))] = agent_url
+
+    launch()
+    try:
+        while pending:
+            delay = hedge_delay(attempted[-1]) if remaining else None
+            done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # The latest attempt is slower than that agent usually is
+                launch()
+                continue
+            for task in sorted(done, key=lambda task: task.exception() is not None):
+                agent_url = pending.pop(task)
+                if task.exception() is None:
+                    return agent_url, task.result(), attempted
+                error = task.exception()
+            if remaining:
+                launch()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
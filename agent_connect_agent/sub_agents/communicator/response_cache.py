@@ -0,0 +1,174 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Responses kept at most; set COMMUNICATOR_RESPONSE_CACHE_SIZE=0 to disable caching
+RESPONSE_CACHE_SIZE = int(os.getenv('COMMUNICATOR_RESPONSE_CACHE_SIZE', '1024'))
+# Seconds a cached response stays valid unless the agent has its own TTL
+RESPONSE_CACHE_TTL = float(os.getenv('COMMUNICATOR_RESPONSE_CACHE_TTL', '300'))
+# Per-agent TTLs as "agent_url=seconds,agent_url=seconds"; 0 never caches that agent
+RESPONSE_CACHE_AGENT_TTLS = os.getenv('COMMUNICATOR_RESPONSE_CACHE_AGENT_TTLS', '')
+
+
+def parse_agent_ttls(spec: str) -> Dict[str, float]:
+    """Parses COMMUNICATOR_RESPONSE_CACHE_AGENT_TTLS into {agent_url: ttl_seconds}."""
+    ttls = {}
+    for item in spec.split(','):
+        agent_url, separator, ttl = item.strip().rpartition('=')
+        if separator and agent_url:
+            ttls[agent_url.rstrip('/')] = float(ttl)
+    return ttls
+
+
+async def _resolved(response: str) -> str:
+    return response
+
+
+def normalize_message(message: str) -> str:
+    """Messages differing only in case or whitespace share a cache entry."""
+    return ' '.join(message.split()).casefold()
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of agent response texts with per-agent TTLs and request coalescing.
+
+    Only use it for idempotent lookups (e.g. "weather for Paris"): while a response for
+    (agent_url, normalized message) is being fetched, identical requests wait for that
+    fetch instead of sending their own, even from another thread's event loop.
+    Failures are shared with the waiting requests but never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        default_ttl: float = RESPONSE_CACHE_TTL,
+        agent_ttls: Optional[Dict[str, float]] = None
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.agent_ttls = agent_ttls if agent_ttls is not None else parse_agent_ttls(RESPONSE_CACHE_AGENT_TTLS)
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, str]]' = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], concurrent.futures.Future] = {}
+        self._fetches = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def ttl_for(self, agent_url: str) -> float:
+        """Seconds responses of an agent are cached for (0: not cached)."""
+        return self.agent_ttls.get(agent_url.rstrip('/'), self.default_ttl)
+
+    def enabled_for(self, agent_url: str) -> bool:
+        return self.max_entries > 0 and self.ttl_for(agent_url) > 0
+
+    def _lookup(self, key) -> Tuple[Optional[str], Optional[concurrent.futures.Future], bool]:
+        """
+        Returns (cached response, in-flight future, whether the caller must fetch).
+
+        A caller that must fetch has registered the returned future and has to resolve it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], None, False
+            if entry is not None:
+                del self._entries[key]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+            self.misses += 1
+            future = self._in_flight[key] = concurrent.futures.Future()
+            return None, future, True
+
+    def _finish(self, key, future: concurrent.futures.Future, response: Optional[str], error: Optional[BaseException]):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if error is None and response is not None:
+                self._entries[key] = (time.monotonic() + self.ttl_for(key[0]), response)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        if error is None:
+            future.set_result(response)
+        else:
+            # Waiters see the failure too (cancellation of the fetch included)
+            future.set_exception(error if isinstance(error, Exception) else RuntimeError("Request was cancelled"))
+
+    def fetch_async(
+        self,
+        agent_url: str,
+        message: str,
+        fetch: Callable[[], Awaitable[str]]
+    ) -> Tuple[Awaitable[str], bool]:
+        """
+        Returns the cached response for a message, or fetches it (once for concurrent callers).
+
+        Must be called on a running event loop. The fetch runs as a task of its own rather
+        than in the first caller, so a caller that gives up (its timeout, a lost hedge)
+        neither cancels nor fails the fetch the other callers are waiting for.
+
+        Returns:
+            Tuple of (awaitable of the response text, whether it is served from the cache or
+            another caller's fetch; failures are then that caller's, not this one's)
+        """
+        if not self.enabled_for(agent_url):
+            return fetch(), False
+        key = (agent_url.rstrip('/'), normalize_message(message))
+        cached, future, must_fetch = self._lookup(key)
+        if cached is not None:
+            return _resolved(cached), True
+        if must_fetch:
+            task = asyncio.get_running_loop().create_task(self._fetch_shared(key, future, fetch))
+            # Referenced until done so the task is not garbage collected
+            self._fetches.add(task)
+            task.add_done_callback(self._fetches.discard)
+        # shield: a caller timing out must not cancel the shared fetch
+        return asyncio.shield(asyncio.wrap_future(future)), not must_fetch
+
+    async def _fetch_shared(self, key, future: concurrent.futures.Future, fetch: Callable[[], Awaitable[str]]):
+        try:
+            response = await fetch()
+        except BaseException as e:
+            self._finish(key, future, None, e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        self._finish(key, future, response, None)
+
+    def invalidate(self, agent_url: Optional[str] = None):
+        """Drops the cached responses of one agent, or of every agent."""
+        with self._lock:
+            if agent_url is None:
+                self._entries.clear()
+                return
+            agent_url = agent_url.rstrip('/')
+            for key in [key for key in self._entries if key[0] == agent_url]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/coalescing counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'default_ttl': self.default_ttl,
+                'agent_ttls': dict(self.agent_ttls),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'in_flight': len(self._in_flight),
+            }
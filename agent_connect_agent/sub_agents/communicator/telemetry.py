@@ -0,0 +1,281 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Recent calls per agent the latency percentiles and success rate are computed over
+TELEMETRY_WINDOW = int(os.getenv('COMMUNICATOR_TELEMETRY_WINDOW', '200'))
+# Set COMMUNICATOR_TELEMETRY_PERSIST=1 to write the stats onto the agents' Firestore documents,
+# where agent_finder ranks by them (sort_by="latency" / "blended")
+TELEMETRY_PERSIST_ENABLED = os.getenv('COMMUNICATOR_TELEMETRY_PERSIST', '').lower() in ('1', 'true', 'yes')
+# Seconds between batched writes
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv('COMMUNICATOR_TELEMETRY_FLUSH_INTERVAL', '60'))
+# Seconds at least between two writes of the same agent document
+TELEMETRY_MIN_WRITE_INTERVAL = float(os.getenv('COMMUNICATOR_TELEMETRY_MIN_WRITE_INTERVAL', '300'))
+# Calls an agent needs in the window before its stats are written (a couple of calls say little)
+TELEMETRY_MIN_CALLS = int(os.getenv('COMMUNICATOR_TELEMETRY_MIN_CALLS', '5'))
+# Agents tracked at most; the least recently called are forgotten first
+TELEMETRY_MAX_AGENTS = int(os.getenv('COMMUNICATOR_TELEMETRY_MAX_AGENTS', '1024'))
+# Seconds without calls after which an agent whose stats are written is forgotten
+TELEMETRY_IDLE_TIMEOUT = float(os.getenv('COMMUNICATOR_TELEMETRY_IDLE_TIMEOUT', '3600'))
+# Seconds an agent URL -> document ID lookup is reused (including "no such agent")
+AGENT_ID_CACHE_TTL = 3600
+
+# Firestore accepts at most 500 writes per batch
+MAX_BATCH_WRITES = 500
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank percentile of an ascending list
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+
+class _AgentStats:
+    __slots__ = ('outcomes', 'recorded', 'last_call', 'last_written', 'agent_id')
+
+    def __init__(self, window: int):
+        # (succeeded, latency in seconds or None) of the most recent calls
+        self.outcomes = deque(maxlen=window)
+        # Calls recorded so far, so a write only clears the calls its summary covered
+        self.recorded = 0
+        self.last_call = -math.inf
+        self.last_written = -math.inf
+        # (document ID or None, when it was looked up)
+        self.agent_id: Optional[Tuple[Optional[str], float]] = None
+
+
+class AgentTelemetry:
+    """
+    Rolling per-agent latency percentiles and success rates of A2A calls.
+
+    Each agent URL keeps its last `window` outcomes. When persisting is started, a
+    background thread writes the stats of agents with new calls onto their documents
+    in the agents collection (matched by agent_url) every flush_interval seconds, in
+    one batch, writing each document at most once per min_write_interval:
+
+        latency_p50_ms, latency_p95_ms, latency_p99_ms   successful calls, in ms
+        success_rate                                     successes / calls in the window
+        telemetry_calls                                  calls in the window
+        telemetry_updated_at                             server timestamp
+
+    At most max_agents agents are tracked, the least recently called are forgotten
+    first, and agents whose stats are written are forgotten after idle_timeout
+    seconds without calls.
+    """
+
+    def __init__(
+        self,
+        window: int = TELEMETRY_WINDOW,
+        flush_interval: float = TELEMETRY_FLUSH_INTERVAL,
+        min_write_interval: float = TELEMETRY_MIN_WRITE_INTERVAL,
+        min_calls: int = TELEMETRY_MIN_CALLS,
+        max_agents: int = TELEMETRY_MAX_AGENTS,
+        idle_timeout: float = TELEMETRY_IDLE_TIMEOUT
+    ):
+        self.window = window
+        self.flush_interval = flush_interval
+        self.min_write_interval = min_write_interval
+        self.min_calls = min_calls
+        self.max_agents = max(max_agents, 1)
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # Least recently called first
+        self._agents: 'OrderedDict[str, _AgentStats]' = OrderedDict()
+        self._dirty = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._db_factory: Optional[Callable[[], Any]] = None
+        self.writes = 0
+        self.flushes = 0
+
+    def record(self, agent_url: str, succeeded: bool, latency: Optional[float] = None):
+        """Records one call (latency in seconds, for successes)."""
+        agent_url = agent_url.rstrip('/')
+        now = time.monotonic()
+        with self._lock:
+            stats = self._agents.get(agent_url)
+            if stats is None:
+                stats = self._agents[agent_url] = _AgentStats(self.window)
+                while len(self._agents) > self.max_agents:
+                    forgotten, _ = self._agents.popitem(last=False)
+                    self._dirty.discard(forgotten)
+            self._agents.move_to_end(agent_url)
+            stats.outcomes.append((succeeded, latency if succeeded else None))
+            stats.recorded += 1
+            stats.last_call = now
+            self._dirty.add(agent_url)
+
+    def _summarize(self, outcomes) -> Dict[str, Any]:
+        latencies = sorted(latency for ok, latency in outcomes if ok and latency is not None)
+        summary = {
+            'calls': len(outcomes),
+            'success_rate': round(sum(1 for ok, _ in outcomes if ok) / len(outcomes), 4),
+            'latency_p50_ms': None,
+            'latency_p95_ms': None,
+            'latency_p99_ms': None,
+        }
+        if latencies:
+            for name, fraction in (('latency_p50_ms', 0.5), ('latency_p95_ms', 0.95), ('latency_p99_ms', 0.99)):
+                summary[name] = round(_percentile(latencies, fraction) * 1000, 1)
+        return summary
+
+    def summary(self, agent_url: str) -> Optional[Dict[str, Any]]:
+        """Calls, success_rate and latency_p50/p95/p99_ms of an agent, or None without calls."""
+        with self._lock:
+            stats = self._agents.get(agent_url.rstrip('/'))
+            return self._summarize(stats.outcomes) if stats is not None and stats.outcomes else None
+
+    def _forget_idle(self, now: float):
+        # Called with the lock held. Agents are in last-call order, so the idle ones are at the front
+        if self.idle_timeout <= 0:
+            return
+        for agent_url, stats in list(self._agents.items()):
+            if now - stats.last_call < self.idle_timeout:
+                break
+            # Stats not written yet are kept until they are (or the agent is evicted)
+            if agent_url not in self._dirty:
+                del self._agents[agent_url]
+
+    def _take_due(self) -> List[Tuple[str, Dict[str, Any], int]]:
+        """
+        Summaries of the agents whose stats changed and may be written now, each with the
+        number of calls recorded so far (to pass to _mark_written once it is written).
+        """
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            self._forget_idle(now)
+            for agent_url in self._dirty:
+                stats = self._agents[agent_url]
+                if len(stats.outcomes) < self.min_calls:
+                    continue
+                if now - stats.last_written < self.min_write_interval:
+                    continue
+                due.append((agent_url, self._summarize(stats.outcomes), stats.recorded))
+        return due
+
+    def _mark_written(self, written: List[Tuple[str, int]]):
+        """Marks agents (with their call count when summarized) as written; newer calls stay pending."""
+        now = time.monotonic()
+        with self._lock:
+            for agent_url, recorded in written:
+                stats = self._agents.get(agent_url)
+                if stats is None:
+                    # Evicted while being written
+                    continue
+                stats.last_written = now
+                if stats.recorded == recorded:
+                    self._dirty.discard(agent_url)
+
+    def _agent_id(self, db, agent_url: str) -> Optional[str]:
+        with self._lock:
+            stats = self._agents.get(agent_url)
+            cached = stats.agent_id if stats is not None else None
+        if cached is not None and time.monotonic() - cached[1] < AGENT_ID_CACHE_TTL:
+            return cached[0]
+        agent_id = None
+        for doc in db.collection('agents').where('agent_url', '==', agent_url).limit(1).stream():
+            agent_id = doc.id
+        with self._lock:
+            stats = self._agents.get(agent_url)
+            if stats is not None:
+                stats.agent_id = (agent_id, time.monotonic())
+        return agent_id
+
+    def flush(self, db) -> int:
+        """
+        Writes the stats that are due in batched writes.
+
+        Returns:
+            Number of agent documents updated
+        """
+        from firebase_admin import firestore
+
+        updates = []
+        unmatched = []
+        for agent_url, summary, recorded in self._take_due():
+            agent_id = self._agent_id(db, agent_url)
+            if agent_id is None:
+                # Not a catalog agent (e.g. a local test server); nothing to rank
+                unmatched.append((agent_url, recorded))
+                continue
+            updates.append((agent_url, recorded, agent_id, {
+                # Without a successful call there is no latency; a null would sort first in order_by
+                **{
+                    name: firestore.DELETE_FIELD if summary[name] is None else summary[name]
+                    for name in ('latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms')
+                },
+                'success_rate': summary['success_rate'],
+                'telemetry_calls': summary['calls'],
+                'telemetry_updated_at': firestore.SERVER_TIMESTAMP,
+                # Lets catalog snapshots pick the new stats up as a delta
+                'updated_at': firestore.SERVER_TIMESTAMP,
+            }))
+
+        self._mark_written(unmatched)
+
+        agents_ref = db.collection('agents')
+        for start in range(0, len(updates), MAX_BATCH_WRITES):
+            chunk = updates[start:start + MAX_BATCH_WRITES]
+            batch = db.batch()
+            for _, _, agent_id, fields in chunk:
+                batch.update(agents_ref.document(agent_id), fields)
+            batch.commit()
+            # A failed commit leaves its agents (and later batches) pending for the next flush
+            self._mark_written([(agent_url, recorded) for agent_url, recorded, _, _ in chunk])
+        with self._lock:
+            self.writes += len(updates)
+            self.flushes += 1
+        return len(updates)
+
+    def start(self, db_factory: Callable[[], Any]) -> bool:
+        """
+        Starts persisting in the background (once per process).
+
+        Args:
+            db_factory: Returns the Firestore client; called on the flush thread
+
+        Returns:
+            True if the thread was started by this call
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._db_factory = db_factory
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='a2a-telemetry', daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush_safely()
+
+    def _flush_safely(self):
+        try:
+            self.flush(self._db_factory())
+        except Exception as e:
+            print(f"Error writing agent telemetry: {e}")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the background thread, writing what is due one last time."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout)
+        self._flush_safely()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the number of tracked agents and the write counters."""
+        with self._lock:
+            return {
+                'agents': len(self._agents),
+                'pending': len(self._dirty),
+                'writes': self.writes,
+                'flushes': self.flushes,
+                'persisting': self._thread is not None,
+            }
@@ -0,0 +1,157 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agent_connect_agent.sub_agents.communicator.batching import MessageBatcher, parse_batch_agents
+
+AGENT_URL = 'http://weather'
+
+
+def text_message(text):
+    return SimpleNamespace(content=SimpleNamespace(text=text))
+
+
+class FakeClient:
+    """Answers each message with its upper-cased text; failing texts are answered with an exception."""
+
+    def __init__(self, endpoint_url=AGENT_URL, delay=0.0, failing=(), error=None):
+        self.endpoint_url = endpoint_url
+        self.delay = delay
+        self.failing = set(failing)
+        self.error = error
+        self.batches = []
+
+    async def send_messages_async(self, messages):
+        self.batches.append([message.content.text for message in messages])
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [
+            ConnectionError(f"{message.content.text} failed") if message.content.text in self.failing
+            else message.content.text.upper()
+            for message in messages
+        ]
+
+
+def test_parse_batch_agents():
+    assert parse_batch_agents('') == set()
+    assert parse_batch_agents('http://a/, http://b') == {'http://a', 'http://b'}
+    assert parse_batch_agents('http://a,*') is None
+    batcher = MessageBatcher(agents='http://a/')
+    assert batcher.enabled_for('http://a/')
+    assert not batcher.enabled_for('http://b')
+    assert MessageBatcher(agents='*').enabled_for('http://b')
+
+
+def test_messages_in_a_window_are_sent_together_and_identical_cacheable_ones_once():
+    batcher = MessageBatcher(agents='*', window=0.01, max_size=10)
+    client = FakeClient()
+
+    async def run():
+        submitted = [batcher.submit(client, text_message(text), cacheable=True) for text in ('paris', 'rome', 'paris')]
+        responses = await asyncio.gather(*(awaitable for awaitable, _ in submitted))
+        return responses, [coalesced for _, coalesced in submitted]
+
+    responses, coalesced = asyncio.run(run())
+    assert responses == ['PARIS', 'ROME', 'PARIS']
+    assert coalesced == [False, False, True]
+    assert client.batches == [['paris', 'rome']]
+    assert batcher.stats() == {'batches': 1, 'messages': 3, 'coalesced': 1, 'average_batch_size': 2.0}
+
+
+def test_identical_messages_are_not_shared_unless_cacheable():
+    batcher = MessageBatcher(agents='*', window=0.01, max_size=10)
+    client = FakeClient()
+
+    async def run():
+        submitted = [
+            batcher.submit(client, text_message('book a room'), cacheable=False),
+            batcher.submit(client, text_message('book a room'), cacheable=False),
+            # A cacheable lookup is never answered with a non-cacheable caller's response
+            batcher.submit(client, text_message('book a room'), cacheable=True),
+        ]
+        responses = await asyncio.gather(*(awaitable for awaitable, _ in submitted))
+        return responses, [coalesced for _, coalesced in submitted]
+
+    responses, coalesced = asyncio.run(run())
+    assert responses == ['BOOK A ROOM'] * 3
+    assert coalesced == [False, False, False]
+    assert client.batches == [['book a room'] * 3]
+    assert batcher.stats()['coalesced'] == 0
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    batcher = MessageBatcher(agents='*', window=60, max_size=2)
+    client = FakeClient()
+
+    async def run():
+        submitted = [batcher.submit(client, text_message(text))[0] for text in ('a', 'b', 'c')]
+        first = await asyncio.wait_for(asyncio.gather(submitted[0], submitted[1]), 1)
+        # The third message opened a new batch that is still waiting for its window
+        submitted[2].cancel()
+        return first
+
+    assert asyncio.run(run()) == ['A', 'B']
+    assert client.batches == [['a', 'b']]
+
+
+def test_cancelled_caller_does_not_affect_the_others():
+    batcher = MessageBatcher(agents='*', window=0.01, max_size=10)
+    client = FakeClient(delay=0.05)
+
+    async def run():
+        gives_up, _ = batcher.submit(client, text_message('paris'), cacheable=True)
+        shares, coalesced = batcher.submit(client, text_message('paris'), cacheable=True)
+        other, _ = batcher.submit(client, text_message('rome'))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(gives_up, 0.02)
+        return coalesced, await shares, await other
+
+    coalesced, shared, other = asyncio.run(run())
+    assert coalesced
+    assert shared == 'PARIS'
+    assert other == 'ROME'
+    assert client.batches == [['paris', 'rome']]
+
+
+def test_failures_go_only_to_their_callers():
+    batcher = MessageBatcher(agents='*', window=0.01, max_size=10)
+    client = FakeClient(failing={'rome'})
+
+    async def run():
+        submitted = [batcher.submit(client, text_message(text))[0] for text in ('paris', 'rome')]
+        return await asyncio.gather(*submitted, return_exceptions=True)
+
+    paris, rome = asyncio.run(run())
+    assert paris == 'PARIS'
+    assert isinstance(rome, ConnectionError)
+
+
+def test_failed_send_fails_every_caller():
+    batcher = MessageBatcher(agents='*', window=0.01, max_size=10)
+    client = FakeClient(error=ConnectionError('refused'))
+
+    async def run():
+        submitted = [batcher.submit(client, text_message(text))[0] for text in ('paris', 'rome')]
+        return await asyncio.gather(*submitted, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_batches_are_kept_per_agent():
+    batcher = MessageBatcher(agents='*', window=0.01, max_size=10)
+    weather = FakeClient()
+    hotels = FakeClient(endpoint_url='http://hotels')
+
+    async def run():
+        submitted = [
+            batcher.submit(weather, text_message('paris'))[0],
+            batcher.submit(hotels, text_message('paris'))[0],
+        ]
+        return await asyncio.gather(*submitted)
+
+    assert asyncio.run(run()) == ['PARIS', 'PARIS']
+    assert weather.batches == [['paris']]
+    assert hotels.batches == [['paris']]
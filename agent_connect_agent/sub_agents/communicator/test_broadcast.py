@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+
+from agent_connect_agent.sub_agents.communicator import agent as communicator
+from agent_connect_agent.sub_agents.communicator.registry import ClientRegistry
+from agent_connect_agent.sub_agents.communicator.resilience import CircuitBreaker
+from agent_connect_agent.sub_agents.communicator.response_cache import ResponseCache
+
+# agent URL -> (seconds to answer, exception or None)
+AGENTS = {
+    'http://weather': (0.2, None),
+    'http://hotels': (0.2, None),
+    'http://broken': (0, ConnectionError('refused')),
+    'http://hung': (10, None),
+}
+
+
+class FakeAgentClient:
+    def __init__(self, agent_url):
+        self.endpoint_url = agent_url
+        self.sent = []
+
+    async def send_message_async(self, message):
+        self.sent.append(message.content.text)
+        delay, error = AGENTS[self.endpoint_url]
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return communicator.Message(
+            content=communicator.TextContent(text=f"{self.endpoint_url}: {message.content.text}"),
+            role=communicator.MessageRole.AGENT
+        )
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    registry = ClientRegistry(client_factory=FakeAgentClient)
+    monkeypatch.setattr(communicator, '_clients', registry)
+    monkeypatch.setattr(communicator, '_breaker', CircuitBreaker())
+    monkeypatch.setattr(communicator, '_response_cache', ResponseCache(max_entries=8, default_ttl=60, agent_ttls={}))
+    # Agents do not need to be connected first; unconnected ones would get a throwaway client
+    monkeypatch.setattr(communicator, 'PooledA2AClient', FakeAgentClient)
+    return registry
+
+
+def broadcast(messages, **options):
+    return asyncio.run(communicator.send_messages_to_agents(messages, **options))
+
+
+def test_messages_are_sent_concurrently_in_order(clients):
+    started = time.perf_counter()
+    result = broadcast([
+        {'agent_url': 'http://weather', 'message': 'Weather for Paris'},
+        {'agent_url': 'http://hotels', 'message': 'Hotels in Paris'},
+    ])
+    # About as long as the slowest agent, not the sum of both
+    assert time.perf_counter() - started < 0.35
+    assert [entry['response'] for entry in result['results']] == [
+        'http://weather: Weather for Paris', 'http://hotels: Hotels in Paris'
+    ]
+    assert (result['succeeded'], result['failed']) == (2, 0)
+
+
+def test_failures_and_timeouts_are_reported_per_message(clients):
+    result = broadcast([
+        {'agent_url': 'http://weather', 'message': 'Weather for Paris'},
+        {'agent_url': 'http://broken', 'message': 'Hotels in Paris'},
+        {'agent_url': 'http://hung', 'message': 'Flights to Paris'},
+    ], timeout=0.5)
+    statuses = [entry['status'] for entry in result['results']]
+    assert statuses == ['ok', 'error', 'timeout']
+    assert 'refused' in result['results'][1]['error']
+    assert (result['succeeded'], result['failed']) == (1, 2)
+
+
+def test_identical_cacheable_messages_are_sent_once(clients):
+    weather = clients.connect('http://weather')
+    result = broadcast([
+        {'agent_url': 'http://weather', 'message': 'Weather for Paris', 'cacheable': True},
+        {'agent_url': 'http://weather', 'message': 'weather for paris', 'cacheable': True},
+        {'agent_url': 'http://weather', 'message': 'Weather for Paris'},
+    ])
+    assert weather.sent == ['Weather for Paris', 'Weather for Paris']
+    assert [entry.get('cached') for entry in result['results']] == [False, True, None]
+
+
+def test_invalid_messages_are_rejected_before_sending(clients):
+    result = broadcast([{'agent_url': 'http://weather', 'message': 'hi'}, {'message': 'no agent'}, 'text'])
+    assert result == {'error': "Messages [1, 2] need both 'agent_url' and 'message'"}
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from agent_connect_agent.sub_agents.communicator import agent as communicator
+from agent_connect_agent.sub_agents.communicator import deadline
+from agent_connect_agent.sub_agents.communicator.registry import ClientRegistry
+from agent_connect_agent.sub_agents.communicator.resilience import CircuitBreaker
+
+
+def tool_context(invocation_id='turn-1', state=None):
+    return SimpleNamespace(state={} if state is None else state, invocation_id=invocation_id)
+
+
+def test_budget_is_shared_within_an_invocation_and_reset_by_the_next(monkeypatch):
+    monkeypatch.setattr(deadline, 'TASK_BUDGET', 0)
+    state = {}
+    assert deadline.remaining_budget(state, 'turn-1') is None
+    deadline.set_task_budget(state, 'turn-1', 10)
+    assert 9 < deadline.remaining_budget(state, 'turn-1') <= 10
+    # The next user turn starts unbounded again
+    assert deadline.remaining_budget(state, 'turn-2') is None
+    assert deadline.remaining_budget(None, 'turn-1') is None
+
+
+def test_default_task_budget_starts_on_first_use(monkeypatch):
+    monkeypatch.setattr(deadline, 'TASK_BUDGET', 5)
+    state = {}
+    assert deadline.remaining_budget(state, 'turn-1') == 5
+    assert state[deadline.DEADLINE_STATE_KEY]['invocation_id'] == 'turn-1'
+
+
+def test_call_deadline_is_cut_short_by_the_task_deadline():
+    now = time.perf_counter()
+    assert deadline.call_deadline(30, None) >= now + 30
+    assert deadline.call_deadline(30, now + 1) == now + 1
+    assert deadline.call_deadline(1, now + 30) < now + 30
+
+
+def test_set_task_deadline_tool():
+    context = tool_context()
+    assert 'within 2 seconds' in communicator.set_task_deadline(2, context)
+    assert deadline.DEADLINE_STATE_KEY in context.state
+    assert 'positive' in communicator.set_task_deadline(0, context)
+    assert 'need a session' in communicator.set_task_deadline(2)
+
+
+class SlowClient:
+    def __init__(self, agent_url, delay):
+        self.endpoint_url = agent_url
+        self.delay = delay
+
+    async def send_message_async(self, message):
+        await asyncio.sleep(self.delay)
+        return communicator.Message(
+            content=communicator.TextContent(text=f"{self.endpoint_url} answered"), role=communicator.MessageRole.AGENT
+        )
+
+    def close(self):
+        pass
+
+
+def test_calls_running_at_the_deadline_are_cancelled_and_later_ones_not_sent(monkeypatch):
+    delays = {'http://fast': 0, 'http://hung': 10}
+    registry = ClientRegistry(client_factory=lambda agent_url: SlowClient(agent_url, delays[agent_url]))
+    for agent_url in delays:
+        registry.connect(agent_url)
+    monkeypatch.setattr(communicator, '_clients', registry)
+    monkeypatch.setattr(communicator, '_breaker', CircuitBreaker())
+    context = tool_context()
+    communicator.set_task_deadline(0.1, context)
+
+    started = time.perf_counter()
+    broadcast = asyncio.run(communicator.send_messages_to_agents(
+        [{'agent_url': agent_url, 'message': 'hello'} for agent_url in delays], timeout=30, tool_context=context
+    ))
+    # The hung agent got what was left of the budget, not its 30 second timeout
+    assert time.perf_counter() - started < 5
+    assert [result['status'] for result in broadcast['results']] == ['ok', 'timeout']
+
+    # Once the budget is spent, nothing more is sent
+    time.sleep(0.1)
+    response = asyncio.run(communicator.send_message_to_agent('http://fast', 'hello', tool_context=context))
+    assert 'ran out' in response
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import httpx
+
+from agent_connect_agent.sub_agents.communicator.health import HealthProber
+from agent_connect_agent.sub_agents.communicator.transport import AGENT_CARD_PATHS
+
+
+def status_error(url, status_code):
+    request = httpx.Request('GET', url)
+    return httpx.HTTPStatusError(f"HTTP {status_code}", request=request, response=httpx.Response(status_code, request=request))
+
+
+class FakeTransport:
+    """Answers agent card GETs from a URL -> card (or exception) map; other paths are 404s."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.requests = []
+
+    async def get_json_async(self, url, timeout=None):
+        self.requests.append(url)
+        answer = self.answers.get(url, status_error(url, 404))
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def prober(answers, **options):
+    return HealthProber(transport=FakeTransport(answers), **{'failures_to_dead': 2, **options})
+
+
+def test_card_is_prefetched_from_the_first_path_that_has_one():
+    card_url = f"http://a{AGENT_CARD_PATHS[1]}"
+    health = prober({card_url: {'name': 'A', 'capabilities': {'streaming': True}}})
+    status = asyncio.run(health.probe_async(['http://a/']))['http://a']
+    assert status['alive'] and status['reachable'] and status['has_card']
+    assert status['rtt_ms'] is not None
+    assert health.agent_card('http://a')['name'] == 'A'
+    # Paths after the card are not requested
+    assert health.transport.requests == [f"http://a{path}" for path in AGENT_CARD_PATHS[:2]]
+
+
+def test_agent_without_a_card_is_still_reachable():
+    health = prober({})
+    status = asyncio.run(health.probe_async(['http://a']))['http://a']
+    assert status['alive'] and status['reachable']
+    assert not status['has_card']
+
+
+def test_agent_is_dead_only_after_consecutive_failures():
+    url = f"http://down{AGENT_CARD_PATHS[0]}"
+    answers = {url: httpx.ConnectError('refused')}
+    health = prober(answers)
+    assert health.is_alive('http://down')
+    asyncio.run(health.probe_async(['http://down']))
+    # One miss may be a blip
+    assert health.is_alive('http://down')
+    asyncio.run(health.probe_async(['http://down']))
+    assert not health.is_alive('http://down')
+    assert health.dead_urls() == {'http://down'}
+    assert health.status('http://down')['error'] == 'refused'
+    # A server error is a failure too, but an answer of any other kind brings the agent back
+    answers[url] = status_error(url, 503)
+    asyncio.run(health.probe_async(['http://down']))
+    assert health.status('http://down')['consecutive_failures'] == 3
+    del answers[url]
+    asyncio.run(health.probe_async(['http://down']))
+    assert health.is_alive('http://down')
+
+
+def test_probe_round_covers_the_watched_agents():
+    health = prober({})
+    health.watch(['http://a/', 'http://b', '', 'http://a'])
+    assert health.targets() == ['http://b', 'http://a']
+    assert sorted(asyncio.run(health.probe_async())) == ['http://a', 'http://b']
+    assert health.stats()['alive'] == 2
+
+
+def test_least_recently_watched_agents_are_dropped_with_their_status():
+    health = prober({f"http://a{AGENT_CARD_PATHS[0]}": {'name': 'A'}}, max_targets=1)
+    health.watch(['http://a'])
+    asyncio.run(health.probe_async())
+    health.watch(['http://b'])
+    assert health.targets() == ['http://b']
+    assert health.status('http://a') is None
+    assert health.agent_card('http://a') is None
+
+
+def test_background_thread_probes_and_stops():
+    health = prober({}, interval=60)
+    assert health.start(lambda: ['http://a'])
+    assert not health.start()
+    for _ in range(100):
+        if health.status('http://a') is not None:
+            break
+        time.sleep(0.01)
+    health.stop(timeout=5)
+    assert health.status('http://a')['alive']
+    assert not health.stats()['running']
@@ -0,0 +1,79 @@
+import time
+
+from agent_connect_agent.sub_agents.communicator.registry import ClientRegistry
+
+
+class FakeClient:
+    def __init__(self, agent_url):
+        self.agent_url = agent_url
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def registry(**options):
+    return ClientRegistry(client_factory=FakeClient, **options)
+
+
+def test_connect_reuses_the_client_of_a_scope():
+    clients = registry()
+    first = clients.connect('http://a')
+    assert clients.connect('http://a') is first
+    assert clients.get('http://a') is first
+    # Session-scoped connections are separate from the shared ones
+    assert clients.get('http://a', 'session-1') is None
+    assert clients.connect('http://a', 'session-1') is not first
+    assert len(clients) == 2
+
+
+def test_least_recently_used_clients_are_evicted_and_closed():
+    clients = registry(max_clients=2)
+    a = clients.connect('http://a')
+    b = clients.connect('http://b')
+    clients.get('http://a')
+    clients.connect('http://c')
+    assert clients.urls() == ['http://a', 'http://c']
+    assert b.closed
+    assert not a.closed
+    assert clients.stats()['evictions'] == 1
+
+
+def test_idle_clients_are_reaped_on_access():
+    clients = registry(idle_timeout=0.02)
+    idle = clients.connect('http://idle')
+    time.sleep(0.03)
+    active = clients.connect('http://active')
+    assert idle.closed
+    assert not active.closed
+    assert clients.urls() == ['http://active']
+    assert clients.stats()['reaped'] == 1
+
+
+def test_zero_idle_timeout_keeps_clients():
+    clients = registry(idle_timeout=0)
+    clients.connect('http://a')
+    time.sleep(0.01)
+    assert clients.get('http://a') is not None
+
+
+def test_disconnect_and_close_scope():
+    clients = registry()
+    shared = clients.connect('http://a')
+    scoped = [clients.connect(agent_url, 'session-1') for agent_url in ('http://a', 'http://b')]
+    assert clients.disconnect('http://a')
+    assert shared.closed
+    assert not clients.disconnect('http://a')
+    assert clients.close_scope('session-1') == 2
+    assert all(client.closed for client in scoped)
+    assert len(clients) == 0
+
+
+def test_failing_close_does_not_break_the_registry():
+    class Unclosable(FakeClient):
+        def close(self):
+            raise OSError('already closed')
+
+    clients = ClientRegistry(client_factory=Unclosable)
+    clients.connect('http://a')
+    assert clients.disconnect('http://a')
@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import pytest
+
+from agent_connect_agent.sub_agents.communicator.resilience import CircuitBreaker, hedged_call
+
+AGENT_URL = 'http://weather'
+
+
+def open_breaker(cooldown=0.05):
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, cooldown=cooldown)
+    for succeeded in (True, True, False, False):
+        assert breaker.allow(AGENT_URL)
+        breaker.record(AGENT_URL, succeeded, 0.1)
+    return breaker
+
+
+def test_stays_closed_below_min_calls_and_failure_rate():
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, cooldown=60)
+    for _ in range(3):
+        breaker.record(AGENT_URL, False)
+    assert breaker.state(AGENT_URL) == 'closed'
+
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, cooldown=60)
+    for succeeded in (False, True, True, True, True, False):
+        breaker.record(AGENT_URL, succeeded, 0.1)
+    # The window keeps the last 4 calls: one failure
+    assert breaker.state(AGENT_URL) == 'closed'
+    breaker.record(AGENT_URL, False)
+    assert breaker.state(AGENT_URL) == 'open'
+
+
+def test_open_circuit_fast_fails_until_cooldown():
+    breaker = open_breaker(cooldown=60)
+    assert breaker.state(AGENT_URL) == 'open'
+    assert not breaker.allow(AGENT_URL + '/')
+    assert breaker.retry_after(AGENT_URL) > 59
+    assert breaker.stats()['opened'] == 1
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_lets_one_trial_call_through():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.state(AGENT_URL) == 'half_open'
+    assert breaker.allow(AGENT_URL)
+    # The trial call is reserved; everyone else still fast-fails
+    assert not breaker.allow(AGENT_URL)
+
+
+def test_successful_trial_closes_the_circuit():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow(AGENT_URL)
+    breaker.record(AGENT_URL, True, 0.1)
+    assert breaker.state(AGENT_URL) == 'closed'
+    assert breaker.stats()['agents'][AGENT_URL]['calls'] == 1
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow(AGENT_URL)
+    breaker.record(AGENT_URL, False)
+    assert breaker.state(AGENT_URL) == 'open'
+    assert breaker.retry_after(AGENT_URL) > 0.03
+
+
+def test_released_trial_can_be_retried():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow(AGENT_URL)
+    breaker.release(AGENT_URL)
+    assert breaker.allow(AGENT_URL)
+
+
+def test_p95_needs_min_calls():
+    breaker = CircuitBreaker(window=20, min_calls=5)
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        breaker.record(AGENT_URL, True, latency)
+    assert breaker.p95(AGENT_URL) is None
+    breaker.record(AGENT_URL, True, 0.5)
+    assert breaker.p95(AGENT_URL) == 0.5
+
+
+def test_least_recent_agents_are_forgotten():
+    breaker = CircuitBreaker(max_agents=2)
+    for agent_url in ('http://a', 'http://b', 'http://c'):
+        breaker.record(agent_url, True, 0.1)
+    assert sorted(breaker.stats()['agents']) == ['http://b', 'http://c']
+
+
+def make_attempt(behaviour, started):
+    # behaviour: url -> (seconds, result or exception)
+    async def attempt(agent_url):
+        started.append(agent_url)
+        seconds, outcome = behaviour[agent_url]
+        await asyncio.sleep(seconds)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return attempt
+
+
+def test_hedged_call_returns_first_answer_without_hedging():
+    started = []
+    attempt = make_attempt({'http://a': (0, 'A'), 'http://b': (0, 'B')}, started)
+    result = asyncio.run(hedged_call(['http://a', 'http://b'], attempt, lambda agent_url: 1.0))
+    assert result == ('http://a', 'A', ['http://a'])
+    assert started == ['http://a']
+
+
+def test_hedged_call_hedges_to_a_faster_agent_and_cancels_the_slow_one():
+    started = []
+    cancelled = []
+    fast = make_attempt({'http://b': (0, 'B')}, started)
+
+    async def attempt(agent_url):
+        if agent_url == 'http://b':
+            return await fast(agent_url)
+        started.append(agent_url)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(agent_url)
+            raise
+
+    result = asyncio.run(hedged_call(['http://a', 'http://b'], attempt, lambda agent_url: 0.01))
+    assert result == ('http://b', 'B', ['http://a', 'http://b'])
+    assert cancelled == ['http://a']
+
+
+def test_hedged_call_moves_on_after_a_failure():
+    started = []
+    attempt = make_attempt({'http://a': (0, ConnectionError('refused')), 'http://b': (0, 'B')}, started)
+    result = asyncio.run(hedged_call(['http://a', 'http://b'], attempt, lambda agent_url: 10.0))
+    assert result == ('http://b', 'B', ['http://a', 'http://b'])
+
+
+def test_hedged_call_raises_the_last_error_when_every_agent_fails():
+    started = []
+    attempt = make_attempt({
+        'http://a': (0, ConnectionError('a refused')),
+        'http://b': (0.01, TimeoutError('b timed out')),
+    }, started)
+    with pytest.raises(TimeoutError, match='b timed out'):
+        asyncio.run(hedged_call(['http://a', 'http://b'], attempt, lambda agent_url: 10.0))
+    assert started == ['http://a', 'http://b']
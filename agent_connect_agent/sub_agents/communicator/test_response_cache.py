@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from agent_connect_agent.sub_agents.communicator.response_cache import (
+    ResponseCache, normalize_message, parse_agent_ttls
+)
+
+AGENT_URL = 'http://weather'
+
+
+class Fetcher:
+    """Counts fetches; each one resolves when released (or fails with the given error)."""
+
+    def __init__(self, response='sunny', error=None):
+        self.response = response
+        self.error = error
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def test_parse_agent_ttls():
+    assert parse_agent_ttls('http://a/=10, http://b=0,broken') == {'http://a': 10.0, 'http://b': 0.0}
+
+
+def test_normalize_message():
+    assert normalize_message('  Weather   in\nPARIS ') == 'weather in paris'
+
+
+def test_concurrent_callers_share_one_fetch_and_later_ones_hit_the_cache():
+    cache = ResponseCache(max_entries=8, default_ttl=60, agent_ttls={})
+    fetch = Fetcher()
+
+    async def run():
+        fetch.release = asyncio.Event()
+        first, shared_first = cache.fetch_async(AGENT_URL, 'Weather in Paris', fetch)
+        second, shared_second = cache.fetch_async(AGENT_URL + '/', 'weather in  paris', fetch)
+        fetch.release.set()
+        responses = await asyncio.gather(first, second)
+        third, shared_third = cache.fetch_async(AGENT_URL, 'WEATHER IN PARIS', fetch)
+        return responses + [await third], [shared_first, shared_second, shared_third]
+
+    responses, shared = asyncio.run(run())
+    assert responses == ['sunny'] * 3
+    assert shared == [False, True, True]
+    assert fetch.calls == 1
+    stats = cache.stats()
+    assert (stats['misses'], stats['coalesced'], stats['hits']) == (1, 1, 1)
+
+
+def test_waiters_get_the_response_when_the_leader_is_cancelled():
+    cache = ResponseCache(max_entries=8, default_ttl=60, agent_ttls={})
+    fetch = Fetcher()
+
+    async def run():
+        fetch.release = asyncio.Event()
+        leader = asyncio.ensure_future(cache.fetch_async(AGENT_URL, 'weather', fetch)[0])
+        waiter = asyncio.ensure_future(cache.fetch_async(AGENT_URL, 'weather', fetch)[0])
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        fetch.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(run()) == 'sunny'
+    assert fetch.calls == 1
+    # The fetch finished for the waiter, so its response is cached
+    assert cache.stats()['entries'] == 1
+
+
+def test_waiter_timing_out_does_not_cancel_the_fetch():
+    cache = ResponseCache(max_entries=8, default_ttl=60, agent_ttls={})
+    fetch = Fetcher()
+
+    async def run():
+        fetch.release = asyncio.Event()
+        leader, _ = cache.fetch_async(AGENT_URL, 'weather', fetch)
+        waiter, _ = cache.fetch_async(AGENT_URL, 'weather', fetch)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(waiter, 0.01)
+        fetch.release.set()
+        return await leader
+
+    assert asyncio.run(run()) == 'sunny'
+
+
+def test_failures_are_shared_but_not_cached():
+    cache = ResponseCache(max_entries=8, default_ttl=60, agent_ttls={})
+    fetch = Fetcher(error=ConnectionError('refused'))
+
+    async def run():
+        fetch.release = asyncio.Event()
+        leader, _ = cache.fetch_async(AGENT_URL, 'weather', fetch)
+        waiter, _ = cache.fetch_async(AGENT_URL, 'weather', fetch)
+        fetch.release.set()
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_cancelled_fetch_fails_the_waiters():
+    cache = ResponseCache(max_entries=8, default_ttl=60, agent_ttls={})
+    fetch = Fetcher(error=asyncio.CancelledError())
+
+    async def run():
+        fetch.release = asyncio.Event()
+        waiter, _ = cache.fetch_async(AGENT_URL, 'weather', fetch)
+        fetch.release.set()
+        return await asyncio.gather(waiter, return_exceptions=True)
+
+    [result] = asyncio.run(run())
+    assert isinstance(result, RuntimeError)
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_agents_with_zero_ttl_are_not_cached():
+    cache = ResponseCache(max_entries=8, default_ttl=60, agent_ttls={AGENT_URL: 0})
+    fetch = Fetcher()
+
+    async def run():
+        fetch.release = asyncio.Event()
+        fetch.release.set()
+        first, shared = cache.fetch_async(AGENT_URL, 'weather', fetch)
+        await first
+        second, _ = cache.fetch_async(AGENT_URL, 'weather', fetch)
+        await second
+        return shared
+
+    assert asyncio.run(run()) is False
+    assert fetch.calls == 2
+    assert not cache.enabled_for(AGENT_URL)
+
+
+def test_invalidate_one_agent():
+    cache = ResponseCache(max_entries=8, default_ttl=60, agent_ttls={})
+
+    async def run():
+        for agent_url in (AGENT_URL, 'http://hotels'):
+            fetch = Fetcher()
+            fetch.release = asyncio.Event()
+            fetch.release.set()
+            await cache.fetch_async(agent_url, 'hello', fetch)[0]
+
+    asyncio.run(run())
+    cache.invalidate(AGENT_URL + '/')
+    assert cache.stats()['entries'] == 1
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0
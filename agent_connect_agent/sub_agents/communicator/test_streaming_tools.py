@@ -0,0 +1,92 @@
+import asyncio
+
+from agent_connect_agent.sub_agents.communicator import agent as communicator
+from agent_connect_agent.sub_agents.communicator.registry import ClientRegistry
+
+AGENT_URL = 'http://writer'
+
+
+class FakeStreamingClient:
+    def __init__(self, agent_url, chunks=('Mon: sun. ', 'Tue: rain.'), streaming=True, stall=0.0):
+        self.endpoint_url = agent_url
+        self.chunks = chunks
+        self.streaming = streaming
+        self.stall = stall
+
+    async def supports_streaming_async(self):
+        return self.streaming
+
+    async def stream_message_async(self, message):
+        for chunk in self.chunks:
+            yield chunk
+            await asyncio.sleep(self.stall)
+
+    async def send_message_async(self, message):
+        return communicator.Message(
+            content=communicator.TextContent(text=''.join(self.chunks)), role=communicator.MessageRole.AGENT
+        )
+
+    def close(self):
+        pass
+
+
+def connected(monkeypatch, **client_options):
+    registry = ClientRegistry(client_factory=lambda agent_url: FakeStreamingClient(agent_url, **client_options))
+    registry.connect(AGENT_URL)
+    monkeypatch.setattr(communicator, '_clients', registry)
+
+
+def collect(generator):
+    async def run():
+        return [chunk async for chunk in generator]
+    return asyncio.run(run())
+
+
+def test_streaming_tools_are_off_by_default():
+    # The regular runner would hand the model a generator object instead of the answer
+    assert not communicator.STREAMING_TOOLS
+    for tool in (communicator.send_message_to_agent_stream, communicator.run_agent_workflow_stream):
+        assert tool not in communicator.communicator_agent.tools
+    assert '_stream(' not in communicator.communicator_agent.instruction
+
+
+def test_stream_yields_chunks_as_they_arrive(monkeypatch):
+    connected(monkeypatch)
+    chunks = collect(communicator.send_message_to_agent_stream(AGENT_URL, 'forecast'))
+    assert chunks == ['Mon: sun. ', 'Tue: rain.']
+
+
+def test_agent_without_streaming_answers_in_one_chunk(monkeypatch):
+    connected(monkeypatch, streaming=False)
+    chunks = collect(communicator.send_message_to_agent_stream(AGENT_URL, 'forecast'))
+    assert chunks == ['Mon: sun. Tue: rain.']
+
+
+def test_stalled_stream_is_cut_short_at_the_timeout(monkeypatch):
+    connected(monkeypatch, stall=10)
+    chunks = collect(communicator.send_message_to_agent_stream(AGENT_URL, 'forecast', timeout=0.05))
+    assert chunks[0] == 'Mon: sun. '
+    assert 'did not finish' in chunks[-1]
+
+
+def test_stream_needs_a_connection(monkeypatch):
+    monkeypatch.setattr(communicator, '_clients', ClientRegistry())
+    [chunk] = collect(communicator.send_message_to_agent_stream(AGENT_URL, 'forecast'))
+    assert 'No connection found' in chunk
+
+
+def test_workflow_stream_yields_each_node_result(monkeypatch):
+    connected(monkeypatch, streaming=False)
+    nodes = [
+        {'id': 'forecast', 'agent_url': AGENT_URL, 'message': 'forecast'},
+        {'id': 'summary', 'agent_url': AGENT_URL, 'message': 'Summarize {{forecast}}'},
+    ]
+    results = collect(communicator.run_agent_workflow_stream(nodes))
+    assert [(result['node_id'], result['status']) for result in results] == [('forecast', 'ok'), ('summary', 'ok')]
+    assert results[1]['message'] == 'Summarize Mon: sun. Tue: rain.'
+
+
+def test_workflow_stream_reports_invalid_workflows(monkeypatch):
+    connected(monkeypatch)
+    [result] = collect(communicator.run_agent_workflow_stream([]))
+    assert 'error' in result
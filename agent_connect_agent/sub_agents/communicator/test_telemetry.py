@@ -0,0 +1,152 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from firebase_admin import firestore
+
+from agent_connect_agent.sub_agents.communicator.telemetry import MAX_BATCH_WRITES, AgentTelemetry
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self.updates = []
+
+    def update(self, ref, fields):
+        self.updates.append((ref, fields))
+
+    def commit(self):
+        if self._db.failing_commits:
+            self._db.failing_commits -= 1
+            raise ConnectionError('commit failed')
+        self._db.committed.append(self.updates)
+
+
+class FakeDb:
+    """Agents collection whose documents are named after their URLs; records committed batches and lookups."""
+
+    def __init__(self, catalog_urls, failing_commits=0):
+        self.catalog_urls = set(catalog_urls)
+        self.failing_commits = failing_commits
+        self.committed = []
+        self.lookups = []
+        self._url = None
+
+    def collection(self, name):
+        assert name == 'agents'
+        return self
+
+    def where(self, field, op, value):
+        self._url = value
+        return self
+
+    def limit(self, count):
+        return self
+
+    def stream(self):
+        self.lookups.append(self._url)
+        if self._url in self.catalog_urls:
+            yield SimpleNamespace(id=self._url.split('//')[1])
+
+    def document(self, doc_id):
+        return doc_id
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+def telemetry(**options):
+    return AgentTelemetry(**{'min_calls': 1, 'min_write_interval': 0, **options})
+
+
+def test_summary_percentiles_and_success_rate():
+    stats = telemetry()
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        stats.record('http://a/', True, latency)
+    stats.record('http://a', False)
+    summary = stats.summary('http://a')
+    assert summary['calls'] == 5
+    assert summary['success_rate'] == 0.8
+    assert (summary['latency_p50_ms'], summary['latency_p99_ms']) == (200.0, 400.0)
+    assert stats.summary('http://unknown') is None
+
+
+def test_flush_writes_in_chunks_of_max_batch_writes():
+    agent_urls = [f"http://agent-{i}" for i in range(MAX_BATCH_WRITES + 1)]
+    stats = telemetry()
+    for agent_url in agent_urls:
+        stats.record(agent_url, True, 0.1)
+    db = FakeDb(agent_urls)
+    assert stats.flush(db) == MAX_BATCH_WRITES + 1
+    assert sorted(len(batch) for batch in db.committed) == [1, MAX_BATCH_WRITES]
+    assert stats.stats()['pending'] == 0
+    # Nothing new to write
+    assert stats.flush(db) == 0
+
+
+def test_written_fields():
+    stats = telemetry()
+    stats.record('http://a', True, 0.25)
+    stats.record('http://b', False)
+    db = FakeDb(['http://a', 'http://b'])
+    stats.flush(db)
+    fields = dict(db.committed[0])
+    assert fields['a']['latency_p95_ms'] == 250.0
+    assert fields['a']['success_rate'] == 1.0
+    assert fields['a']['telemetry_calls'] == 1
+    # Without a successful call the latency fields are removed rather than set to null
+    assert fields['b']['latency_p50_ms'] is firestore.DELETE_FIELD
+
+
+def test_failed_commit_keeps_its_agents_pending():
+    stats = telemetry()
+    stats.record('http://a', True, 0.1)
+    db = FakeDb(['http://a'], failing_commits=1)
+    with pytest.raises(ConnectionError):
+        stats.flush(db)
+    assert stats.stats()['pending'] == 1
+    assert stats.flush(db) == 1
+    assert stats.stats()['pending'] == 0
+
+
+def test_agents_not_in_the_catalog_are_not_written_and_looked_up_once():
+    stats = telemetry()
+    stats.record('http://local', True, 0.1)
+    db = FakeDb([])
+    assert stats.flush(db) == 0
+    assert stats.stats()['pending'] == 0
+    stats.record('http://local', True, 0.1)
+    stats.flush(db)
+    assert db.lookups == ['http://local']
+
+
+def test_calls_after_the_summary_stay_pending():
+    stats = telemetry()
+    stats.record('http://a', True, 0.1)
+    due = stats._take_due()
+    stats.record('http://a', True, 0.1)
+    stats._mark_written([(agent_url, recorded) for agent_url, _, recorded in due])
+    assert stats.stats()['pending'] == 1
+
+
+def test_least_recently_called_agents_are_forgotten():
+    stats = telemetry(max_agents=2)
+    for agent_url in ('http://a', 'http://b', 'http://a', 'http://c'):
+        stats.record(agent_url, True, 0.1)
+    assert stats.summary('http://b') is None
+    assert stats.stats()['agents'] == 2
+    assert stats.stats()['pending'] == 2
+
+
+def test_idle_agents_are_forgotten_once_written():
+    stats = telemetry(idle_timeout=0.01, min_calls=2)
+    stats.record('http://written', True, 0.1)
+    stats.record('http://written', True, 0.1)
+    stats.record('http://unwritten', True, 0.1)
+    db = FakeDb(['http://written', 'http://unwritten'])
+    assert stats.flush(db) == 1
+    time.sleep(0.02)
+    stats.flush(db)
+    assert stats.summary('http://written') is None
+    # Still below min_calls, so its stats were never written
+    assert stats.summary('http://unwritten') is not None
@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import httpx
+from python_a2a import Message, MessageRole, TextContent
+
+from agent_connect_agent.sub_agents.communicator.transport import A2AStreamError, A2ATransport, PooledA2AClient
+
+
+def user_message(text):
+    return Message(content=TextContent(text=text), role=MessageRole.USER)
+
+
+def agent_reply(text):
+    return Message(content=TextContent(text=text), role=MessageRole.AGENT).to_dict()
+
+
+def mock_transport(handler, **options):
+    """A2ATransport whose per-loop httpx clients answer with handler instead of the network."""
+    transport = A2ATransport(http2=False, **options)
+    client_options = transport._client_options
+    transport._client_options = lambda: {**client_options(), 'transport': httpx.MockTransport(handler)}
+    return transport
+
+
+def echo_at(path):
+    # Agent answering messages at path only, echoing their upper-cased text
+    async def handler(request):
+        if request.url.path != path:
+            return httpx.Response(404)
+        text = json.loads(request.content)['content']['text']
+        if text == 'fail':
+            return httpx.Response(500)
+        return httpx.Response(200, json=agent_reply(text.upper()))
+    return handler
+
+
+def test_message_falls_back_to_the_a2a_endpoint_and_remembers_it():
+    requested = []
+    echo = echo_at('/a2a')
+
+    async def handler(request):
+        requested.append(request.url.path)
+        return await echo(request)
+
+    client = PooledA2AClient('http://agent/', transport=mock_transport(handler))
+
+    async def run():
+        first = await client.send_message_async(user_message('paris'))
+        second = await client.send_message_async(user_message('rome'))
+        return first.content.text, second.content.text
+
+    assert asyncio.run(run()) == ('PARIS', 'ROME')
+    assert requested == ['/', '/a2a', '/a2a']
+
+
+def test_messages_sent_together_fail_individually():
+    client = PooledA2AClient('http://agent', transport=mock_transport(echo_at('/')))
+    results = asyncio.run(client.send_messages_async([user_message(text) for text in ('paris', 'fail', 'rome')]))
+    assert results[0].content.text == 'PARIS'
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    assert results[2].content.text == 'ROME'
+
+
+def test_requests_to_one_host_are_limited():
+    in_flight = 0
+    most = 0
+
+    async def handler(request):
+        nonlocal in_flight, most
+        in_flight += 1
+        most = max(most, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=agent_reply('ok'))
+
+    transport = mock_transport(handler, max_per_host=2)
+    clients = [PooledA2AClient('http://agent', transport=transport) for _ in range(6)]
+
+    async def run():
+        await asyncio.gather(*(client.send_message_async(user_message('hi')) for client in clients))
+
+    asyncio.run(run())
+    assert most == 2
+    # The per-host limit only exists while requests are in flight
+    assert transport.stats()['hosts'] == []
+
+
+def test_loop_client_is_shared_and_closed_with_its_loop():
+    transport = mock_transport(echo_at('/'))
+
+    async def run():
+        client = transport.async_client()
+        assert transport.async_client() is client
+        return client
+
+    pool = asyncio.run(run())
+    assert pool.is_closed
+
+
+def sse(*events):
+    return ''.join(f"data: {json.dumps(event)}\n\n" for event in events).encode()
+
+
+def test_stream_yields_chunks_until_the_last_one():
+    async def handler(request):
+        assert request.url.path == '/stream'
+        body = sse(
+            {'content': {'text': 'Mon: sun. '}},
+            {'content': 'Tue: rain.', 'lastChunk': True},
+            {'content': 'ignored'},
+        )
+        return httpx.Response(200, content=b': heartbeat\n\n' + body, headers={'Content-Type': 'text/event-stream'})
+
+    client = PooledA2AClient('http://agent', transport=mock_transport(handler))
+
+    async def run():
+        return [chunk async for chunk in client.stream_message_async(user_message('forecast'))]
+
+    assert asyncio.run(run()) == ['Mon: sun. ', 'Tue: rain.']
+
+
+def test_agent_without_streaming_is_sent_the_message_once():
+    requested = []
+    echo = echo_at('/')
+
+    async def handler(request):
+        requested.append(request.url.path)
+        if request.url.path.endswith('/stream'):
+            return httpx.Response(501)
+        return await echo(request)
+
+    client = PooledA2AClient('http://agent', transport=mock_transport(handler))
+
+    async def run():
+        return [chunk async for chunk in client.stream_message_async(user_message('forecast'))]
+
+    assert asyncio.run(run()) == ['FORECAST']
+    assert requested == ['/stream', '/a2a/stream', '/']
+
+
+def test_error_event_in_a_stream_is_raised():
+    async def handler(request):
+        return httpx.Response(200, content=sse({'content': 'partial'}, {'error': 'model overloaded'}))
+
+    client = PooledA2AClient('http://agent', transport=mock_transport(handler))
+
+    async def run():
+        chunks = []
+        try:
+            async for chunk in client.stream_message_async(user_message('forecast')):
+                chunks.append(chunk)
+        except A2AStreamError as e:
+            return chunks, str(e)
+
+    assert asyncio.run(run()) == (['partial'], 'model overloaded')
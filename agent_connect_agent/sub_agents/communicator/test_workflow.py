@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from agent_connect_agent.sub_agents.communicator.workflow import (
+    WorkflowError, execute_workflow, plan_workflow, render_message
+)
+
+
+def node(node_id, message='hello', **extra):
+    return {'id': node_id, 'agent_url': f"http://{node_id}", 'message': message, **extra}
+
+
+def test_plan_resolves_explicit_and_template_dependencies():
+    dependencies = plan_workflow([
+        node('weather'),
+        node('hotels', 'Hotels for {{ weather }}'),
+        node('plan', '{{hotels}} and {{weather}}', depends_on='weather'),
+    ])
+    assert dependencies == {'weather': [], 'hotels': ['weather'], 'plan': ['weather', 'hotels']}
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(WorkflowError, match=r"cycle through \['a', 'b'\]"):
+        plan_workflow([node('a', '{{b}}'), node('b', '{{a}}'), node('c')])
+
+
+def test_self_reference_is_a_cycle():
+    with pytest.raises(WorkflowError, match='cycle'):
+        plan_workflow([node('a', 'again {{a}}')])
+
+
+@pytest.mark.parametrize('nodes, error', [
+    ([], 'no nodes'),
+    ([{'id': 'a', 'message': 'x'}], "needs 'id', 'agent_url' and 'message'"),
+    (['a'], "needs 'id', 'agent_url' and 'message'"),
+    ([node('a'), node('a')], 'more than once'),
+    ([node('a', '{{missing}}')], 'unknown nodes'),
+    ([node('a', depends_on=['missing'])], 'unknown nodes'),
+    ([node(1)], "string 'id' and 'message'"),
+    ([node('a', message=42)], "string 'id' and 'message'"),
+    ([node('a', depends_on=[1])], "'depends_on'"),
+    ([node('a', depends_on=7)], "'depends_on'"),
+])
+def test_malformed_workflows_raise_workflow_error(nodes, error):
+    with pytest.raises(WorkflowError, match=error):
+        plan_workflow(nodes)
+
+
+def test_render_message():
+    assert render_message('{{a}} then {{ b }}', {'a': 'sun', 'b': 'hotel'}) == 'sun then hotel'
+
+
+def run_workflow(nodes, send):
+    async def collect():
+        return [result async for result in execute_workflow(nodes, send, timeout=1.0)]
+    return asyncio.run(collect())
+
+
+def test_execute_passes_responses_downstream():
+    sent = []
+
+    async def send(agent_url, message, timeout, cacheable=False, alternate_urls=()):
+        sent.append((agent_url, message))
+        return {'agent_url': agent_url, 'status': 'ok', 'response': message.upper()}
+
+    results = run_workflow([node('a', 'sun'), node('b', 'after {{a}}')], send)
+    assert [result['node_id'] for result in results] == ['a', 'b']
+    assert sent == [('http://a', 'sun'), ('http://b', 'after SUN')]
+
+
+def test_execute_skips_nodes_after_a_failure():
+    async def send(agent_url, message, timeout, cacheable=False, alternate_urls=()):
+        if agent_url == 'http://a':
+            raise ConnectionError('refused')
+        return {'agent_url': agent_url, 'status': 'ok', 'response': 'fine'}
+
+    results = {result['node_id']: result for result in run_workflow(
+        [node('a'), node('b', '{{a}}'), node('c')], send
+    )}
+    assert results['a']['status'] == 'error'
+    assert results['b']['status'] == 'skipped'
+    assert results['c']['status'] == 'ok'
+
+
+def test_invalid_workflow_sends_nothing():
+    sent = []
+
+    async def send(*args, **kwargs):
+        sent.append(args)
+        return {'status': 'ok', 'response': ''}
+
+    with pytest.raises(WorkflowError):
+        run_workflow([node('a', '{{b}}'), node('b', '{{a}}')], send)
+    assert sent == []
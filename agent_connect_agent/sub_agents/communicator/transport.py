@@ -0,0 +1,451 @@
+import asyncio
+import importlib.util
+import json
+import os
+import ssl
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import certifi
+import httpx
+from python_a2a import Message
+
+# Shared connection pool settings for every A2A client of the communicator
+POOL_MAX_CONNECTIONS = int(os.getenv('COMMUNICATOR_POOL_SIZE', '100'))
+POOL_MAX_KEEPALIVE = int(os.getenv('COMMUNICATOR_KEEPALIVE_CONNECTIONS', '20'))
+KEEPALIVE_EXPIRY = float(os.getenv('COMMUNICATOR_KEEPALIVE_EXPIRY', '60'))
+# Maximum requests in flight to one host (scheme, host and port), so a single slow agent
+# cannot take every pooled connection
+MAX_PER_HOST = int(os.getenv('COMMUNICATOR_MAX_PER_HOST', '10'))
+DEFAULT_TIMEOUT = float(os.getenv('COMMUNICATOR_TIMEOUT', '30'))
+CONNECT_TIMEOUT = float(os.getenv('COMMUNICATOR_CONNECT_TIMEOUT', '5'))
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2]); set COMMUNICATOR_HTTP2=0 to force HTTP/1.1
+HTTP2_ENABLED = (
+    os.getenv('COMMUNICATOR_HTTP2', '1').lower() in ('1', 'true', 'yes')
+    and importlib.util.find_spec('h2') is not None
+)
+
+
+class A2ATransport:
+    """
+    Pooled keep-alive HTTP transport shared by all communicator A2A clients.
+
+    One httpx.AsyncClient per event loop holds the connections to every agent, so
+    repeated messages skip TCP and TLS setup. Its limits bound the sockets: at most
+    max_connections open and max_keepalive idle, and idle ones older than
+    keepalive_expiry seconds are closed on the next request. The clients share one SSL context, so
+    TLS sessions are resumed across loops (e.g. the health prober's thread). A loop's
+    client is closed when the loop shuts down its async generators, as asyncio.run()
+    does before closing it.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = POOL_MAX_CONNECTIONS,
+        max_keepalive: int = POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        max_per_host: int = MAX_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT,
+        http2: bool = HTTP2_ENABLED
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=min(CONNECT_TIMEOUT, timeout))
+        self.http2 = http2
+        self.max_per_host = max(max_per_host, 1)
+        # Same CA bundle httpx uses by default
+        self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self._lock = threading.Lock()
+        # Async state is kept per event loop and dropped with the loop
+        self._async_clients: 'weakref.WeakKeyDictionary[Any, httpx.AsyncClient]' = weakref.WeakKeyDictionary()
+        self._async_closers: 'weakref.WeakKeyDictionary[Any, AsyncIterator[None]]' = weakref.WeakKeyDictionary()
+        # Per-host limits only exist while requests to the host are in flight, so they do not
+        # accumulate for every agent URL ever contacted
+        self._async_host_slots: 'weakref.WeakKeyDictionary[Any, weakref.WeakValueDictionary]' = weakref.WeakKeyDictionary()
+
+    def _client_options(self) -> Dict[str, Any]:
+        return {
+            'limits': self.limits,
+            'timeout': self.timeout,
+            'http2': self.http2,
+            'verify': self._ssl_context,
+        }
+
+    def async_client(self) -> httpx.AsyncClient:
+        """The shared async client for the running event loop, created on first use."""
+        # httpx.AsyncClient connections are bound to the loop that opened them
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is not None:
+                return client
+            client = self._async_clients[loop] = httpx.AsyncClient(**self._client_options())
+            closer = self._async_closers[loop] = self._close_at_shutdown(client)
+        # Started now, the closer is finalized by loop.shutdown_asyncgens()
+        loop.create_task(_start(closer))
+        return client
+
+    async def _close_at_shutdown(self, client: httpx.AsyncClient) -> AsyncIterator[None]:
+        # Holds no reference to its loop, which would keep the loop's entries alive
+        try:
+            yield
+        finally:
+            with self._lock:
+                loop = asyncio.get_running_loop()
+                if self._async_clients.get(loop) is client:
+                    del self._async_clients[loop]
+                    self._async_closers.pop(loop, None)
+            await client.aclose()
+
+    def _async_host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            slots = self._async_host_slots.setdefault(asyncio.get_running_loop(), weakref.WeakValueDictionary())
+            slot = slots.get(host)
+            if slot is None:
+                slot = slots[host] = asyncio.Semaphore(self.max_per_host)
+            return slot
+
+    async def post_json_async(self, url: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """
+        POSTs a JSON payload over the shared pool and returns the decoded JSON response.
+
+        Raises:
+            httpx.HTTPError: On connection errors, timeouts and non-2xx responses
+        """
+        async with self._async_host_slot(url):
+            response = await self.async_client().post(url, json=payload, timeout=self._request_timeout(timeout))
+        response.raise_for_status()
+        return response.json()
+
+    async def post_json_many_async(self, url: str, payloads: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Any]:
+        """
+        POSTs several JSON payloads to one URL at once while holding a single per-host slot.
+
+        Over HTTP/2 the requests are multiplexed as streams of one connection.
+
+        Returns:
+            The decoded JSON responses in order, or the exception raised for each failed request
+        """
+        client = self.async_client()
+        request_timeout = self._request_timeout(timeout)
+
+        async def post(payload):
+            response = await client.post(url, json=payload, timeout=request_timeout)
+            response.raise_for_status()
+            return response.json()
+
+        async with self._async_host_slot(url):
+            return await asyncio.gather(*(post(payload) for payload in payloads), return_exceptions=True)
+
+    async def get_json_async(self, url: str, timeout: Optional[float] = None) -> Any:
+        """
+        GETs a JSON document (e.g. an agent card) over the shared pool.
+
+        Raises:
+            httpx.HTTPError: On connection errors, timeouts and non-2xx responses
+        """
+        async with self._async_host_slot(url):
+            response = await self.async_client().get(url, timeout=self._request_timeout(timeout))
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_sse_async(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        POSTs a JSON payload and yields the server-sent events of the response as they arrive.
+
+        The timeout applies to each read, so long generations stream for as long as the
+        agent keeps sending.
+
+        Yields:
+            Events as {'event': event type ('message' by default), 'data': decoded JSON or raw text}
+
+        Raises:
+            httpx.HTTPError: On connection errors, read timeouts and non-2xx responses
+        """
+        headers = {'Accept': 'text/event-stream'}
+        async with self._async_host_slot(url):
+            async with self.async_client().stream(
+                'POST', url, json=payload, headers=headers, timeout=self._request_timeout(timeout)
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                event_type, data_lines = 'message', []
+                async for line in response.aiter_lines():
+                    if line == '':
+                        # A blank line ends the event
+                        if data_lines:
+                            yield {'event': event_type, 'data': _decode_event_data('\n'.join(data_lines))}
+                        event_type, data_lines = 'message', []
+                    elif line.startswith(':'):
+                        # Comment / heartbeat
+                        continue
+                    else:
+                        field, _, value = line.partition(':')
+                        value = value[1:] if value.startswith(' ') else value
+                        if field == 'event':
+                            event_type = value
+                        elif field == 'data':
+                            data_lines.append(value)
+                if data_lines:
+                    yield {'event': event_type, 'data': _decode_event_data('\n'.join(data_lines))}
+
+    def _request_timeout(self, timeout: Optional[float]):
+        if timeout is None:
+            return self.timeout
+        return httpx.Timeout(timeout, connect=min(CONNECT_TIMEOUT, timeout))
+
+    async def aclose(self):
+        """Closes the async pool of the running event loop."""
+        with self._lock:
+            loop = asyncio.get_running_loop()
+            client = self._async_clients.pop(loop, None)
+            self._async_closers.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the pool configuration and the hosts with requests in flight."""
+        with self._lock:
+            hosts = {host for slots in self._async_host_slots.values() for host in list(slots.keys())}
+            return {
+                'http2': self.http2,
+                'max_connections': self.limits.max_connections,
+                'max_keepalive_connections': self.limits.max_keepalive_connections,
+                'keepalive_expiry': self.limits.keepalive_expiry,
+                'max_per_host': self.max_per_host,
+                'hosts': sorted(hosts),
+            }
+
+
+async def _start(closer: AsyncIterator[None]):
+    await closer.__anext__()
+
+
+_transport: Optional[A2ATransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> A2ATransport:
+    """Returns the process-wide A2ATransport."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = A2ATransport()
+        return _transport
+
+
+def _decode_event_data(data: str) -> Any:
+    try:
+        return json.loads(data)
+    except ValueError:
+        return data
+
+
+class A2AStreamError(Exception):
+    """Raised when an agent reports an error event in the middle of a streamed response, or streams no response."""
+
+
+def _parse_message(response_data: Dict[str, Any]) -> Message:
+    # Agents answering in Google's A2A format send parts instead of content
+    if 'parts' in response_data and 'content' not in response_data:
+        return Message.from_google_a2a(response_data)
+    return Message.from_dict(response_data)
+
+
+def _endpoint_candidates(endpoint_url: str):
+    # python_a2a servers accept messages at the root and at /a2a, like A2AClient tries them
+    if endpoint_url.endswith('/a2a'):
+        return [endpoint_url]
+    return [endpoint_url, f"{endpoint_url}/a2a"]
+
+
+def _is_wrong_endpoint(error: httpx.HTTPStatusError) -> bool:
+    return error.response.status_code in (404, 405)
+
+
+def _streaming_candidates(endpoint_url: str) -> List[str]:
+    # python_a2a servers stream at /stream and /a2a/stream
+    if endpoint_url.endswith('/a2a'):
+        return [f"{endpoint_url}/stream"]
+    return [f"{endpoint_url}/stream", f"{endpoint_url}/a2a/stream"]
+
+
+def _is_streaming_unsupported(error: httpx.HTTPStatusError) -> bool:
+    # 501: the server has the endpoint but the agent does not implement streaming
+    return error.response.status_code in (404, 405, 501)
+
+
+def _chunk_text(content: Any) -> str:
+    if isinstance(content, dict):
+        return content.get('text', '')
+    return content if isinstance(content, str) else json.dumps(content)
+
+
+# Agent card locations, in the order python_a2a's A2AClient tries them
+AGENT_CARD_PATHS = ['/.well-known/agent.json', '/agent.json', '/a2a/agent.json']
+
+
+class PooledA2AClient:
+    """
+    A2A client speaking the message protocol of python_a2a's A2AClient (a Message
+    POSTed as JSON to the agent URL, or to its /a2a endpoint), over the shared A2ATransport.
+
+    Unlike A2AClient it does not fetch the agent card on construction, and it owns no
+    connections, so creating and dropping clients is free.
+    """
+
+    def __init__(self, endpoint_url: str, timeout: Optional[float] = None, transport: Optional[A2ATransport] = None):
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.timeout = timeout
+        self.transport = transport or get_transport()
+        self._endpoint: Optional[str] = None
+        self._agent_card: Optional[Dict[str, Any]] = None
+        self._agent_card_fetched = False
+
+    async def send_message_async(self, message: Message) -> Message:
+        """
+        Sends a message and returns the agent's response message.
+
+        Raises:
+            httpx.HTTPError: If the agent cannot be reached or answers with an error status
+        """
+        payload = message.to_dict()
+        candidates = [self._endpoint] if self._endpoint else _endpoint_candidates(self.endpoint_url)
+        for index, endpoint in enumerate(candidates):
+            try:
+                response_data = await self.transport.post_json_async(endpoint, payload, timeout=self.timeout)
+            except httpx.HTTPStatusError as e:
+                if index + 1 < len(candidates) and _is_wrong_endpoint(e):
+                    continue
+                raise
+            # Remember the endpoint that answered for later messages
+            self._endpoint = endpoint
+            return _parse_message(response_data)
+
+    async def send_messages_async(self, messages: List[Message]) -> List[Any]:
+        """
+        Sends several messages together (see A2ATransport.post_json_many_async).
+
+        Returns:
+            The response message of each message in order, or the exception it failed with
+        """
+        results = []
+        if self._endpoint is None and messages:
+            # The first message finds the endpoint the others are sent to
+            try:
+                results.append(await self.send_message_async(messages[0]))
+            except Exception as e:
+                results.append(e)
+            messages = messages[1:]
+        if not messages:
+            return results
+        if self._endpoint is None:
+            # The endpoint is still unknown, so every message tries the candidates itself
+            results.extend(await asyncio.gather(
+                *(self.send_message_async(message) for message in messages), return_exceptions=True
+            ))
+            return results
+        payloads = [message.to_dict() for message in messages]
+        for response_data in await self.transport.post_json_many_async(self._endpoint, payloads, timeout=self.timeout):
+            if isinstance(response_data, BaseException):
+                results.append(response_data)
+                continue
+            try:
+                results.append(_parse_message(response_data))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def get_agent_card_async(self) -> Optional[Dict[str, Any]]:
+        """Fetches the agent card once (later calls reuse it), or returns None if the agent publishes none."""
+        if not self._agent_card_fetched:
+            for path in AGENT_CARD_PATHS:
+                try:
+                    agent_card = await self.transport.get_json_async(f"{self.endpoint_url}{path}", timeout=self.timeout)
+                except (httpx.HTTPError, ValueError):
+                    continue
+                if isinstance(agent_card, dict):
+                    self._agent_card = agent_card
+                    break
+            self._agent_card_fetched = True
+        return self._agent_card
+
+    def set_agent_card(self, agent_card: Dict[str, Any]):
+        """Uses an agent card fetched elsewhere (e.g. by the health prober) instead of fetching it again."""
+        self._agent_card = agent_card
+        self._agent_card_fetched = True
+
+    async def supports_streaming_async(self) -> bool:
+        """Whether the agent card advertises capabilities.streaming."""
+        agent_card = await self.get_agent_card_async()
+        capabilities = (agent_card or {}).get('capabilities') or {}
+        return isinstance(capabilities, dict) and bool(capabilities.get('streaming'))
+
+    async def stream_message_async(self, message: Message) -> AsyncIterator[str]:
+        """
+        Sends a message to the agent's streaming endpoint and yields the response text chunk by chunk.
+
+        Agents without a streaming endpoint (streaming not implemented) are sent the
+        message normally and the whole response is yielded as one chunk.
+
+        Raises:
+            httpx.HTTPError: If the agent cannot be reached or answers with an error status
+            A2AStreamError: If the agent reports an error while streaming, or ends the stream
+                without a response (the message is not sent again, as the agent may have acted on it)
+        """
+        payload = message.to_dict()
+        for endpoint in _streaming_candidates(self.endpoint_url):
+            events = self.transport.stream_sse_async(endpoint, payload, timeout=self.timeout)
+            streamed = False
+            try:
+                async for event in events:
+                    data = event['data']
+                    if event['event'] == 'error' or (isinstance(data, dict) and 'error' in data):
+                        raise A2AStreamError(data.get('error') if isinstance(data, dict) else data)
+                    streamed = True
+                    if not isinstance(data, dict):
+                        yield data
+                        continue
+                    text = _chunk_text(data.get('content', ''))
+                    if text:
+                        yield text
+                    if data.get('lastChunk'):
+                        break
+            except httpx.HTTPStatusError as e:
+                if not _is_streaming_unsupported(e):
+                    raise
+                continue
+            finally:
+                # Stopping at the final chunk (or on an error) must still release the response
+                await events.aclose()
+            if not streamed:
+                raise A2AStreamError(
+                    "Agent ended the stream without a response; it may not support streaming, "
+                    "so send the message without streaming instead"
+                )
+            return
+
+        # No streaming endpoint took the message, so it has not been delivered yet
+        response = await self.send_message_async(message)
+        yield response.content.text if hasattr(response.content, 'text') else ''
+
+    def close(self):
+        """
+        Nothing to release: connections belong to the shared transport. It keeps at
+        most max_keepalive idle ones and closes those idle for keepalive_expiry seconds
+        on its next request, so sockets to an agent whose clients are all dropped go
+        away without them.
+        """
@@ -0,0 +1,152 @@
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+# {{node_id}} in a node's message is replaced with that upstream node's response
+TEMPLATE_PATTERN = re.compile(r'\{\{\s*([A-Za-z0-9_\-]+)\s*\}\}')
+
+SendFunction = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class WorkflowError(ValueError):
+    """Raised for workflow definitions that cannot be run (unknown nodes, cycles, ...)."""
+
+
+def _node_dependencies(node: Dict[str, Any]) -> List[str]:
+    # Explicit depends_on plus every node referenced by a template, in order of appearance
+    depends_on = node.get('depends_on') or []
+    dependencies = [depends_on] if isinstance(depends_on, str) else list(depends_on)
+    for referenced in TEMPLATE_PATTERN.findall(node['message']):
+        if referenced not in dependencies:
+            dependencies.append(referenced)
+    return dependencies
+
+
+def plan_workflow(nodes: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Validates workflow nodes and resolves their dependencies.
+
+    Args:
+        nodes: Workflow nodes, each {"id", "agent_url", "message", optional "depends_on", "cacheable"
+            and "alternate_urls"}
+
+    Returns:
+        Dictionary mapping each node ID to the IDs it depends on
+
+    Raises:
+        WorkflowError: If a node is malformed, IDs repeat, a dependency is unknown or the graph has a cycle
+    """
+    if not nodes:
+        raise WorkflowError("The workflow has no nodes")
+
+    dependencies = {}
+    for index, node in enumerate(nodes):
+        if not isinstance(node, dict) or not node.get('id') or not node.get('agent_url') or node.get('message') is None:
+            raise WorkflowError(f"Node {index} needs 'id', 'agent_url' and 'message'")
+        # Templates reference nodes by string ID, so any other ID could never be matched
+        if not isinstance(node['id'], str) or not isinstance(node['message'], str):
+            raise WorkflowError(f"Node {index} needs a string 'id' and 'message'")
+        depends_on = node.get('depends_on') or []
+        if not isinstance(depends_on, (str, list, tuple)) or (
+            not isinstance(depends_on, str) and not all(isinstance(dependency, str) for dependency in depends_on)
+        ):
+            raise WorkflowError(f"Node '{node['id']}' needs 'depends_on' as a node ID or a list of node IDs")
+        if node['id'] in dependencies:
+            raise WorkflowError(f"Node ID '{node['id']}' is used more than once")
+        dependencies[node['id']] = _node_dependencies(node)
+
+    for node_id, upstream in dependencies.items():
+        unknown = [dependency for dependency in upstream if dependency not in dependencies]
+        if unknown:
+            raise WorkflowError(f"Node '{node_id}' depends on unknown nodes {unknown}")
+
+    # Kahn's algorithm: every node must become ready once its dependencies are done
+    remaining = {node_id: len(upstream) for node_id, upstream in dependencies.items()}
+    ready = [node_id for node_id, count in remaining.items() if count == 0]
+    visited = 0
+    while ready:
+        done = ready.pop()
+        visited += 1
+        for node_id, upstream in dependencies.items():
+            if done in upstream:
+                remaining[node_id] -= 1
+                if remaining[node_id] == 0:
+                    ready.append(node_id)
+    if visited != len(dependencies):
+        cyclic = sorted(node_id for node_id, count in remaining.items() if count > 0)
+        raise WorkflowError(f"The workflow has a dependency cycle through {cyclic}")
+    return dependencies
+
+
+def render_message(message: str, responses: Dict[str, str]) -> str:
+    """Replaces {{node_id}} placeholders with the responses of upstream nodes."""
+    return TEMPLATE_PATTERN.sub(lambda match: responses[match.group(1)], message)
+
+
+async def execute_workflow(
+    nodes: List[Dict[str, Any]],
+    send: SendFunction,
+    timeout: float
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs a workflow, starting every node as soon as its dependencies have answered.
+
+    Independent branches run concurrently. Nodes whose dependencies failed are
+    skipped rather than sent with a missing input.
+
+    Args:
+        nodes: Workflow nodes (see plan_workflow)
+        send: Coroutine sending one message, send(agent_url, message, timeout, cacheable=...,
+            alternate_urls=...), returning a result dictionary with 'status' and 'response' or 'error'
+        timeout: Seconds to wait for each agent
+
+    Yields:
+        Node results in completion order, each the send() result plus 'node_id' and 'started_ms'
+        (time since the workflow started)
+
+    Raises:
+        WorkflowError: If the workflow definition is invalid (raised before anything is sent)
+    """
+    dependencies = plan_workflow(nodes)
+    nodes_by_id = {node['id']: node for node in nodes}
+    started = time.perf_counter()
+    finished: Dict[str, asyncio.Future] = {node_id: asyncio.get_running_loop().create_future() for node_id in nodes_by_id}
+    completed: asyncio.Queue = asyncio.Queue()
+
+    async def run_node(node_id):
+        node = nodes_by_id[node_id]
+        upstream = [await finished[dependency] for dependency in dependencies[node_id]]
+        failed = [result['node_id'] for result in upstream if result['status'] != 'ok']
+        if failed:
+            result = {
+                'agent_url': node['agent_url'],
+                'message': node['message'],
+                'status': 'skipped',
+                'error': f"Skipped because {failed} did not succeed",
+            }
+        else:
+            responses = {result['node_id']: result['response'] for result in upstream}
+            started_ms = round((time.perf_counter() - started) * 1000, 1)
+            message = render_message(node['message'], responses)
+            try:
+                result = await send(
+                    node['agent_url'], message, timeout,
+                    cacheable=bool(node.get('cacheable')), alternate_urls=node.get('alternate_urls') or []
+                )
+            except Exception as e:
+                result = {'agent_url': node['agent_url'], 'message': message, 'status': 'error', 'error': str(e)}
+            result['started_ms'] = started_ms
+        result['node_id'] = node_id
+        finished[node_id].set_result(result)
+        await completed.put(result)
+
+    tasks = [asyncio.ensure_future(run_node(node_id)) for node_id in nodes_by_id]
+    try:
+        for _ in tasks:
+            yield await completed.get()
+    finally:
+        # The consumer may stop early; do not leave agent calls running in the background
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
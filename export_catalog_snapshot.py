@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+from firebase_admin import firestore
+
+from populate_firestore import initialize_services
+from agent_connect_agent.sub_agents.agent_finder.snapshot import CatalogSnapshot, export_snapshot
+
+def export_catalog_snapshot(path):
+    """
+    Exports the agents collection and agent cards to a catalog snapshot file.
+    Point AGENT_FINDER_SNAPSHOT at the file to start agent_finder from it.
+    
+    Args:
+        path: Destination snapshot file
+    """
+    try:
+        initialize_services()
+        db = firestore.client()
+        
+        started = time.perf_counter()
+        agent_count = export_snapshot(db, path)
+        elapsed = time.perf_counter() - started
+        print(f"✅ Exported {agent_count} agents to {path} ({os.path.getsize(path)} bytes) in {elapsed:.2f}s.")
+        
+        # Verify the file opens and report how long a cold start takes to map it
+        started = time.perf_counter()
+        snapshot = CatalogSnapshot.open(path)
+        print(f"-> Snapshot opens in {(time.perf_counter() - started) * 1000:.2f} ms with {len(snapshot)} agents.")
+        snapshot.close()
+        print(f"\nRun agent_finder with: AGENT_FINDER_SNAPSHOT={os.path.abspath(path)}")
+    except Exception as e:
+        print(f"Error exporting catalog snapshot: {e}")
+        raise
+
+if __name__ == "__main__":
+    export_catalog_snapshot(sys.argv[1] if len(sys.argv) > 1 else "agent_catalog.snapshot")
@@ -4,6 +4,9 @@ import uuid
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+from agent_connect_agent.sub_agents.agent_finder.capability_index import capability_fields
+from agent_connect_agent.sub_agents.agent_finder.leaderboards import update_agent_leaderboards
+
 def initialize_services():
     """
     Initializes Firebase Admin SDK.
@@ -193,7 +196,14 @@ def populate_firestore():
             
             # Upload the main agent document to Firestore
             doc_ref = agents_collection.document(agent_data['agent_id'])
-            doc_ref.set(agent_data)
+            previous = doc_ref.get()
+            previous_capabilities = previous.to_dict().get('capabilities', []) if previous.exists else []
+            # updated_at lets catalog snapshots pick up this agent (and its card) as a delta
+            doc_ref.set({
+                **agent_data,
+                **capability_fields(agent_data['capabilities']),
+                'updated_at': firestore.SERVER_TIMESTAMP
+            })
             
             print(f"-> Successfully uploaded '{agent_data['agent_id']}' to Firestore.")
             
@@ -203,6 +213,11 @@ def populate_firestore():
             agent_card_ref.set(agent_card)
             
             print(f"-> Successfully uploaded agent card for '{agent_data['agent_id']}'.")
+            
+            # Keep the materialized top-K leaderboards current (all agents and each capability)
+            update_agent_leaderboards(db, agent_data, agent_card, previous_capabilities=previous_capabilities)
+            
+            print(f"-> Updated leaderboards for '{agent_data['agent_id']}'.")
 
         print("\n-----------------------------------------")
         print("✅ All sample agents and agent cards have been populated in Firestore.")
@@ -221,11 +236,15 @@ def populate_firestore():
         print("   - agent_name: Human-readable name of the agent")
         print("   - description: Description of what the agent does")
         print("   - capabilities: Array of agent capabilities")
+        print("   - capabilities_lower: Lowercase capabilities (precomputed for matching)")
+        print("   - capability_tokens: Word tokens of all capabilities (for array-contains-any)")
         print("   - agent_url: A2A protocol URL for connection")
         print("   - agent_pricing: Token-based pricing (tokens per request)")
         print("   - karma: Reddit-style karma score")
+        print("   - updated_at: Server timestamp of the last write to the agent or its card")
         print("   - agent_cards (sub-collection): Google agent2agent protocol formatted cards")
         print("     └── card: Full agent card with skills, capabilities, security, etc.")
+        print("   - capability_leaderboards: Top agents per capability by karma, pricing and best value")
         print("\n📋 NEXT STEPS:")
         print("1. Start your agent servers:")
         print("   - Weather Agent: http://127.0.0.1:5001")